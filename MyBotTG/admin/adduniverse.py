@@ -3,7 +3,7 @@ from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
 from aiogram.types import ReplyKeyboardRemove
-import aiosqlite
+from repositories import cards_repo
 from config import OWNER_ID
 
 adduniverse_router = Router()
@@ -14,35 +14,7 @@ class AddUniverseStates(StatesGroup):
 
 async def add_universe(universe_id: str, name: str) -> bool:
     """Асинхронное добавление вселенной в базу данных."""
-    async with aiosqlite.connect("bot_database.db") as db:
-        await db.execute("PRAGMA foreign_keys = ON")  # Включаем поддержку внешних ключей
-        
-        # Проверяем, существует ли уже такая вселенная
-        async with db.execute("SELECT universe_id FROM universes WHERE universe_id = ?", (universe_id,)) as cursor:
-            if await cursor.fetchone():
-                return False  # Вселенная уже существует
-        
-        # Добавляем вселенную
-        await db.execute(
-            "INSERT INTO universes (universe_id, name, enabled) VALUES (?, ?, ?)",
-            (universe_id, name, 0)
-        )
-
-        # Создаём таблицу для карт этой вселенной
-        await db.execute(f"""
-        CREATE TABLE IF NOT EXISTS [{universe_id}] (
-            card_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT,
-            photo_path TEXT,
-            rarity TEXT,
-            attack INTEGER,
-            hp INTEGER,
-            points INTEGER DEFAULT 0
-        )
-        """)
-
-        await db.commit()
-        return True
+    return await cards_repo.add_universe(universe_id, name, enabled=False)
 
 @adduniverse_router.message(Command("add_universe"))
 async def start_add_universe(message: types.Message, state: FSMContext):
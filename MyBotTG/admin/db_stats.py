@@ -0,0 +1,41 @@
+from aiogram import Router, types
+from aiogram.filters import Command
+from config import OWNER_ID
+from dabase.database import db_instance
+from repositories import users_cache, card_catalog, cooldowns, photos_repo, leaderboard_index, top_snapshots
+from utils.image_store import image_store
+
+dbstats_router = Router()
+
+
+def format_stats(title: str, stats: dict) -> str:
+    lines = [f"<b>{title}</b>"]
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            continue
+        if isinstance(value, float):
+            value = round(value, 4)
+        lines.append(f"<code>{key}</code>: {value}")
+    return "\n".join(lines)
+
+
+@dbstats_router.message(Command("db_stats"))
+async def db_stats(message: types.Message):
+    """📊 Статистика пула соединений, очереди записи и кэшей (только для владельца)."""
+    if message.from_user.id != OWNER_ID:
+        await message.answer("❌ У вас нет прав.")
+        return
+
+    stats = db_instance.stats()
+    text = "\n\n".join([
+        format_stats("🔌 Пул соединений", stats),
+        format_stats("📝 Очередь записи", stats.get("write_queue", {})),
+        format_stats("👤 Кэш users", users_cache.stats()),
+        format_stats("🃏 Каталог карт", card_catalog.stats()),
+        format_stats("⏳ Кулдауны", cooldowns.stats()),
+        format_stats("🏆 Рейтинг", leaderboard_index.stats()),
+        format_stats("📸 Снимки топа", top_snapshots.stats()),
+        format_stats("🖼 file_id изображений", photos_repo.stats()),
+        format_stats("🗂 Хранилище изображений", image_store.stats()),
+    ])
+    await message.answer(text, parse_mode="HTML")
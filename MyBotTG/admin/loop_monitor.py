@@ -0,0 +1,51 @@
+import html
+import time
+from aiogram import Router, types
+from aiogram.filters import Command
+from config import OWNER_ID
+from utils.loop_monitor import loop_monitor
+
+loopmonitor_router = Router()
+
+MAX_MESSAGE_LENGTH = 4000
+STALLS_IN_REPORT = 3
+STACK_TAIL = 1200  # Последние символы стека: там код, который держал loop
+
+
+@loopmonitor_router.message(Command("loop_lag"))
+async def loop_lag_report(message: types.Message):
+    """🩺 Отчёт монитора event loop: гистограмма задержек и последние блокировки."""
+    if message.from_user.id != OWNER_ID:
+        await message.answer("❌ У вас нет прав.")
+        return
+
+    if not loop_monitor.running:
+        await message.answer("🩺 Монитор event loop выключен. Включите его переменной окружения LOOP_MONITOR=1.")
+        return
+
+    summary = loop_monitor.summary()
+    lines = [
+        "🩺 <b>Задержка event loop</b>",
+        f"Замеров: {summary['samples']}, p50: {summary['p50']}, p99: {summary['p99']}, "
+        f"максимум: {summary['max_lag_ms']} мс",
+        "",
+    ]
+    lines += [f"<code>{label:>10}</code> {count}" for label, count in loop_monitor.histogram_rows() if count]
+
+    stalls = list(loop_monitor.stalls)[-STALLS_IN_REPORT:]
+    if stalls:
+        lines += ["", f"🐢 <b>Последние блокировки</b> (всего сохранено: {len(loop_monitor.stalls)})"]
+
+    text = "\n".join(lines)
+    for stall in reversed(stalls):
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stall.started_at))
+        block = (
+            f"\n\n{when} — {stall.duration * 1000:.0f} мс, {html.escape(stall.handler or 'обработчик неизвестен')}\n"
+            f"<pre>{html.escape(stall.stack[-STACK_TAIL:])}</pre>"
+        )
+        # Блоки добавляются целиком, чтобы не разорвать HTML-теги
+        if len(text) + len(block) > MAX_MESSAGE_LENGTH:
+            break
+        text += block
+
+    await message.answer(text, parse_mode="HTML")
@@ -3,7 +3,7 @@ from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
 from aiogram.types import ReplyKeyboardRemove
-import aiosqlite
+from repositories import cards_repo
 from config import OWNER_ID
 
 universecheck_router = Router()
@@ -14,22 +14,16 @@ class ToggleUniverseStates(StatesGroup):
 
 async def enable_universe(universe_id: str):
     """🔹 Включает вселенную (делает enabled = 1)."""
-    async with aiosqlite.connect("bot_database.db") as db:
-        await db.execute("UPDATE universes SET enabled = 1 WHERE universe_id = ?", (universe_id,))
-        await db.commit()
+    await cards_repo.set_universe_enabled(universe_id, True)
 
 async def disable_universe(universe_id: str):
     """🔹 Отключает вселенную (делает enabled = 0)."""
-    async with aiosqlite.connect("bot_database.db") as db:
-        await db.execute("UPDATE universes SET enabled = 0 WHERE universe_id = ?", (universe_id,))
-        await db.commit()
+    await cards_repo.set_universe_enabled(universe_id, False)
 
 async def get_universe_status(universe_id: str) -> bool:
     """🔹 Получает статус вселенной (включена или нет)."""
-    async with aiosqlite.connect("bot_database.db") as db:
-        async with db.execute("SELECT enabled FROM universes WHERE universe_id = ?", (universe_id,)) as cursor:
-            result = await cursor.fetchone()
-            return result[0] if result else None
+    universe = await cards_repo.universe(universe_id)
+    return universe.enabled if universe else None
 
 @universecheck_router.message(Command("toggle_universe"))
 async def start_toggle_universe(message: types.Message, state: FSMContext):
@@ -82,9 +76,7 @@ async def process_toggle_universe(message: types.Message, state: FSMContext):
 @universecheck_router.message(Command("list_universes"))
 async def list_universes_command(message: types.Message):
     """Выводит список вселенных с их статусами."""
-    async with aiosqlite.connect("bot_database.db") as db:
-        async with db.execute("SELECT universe_id, name, enabled FROM universes") as cursor:
-            universes = await cursor.fetchall()
+    universes = await cards_repo.universes()
 
     if not universes:
         await message.answer("📂 Список вселенных пуст.")
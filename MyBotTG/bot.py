@@ -5,6 +5,7 @@ from aiogram import Bot, Dispatcher
 from dotenv import load_dotenv, find_dotenv
 from dabase.database import db_instance
 from middleware.check_user import CheckUserMiddleware
+from middleware.loop_monitor import LoopMonitorMiddleware
 from scheduler_jobs import start_scheduler
 from startup import on_startup, on_shutdown
 
@@ -23,6 +24,10 @@ dp = Dispatcher()
 dp.update.middleware(CheckUserMiddleware())
 dp.chat_member.middleware(CheckUserMiddleware())
 
+# ✅ Имя обработчика для монитора event loop (без LOOP_MONITOR=1 ничего не делает)
+for observer in (dp.message, dp.edited_message, dp.callback_query, dp.chat_member):
+    observer.middleware(LoopMonitorMiddleware())
+
 # 🔹 Подключаем и регистрируем роутеры
 from handlers.usershand.user_private import router
 from handlers.cardshand.dobcards import dobcards_router
@@ -43,7 +48,6 @@ from handlers.usershand.leaderboards import leaderboard_router
 from handlers.usershand.dailyreward import dailyreward_router
 from handlers.usershand.profile_callbacks import profile_callbacks_router
 from cards.shop import shop_router
-from cards.admin_pagination import admin_pagination_router
 from cards.shop_callbacks import shop_callbacks_router
 from cards.admincards import admincards_router
 from handlers.usershand.admintoggleuniverse import admin_universe_router
@@ -51,6 +55,8 @@ from cards.admincardedit import admincardedit_router
 from admin.universe_check import universecheck_router
 from admin.adduniverse import adduniverse_router
 from handlers.usershand.change_universe import change_universe_router
+from admin.loop_monitor import loopmonitor_router
+from admin.db_stats import dbstats_router
 
 # ✅ Регистрируем роутеры
 dp.include_router(router)
@@ -75,11 +81,12 @@ dp.include_router(shop_router)
 dp.include_router(shop_callbacks_router)
 dp.include_router(admin_universe_router)
 dp.include_router(admincards_router)
-dp.include_router(admin_pagination_router)
 dp.include_router(admincardedit_router)
 dp.include_router(universecheck_router)
 dp.include_router(adduniverse_router)
 dp.include_router(referal_router)
+dp.include_router(loopmonitor_router)
+dp.include_router(dbstats_router)
 
 async def main():
     """Основная асинхронная функция"""
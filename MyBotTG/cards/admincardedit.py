@@ -1,13 +1,12 @@
-import os
 import random
-import asyncio
-import aiosqlite
+from repositories import cards_repo, photos_repo
 from aiogram import Router, types, F
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
 from handlers.cardshand.callbackcards import EditCardCallback
+from utils.image_store import image_store
 
 admincardedit_router = Router()
 
@@ -56,13 +55,7 @@ async def set_rarity(callback: types.CallbackQuery):
     attack = random.randint(*RARITY_RANGES[new_rarity]["attack"])
     hp = random.randint(*RARITY_RANGES[new_rarity]["hp"])
 
-    async with aiosqlite.connect("bot_database.db") as db:
-        await db.execute(f"""
-            UPDATE [{universe}]
-            SET rarity = ?, attack = ?, hp = ?
-            WHERE card_id = ?
-        """, (new_rarity, attack, hp, card_id))
-        await db.commit()
+    await cards_repo.update_rarity(universe, card_id, new_rarity, attack, hp)
 
     await callback.message.edit_caption(
         caption=(
@@ -99,37 +92,22 @@ async def set_points(message: types.Message, state: FSMContext):
         await message.answer("❌ Ошибка: введите числовое значение.")
         return
 
-    async with aiosqlite.connect("bot_database.db") as db:
-        await db.execute(f"""
-            UPDATE [{universe}]
-            SET points = ?
-            WHERE card_id = ?
-        """, (new_points, card_id))
-        await db.commit()
+    await cards_repo.update_points(universe, card_id, new_points)
 
     await message.answer(f"✅ Очки карты успешно изменены на {new_points}.")
     await state.clear()
 
 @admincardedit_router.callback_query(EditCardCallback.filter(F.action == "delete"))
 async def delete_card(callback: types.CallbackQuery, callback_data: EditCardCallback):
-    """🔹 Удаляет карту из БД и её изображение."""
+    """🔹 Удаляет карту из БД и её изображение (если оно не используется другими картами)."""
     card_id = callback_data.card_id
     universe = callback_data.universe
 
-    async with aiosqlite.connect("bot_database.db") as db:
-        async with db.execute(f"SELECT photo_path FROM [{universe}] WHERE card_id = ?", (card_id,)) as cursor:
-            result = await cursor.fetchone()
+    photo_path = await cards_repo.delete(universe, card_id)
 
-        if result:
-            photo_path = result[0]
-            if os.path.exists(photo_path):
-                try:
-                    await asyncio.to_thread(os.remove, photo_path)  # 🔹 Асинхронное удаление
-                except Exception as e:
-                    print(f"Ошибка при удалении файла {photo_path}: {e}")
-
-        await db.execute(f"DELETE FROM [{universe}] WHERE card_id = ?", (card_id,))
-        await db.commit()
+    if photo_path:
+        await image_store.remove(photo_path)
+        await photos_repo.forget(photo_path)
 
     await callback.message.edit_caption("🗑 Карта успешно удалена.", reply_markup=None)
     await callback.answer("Карта удалена.", show_alert=True)
@@ -1,8 +1,18 @@
+import os
+import time
+import random
+import hashlib
+import logging
+from collections import defaultdict
+from datetime import datetime
+import pytz
+import numpy as np
 from aiogram import Router, types, F
 from aiogram.filters import Command
+from aiogram.filters.callback_data import CallbackData
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-import aiosqlite
-import random
+from repositories import users_repo, cards_repo, shop_repo, UniverseCatalog, ShopItemRow
+from utils.alias_sampler import AliasSampler
 
 shop_router = Router()
 
@@ -14,56 +24,170 @@ RARITY_WEIGHTS = {
     "легендарная": 4,
     "мифическая": 1,
 }
+RARITIES = list(RARITY_WEIGHTS)
+RARITY_SAMPLER = AliasSampler(RARITY_WEIGHTS.values())  # Таблицы строятся один раз при импорте
+RARITY_POINTS = {
+    "обычная": 150,
+    "редкая": 400,
+    "эпическая": 800,
+    "легендарная": 1500,
+    "мифическая": 2500,
+}
+
+# 🔹 Массовая перегенерация магазинов: все выпадения вселенной — одним векторным проходом NumPy
+SHOP_BULK_CHUNK = int(os.getenv("SHOP_BULK_CHUNK", "2000"))  # Пользователей в одной транзакции записи
+SPINS_TIERS = np.array(sorted(SPINS_COST))
+SPINS_PRICES = np.array([SPINS_COST[spins] for spins in SPINS_TIERS])
+RARITY_PROBABILITIES = np.array(list(RARITY_WEIGHTS.values()), dtype=float) / sum(RARITY_WEIGHTS.values())
+RARITY_PRICES = np.array([RARITY_POINTS[rarity] * 2 for rarity in RARITIES])
+
+# 🔹 Режим магазина: "daily" — ассортимент на день выводится из (пользователь, вселенная, день)
+# при открытии /shop и не хранится (хранятся только покупки); "stored" — ассортимент в user_shop,
+# перегенерация — /update_shop
+SHOP_MODE_DAILY = "daily"
+SHOP_MODE_STORED = "stored"
+SHOP_MODE = os.getenv("SHOP_MODE", SHOP_MODE_DAILY)
+SHOP_TIMEZONE = pytz.timezone(os.getenv("SHOP_TIMEZONE", "Europe/Moscow"))  # Новый ассортимент — в полночь по этому поясу
+# Ключ хэша (до 64 байт): без него ассортимент на любой день можно посчитать заранее по открытому коду
+SHOP_SEED_KEY = os.getenv("SHOP_SEED_KEY", "").encode()
+SLOT_SPINS, SLOT_RARITY, SLOT_CARD = 0, 1, 2
+
+
+class ShopBuyCallback(CallbackData, prefix="shop_buy"):
+    """Покупка слота ежедневного магазина. value — показанный товар: каталог мог измениться с показа."""
+    day: int
+    slot: int
+    value: str
 
 async def generate_user_shop(user_id: int, universe: str):
     """Асинхронная генерация товаров в магазине пользователя."""
-    async with aiosqlite.connect("bot_database.db") as db:
-        await db.execute("DELETE FROM user_shop WHERE user_id = ? AND universe_id = ?", (user_id, universe))
-
-        spins = random.randint(3, 8)
-        spins_price = SPINS_COST[spins]
-        await db.execute("""
-            INSERT INTO user_shop (user_id, universe_id, item_type, item_value, price)
-            VALUES (?, ?, 'spins', ?, ?)
-        """, (user_id, universe, spins, spins_price))
-
-        rarity = random.choices(list(RARITY_WEIGHTS.keys()), weights=RARITY_WEIGHTS.values(), k=1)[0]
-        rarity_price = calculate_rarity_price(rarity)
-        await db.execute("""
-            INSERT INTO user_shop (user_id, universe_id, item_type, item_value, price)
-            VALUES (?, ?, 'rarity_guarantee', ?, ?)
-        """, (user_id, universe, rarity, rarity_price))
-
-        async with db.execute(f"SELECT card_id, name, rarity, points FROM [{universe}]") as cursor:
-            cards = await cursor.fetchall()
-            if cards:
-                card_id, card_name, rarity, points = random.choice(cards)
-                card_price = points * 3
-                await db.execute("""
-                    INSERT INTO user_shop (user_id, universe_id, item_type, item_value, price)
-                    VALUES (?, ?, 'specific_card', ?, ?)
-                """, (user_id, universe, card_id, card_price))
-
-        await db.commit()
+    spins = random.randint(3, 8)
+    items = [("spins", spins, SPINS_COST[spins])]
+
+    rarity = RARITIES[RARITY_SAMPLER.draw()]
+    items.append(("rarity_guarantee", rarity, calculate_rarity_price(rarity)))
+
+    cards = (await cards_repo.snapshot(universe)).cards
+    if cards:
+        card = random.choice(cards)
+        items.append(("specific_card", card.card_id, card.points * 3))
+
+    await shop_repo.replace_items(user_id, universe, items)
 
 def calculate_rarity_price(rarity: str) -> int:
     """Возвращает цену гарантированной карты определенной редкости."""
-    rarity_points = {
-        "обычная": 150,
-        "редкая": 400,
-        "эпическая": 800,
-        "легендарная": 1500,
-        "мифическая": 2500,
-    }
-    return rarity_points[rarity] * 2
-
-async def update_all_shops():
-    """Асинхронное обновление магазинов всех пользователей."""
-    async with aiosqlite.connect("bot_database.db") as db:
-        async with db.execute("SELECT user_id, selected_universe FROM users WHERE selected_universe IS NOT NULL") as cursor:
-            users = await cursor.fetchall()
-            for user_id, universe in users:
-                await generate_user_shop(user_id, universe)
+    return RARITY_POINTS[rarity] * 2
+
+def draw_shops(user_ids: list[int], catalog: UniverseCatalog, rng: np.random.Generator) -> list[tuple]:
+    """
+    Ассортимент для пачки пользователей одной вселенной (как generate_user_shop, но все
+    выпадения — массивами NumPy за один проход).
+    :return: Строки (user_id, item_type, item_value, price) в порядке показа в магазине.
+    """
+    count = len(user_ids)
+    tiers = rng.integers(0, len(SPINS_TIERS), count)
+    rarities = rng.choice(len(RARITIES), size=count, p=RARITY_PROBABILITIES)
+    columns = [
+        SPINS_TIERS[tiers].tolist(), SPINS_PRICES[tiers].tolist(),  # tolist(): драйверы БД ждут int, а не numpy.int64
+        [RARITIES[i] for i in rarities.tolist()], RARITY_PRICES[rarities].tolist(),
+    ]
+
+    rows = []
+    if catalog.cards:
+        picks = rng.integers(0, len(catalog.cards), count)
+        card_ids = np.fromiter((card.card_id for card in catalog.cards), dtype=np.int64, count=len(catalog.cards))
+        card_prices = np.fromiter((card.points * 3 for card in catalog.cards), dtype=np.int64, count=len(catalog.cards))
+        for user_id, spins, spins_price, rarity, rarity_price, card_id, card_price in zip(
+                user_ids, *columns, card_ids[picks].tolist(), card_prices[picks].tolist()):
+            rows += (
+                (user_id, "spins", spins, spins_price),
+                (user_id, "rarity_guarantee", rarity, rarity_price),
+                (user_id, "specific_card", card_id, card_price),
+            )
+    else:
+        for user_id, spins, spins_price, rarity, rarity_price in zip(user_ids, *columns):
+            rows += ((user_id, "spins", spins, spins_price), (user_id, "rarity_guarantee", rarity, rarity_price))
+    return rows
+
+def shop_day(now: datetime | None = None) -> int:
+    """Номер дня магазина (порядковый номер даты в SHOP_TIMEZONE)."""
+    return (now or datetime.now(SHOP_TIMEZONE)).date().toordinal()
+
+def shop_rng(user_id: int, universe: str, day: int) -> random.Random:
+    """Генератор, засеянный (пользователь, вселенная, день): одинаковый в любом процессе и после перезапуска."""
+    digest = hashlib.blake2b(f"{user_id}:{universe}:{day}".encode(), digest_size=8, key=SHOP_SEED_KEY).digest()
+    return random.Random(int.from_bytes(digest, "big"))
+
+def daily_offer(user_id: int, universe: str, day: int, catalog: UniverseCatalog) -> list[ShopItemRow]:
+    """
+    Ассортимент ежедневного магазина: те же товары и веса, что у generate_user_shop, но выпадения —
+    из shop_rng, поэтому весь день пользователь видит один и тот же набор. item_id — номер слота.
+    """
+    rng = shop_rng(user_id, universe, day)
+    spins = rng.randint(3, 8)
+    rarity = RARITIES[RARITY_SAMPLER.draw(rng)]
+    items = [
+        ShopItemRow(SLOT_SPINS, "spins", spins, SPINS_COST[spins]),
+        ShopItemRow(SLOT_RARITY, "rarity_guarantee", rarity, calculate_rarity_price(rarity)),
+    ]
+    if catalog.cards:
+        card = catalog.cards[rng.randrange(len(catalog.cards))]  # Снимок каталога упорядочен по card_id
+        items.append(ShopItemRow(SLOT_CARD, "specific_card", card.card_id, card.points * 3))
+    return items
+
+async def shop_items(user_id: int, universe: str) -> list[tuple[ShopItemRow, str]]:
+    """:return: Товары магазина пользователя (ещё не купленные) с callback_data кнопки покупки."""
+    if SHOP_MODE == SHOP_MODE_STORED:
+        items = await shop_repo.items(user_id, universe)
+        if not items:
+            await generate_user_shop(user_id, universe)
+            items = await shop_repo.items(user_id, universe)
+        return [(item, f"buy_{item.item_id}") for item in items]
+
+    day = shop_day()
+    purchased = await shop_repo.purchased_slots(user_id, universe, day)
+    return [
+        (item, ShopBuyCallback(day=day, slot=item.item_id, value=str(item.item_value)).pack())
+        for item in daily_offer(user_id, universe, day, await cards_repo.snapshot(universe))
+        if item.item_id not in purchased
+    ]
+
+async def prune_shop_purchases() -> int:
+    """Удаляет покупки ежедневных магазинов старше вчерашнего дня (кнопки прошлых дней уже не работают)."""
+    removed = await shop_repo.prune_purchases(shop_day() - 1)
+    logging.info(f"🧹 Покупки прошлых дней магазина удалены: {removed}")
+    return removed
+
+async def update_all_shops(chunk: int = SHOP_BULK_CHUNK, seed: int | None = None) -> dict:
+    """
+    Обновление магазинов всех пользователей: пользователи группируются по вселенной,
+    ассортимент каждой группы разыгрывается одним векторным проходом по снимку каталога,
+    запись — executemany пачками по `chunk` пользователей в транзакции.
+    :return: Статистика: пользователи, товары, секунды, пользователей в секунду.
+    """
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    by_universe = defaultdict(list)
+    for user_id, universe in await users_repo.with_universe():
+        by_universe[universe].append(user_id)
+    total = sum(len(user_ids) for user_ids in by_universe.values())
+
+    done = items = 0
+    for universe, user_ids in by_universe.items():
+        catalog = await cards_repo.snapshot(universe)
+        for start in range(0, len(user_ids), chunk):
+            batch = user_ids[start:start + chunk]
+            rows = draw_shops(batch, catalog, rng)
+            await shop_repo.replace_many(universe, batch, rows)
+            done += len(batch)
+            items += len(rows)
+            elapsed = time.perf_counter() - started
+            logging.info(f"🛒 Магазины: {done}/{total} пользователей, {done / elapsed:.0f} польз./с")
+
+    elapsed = time.perf_counter() - started
+    stats = {"users": done, "items": items, "seconds": elapsed, "users_per_second": done / elapsed if elapsed else 0.0}
+    logging.info(f"✅ Магазины обновлены: {stats}")
+    return stats
 
 @shop_router.message(Command("shop"))
 @shop_router.message(F.text.lower() == "магазин")
@@ -71,31 +195,14 @@ async def show_shop(message: types.Message):
     """Показывает магазин пользователя."""
     user_id = message.from_user.id
 
-    async with aiosqlite.connect("bot_database.db") as db:
-        async with db.execute("SELECT selected_universe, total_points FROM users WHERE user_id = ?", (user_id,)) as cursor:
-            user_data = await cursor.fetchone()
-
-        if not user_data or not user_data[0]:
-            await message.answer("❌ Вы не выбрали вселенную. Используйте /select_universe для выбора.")
-            return
+    user = await users_repo.get(user_id)
+    if not user or not user.selected_universe:
+        await message.answer("❌ Вы не выбрали вселенную. Используйте /select_universe для выбора.")
+        return
 
-        selected_universe, user_balance = user_data
+    selected_universe, user_balance = user.selected_universe, user.total_points
 
-        async with db.execute("""
-            SELECT item_id, item_type, item_value, price 
-            FROM user_shop 
-            WHERE user_id = ? AND universe_id = ?
-        """, (user_id, selected_universe)) as cursor:
-            items = await cursor.fetchall()
-
-        if not items:
-            await generate_user_shop(user_id, selected_universe)
-            async with db.execute("""
-                SELECT item_id, item_type, item_value, price 
-                FROM user_shop 
-                WHERE user_id = ? AND universe_id = ?
-            """, (user_id, selected_universe)) as cursor:
-                items = await cursor.fetchall()
+    items = await shop_items(user_id, selected_universe)
 
     shop_text = (
         f"🛒 *Магазин вселенной {selected_universe.capitalize()}*\n"
@@ -105,7 +212,10 @@ async def show_shop(message: types.Message):
 
     keyboard = InlineKeyboardMarkup(inline_keyboard=[])
 
-    for item_id, item_type, item_value, price in items:
+    if not items:
+        shop_text += "Всё куплено — новый ассортимент появится завтра.\n"
+
+    for (item_id, item_type, item_value, price), callback_data in items:
         if item_type == "spins":
             shop_text += f"🔄 Прокрутки: *{item_value} шт.* — *{price}* очков\n"
             button_text = f"🛍 Прокрутки"
@@ -115,19 +225,23 @@ async def show_shop(message: types.Message):
             button_text = f"🛍 Гарант"
 
         elif item_type == "specific_card":
-            async with aiosqlite.connect("bot_database.db") as db:
-                async with db.execute(f"SELECT name FROM [{selected_universe}] WHERE card_id = ?", (item_value,)) as cursor:
-                    card_name = await cursor.fetchone()
-
-            shop_text += f"🃏 Карта: *{card_name[0]}* — *{price}* очков\n"
+            card = await cards_repo.get(selected_universe, int(item_value))
+            shop_text += f"🃏 Карта: *{card.name if card else '—'}* — *{price}* очков\n"
             button_text = f"🛍 Карта"
 
-        keyboard.inline_keyboard.append([InlineKeyboardButton(text=button_text, callback_data=f"buy_{item_id}")])
+        keyboard.inline_keyboard.append([InlineKeyboardButton(text=button_text, callback_data=callback_data)])
 
     await message.answer(shop_text, reply_markup=keyboard, parse_mode="Markdown")
 
 @shop_router.message(Command("update_shop"))
 async def update_shop(message: types.Message):
     """Обновляет магазин пользователей."""
-    await update_all_shops()
-    await message.answer("🔄 Магазин обновлен!")
+    if SHOP_MODE != SHOP_MODE_STORED:
+        await message.answer("🛒 Магазины ежедневные: ассортимент обновляется сам в полночь, перегенерация не нужна.")
+        return
+
+    stats = await update_all_shops()
+    await message.answer(
+        f"🔄 Магазин обновлен! Пользователей: {stats['users']}, товаров: {stats['items']}, "
+        f"{stats['seconds']:.1f} с ({stats['users_per_second']:.0f} польз./с)"
+    )
@@ -1,155 +1,152 @@
-import os
-import aiosqlite
-import asyncio
 from aiogram import Router, types, F
-from aiogram.types import FSInputFile
+from cards.shop import ShopBuyCallback, shop_day, daily_offer
+from repositories import users_repo, cards_repo, shop_repo
+from utils.card_photos import send_card_photo
+from utils.image_store import image_store
 
 shop_callbacks_router = Router()
 
-async def get_user_data(user_id):
-    """🔹 Получает данные пользователя (очки + вселенная)."""
-    async with aiosqlite.connect("bot_database.db") as db:
-        async with db.execute("SELECT total_points, selected_universe FROM users WHERE user_id = ?", (user_id,)) as cursor:
-            return await cursor.fetchone()
-
-async def get_item_data(item_id, user_id):
-    """🔹 Получает данные о товаре в магазине."""
-    async with aiosqlite.connect("bot_database.db") as db:
-        async with db.execute("SELECT item_type, item_value, price FROM user_shop WHERE item_id = ? AND user_id = ?", (item_id, user_id)) as cursor:
-            return await cursor.fetchone()
-
-async def update_user_points(user_id, amount):
-    """🔹 Вычитает очки у пользователя."""
-    async with aiosqlite.connect("bot_database.db") as db:
-        await db.execute("UPDATE users SET total_points = total_points - ? WHERE user_id = ?", (amount, user_id))
-        await db.commit()
-
-async def delete_shop_item(item_id, user_id):
-    """🔹 Удаляет товар из магазина после покупки."""
-    async with aiosqlite.connect("bot_database.db") as db:
-        await db.execute("DELETE FROM user_shop WHERE item_id = ? AND user_id = ?", (item_id, user_id))
-        await db.commit()
-
-async def add_user_card(user_id, card_id, universe):
-    """🔹 Добавляет карту пользователю в инвентарь."""
-    async with aiosqlite.connect("bot_database.db") as db:
-        await db.execute("""
-            INSERT INTO user_cards (user_id, card_id, universe_id, quantity)
-            VALUES (?, ?, ?, 1)
-            ON CONFLICT(user_id, card_id, universe_id) DO UPDATE SET quantity = quantity + 1
-        """, (user_id, card_id, universe))
-        await db.commit()
-
 async def buy_spins(callback, user_id, spins, price):
     """🔹 Покупка прокруток."""
-    async with aiosqlite.connect("bot_database.db") as db:
-        await db.execute("UPDATE users SET spins = spins + ?, total_points = total_points - ? WHERE user_id = ?", (spins, price, user_id))
-        await db.commit()
+    if not await shop_repo.purchase_spins(user_id, spins, price):
+        await callback.answer("❌ Ошибка: у вас недостаточно очков.", show_alert=True)
+        return False
 
     await callback.message.answer(f"🎰 Вы купили {spins} прокруток!")
     await callback.answer("Покупка успешно завершена!", show_alert=False)
+    return True
 
 async def buy_card(callback, user_id, selected_universe, rarity, price):
     """🔹 Покупка случайной карты с заданной редкостью."""
-    async with aiosqlite.connect("bot_database.db") as db:
-        async with db.execute(f"""
-            SELECT card_id, name, photo_path, rarity, points
-            FROM [{selected_universe}]
-            WHERE rarity = ?
-            ORDER BY RANDOM()
-            LIMIT 1
-        """, (rarity,)) as cursor:
-            card = await cursor.fetchone()
+    card = await cards_repo.random_by_rarity(selected_universe, rarity)
 
     if not card:
         await callback.answer("❌ Ошибка: карта не найдена. Обратитесь к администратору.", show_alert=True)
-        return
+        return False
 
-    card_id, card_name, photo_path, rarity, points = card
-    await add_user_card(user_id, card_id, selected_universe)
-    await update_user_points(user_id, price)
+    card_name, photo_path, rarity, points = card.name, card.photo_path, card.rarity, card.points
+    if not await shop_repo.purchase_card(user_id, selected_universe, card.card_id, price):
+        await callback.answer("❌ Ошибка: у вас недостаточно очков.", show_alert=True)
+        return False
 
-    if not os.path.isfile(photo_path):
+    if not await image_store.exists(photo_path):
         await callback.answer("❌ Ошибка: изображение карты не найдено.", show_alert=True)
-        return
+        return True
 
-    photo_file = await asyncio.to_thread(FSInputFile, photo_path)
-
-    await callback.message.answer_photo(
-        photo=photo_file,
+    await send_card_photo(photo_path, lambda photo: callback.message.answer_photo(
+        photo=photo,
         caption=f"📜 Вы получили карту:\n🏷️ *{card_name}*\n🎲 *{rarity.capitalize()}*\n💎 *{points}*",
         parse_mode="Markdown"
-    )
+    ))
+    return True
 
 async def buy_specific_card(callback, user_id, selected_universe, card_id, price):
     """🔹 Покупка конкретной карты."""
-    async with aiosqlite.connect("bot_database.db") as db:
-        async with db.execute(f"""
-            SELECT card_id, name, photo_path, rarity, points
-            FROM [{selected_universe}]
-            WHERE card_id = ?
-        """, (card_id,)) as cursor:
-            card = await cursor.fetchone()
+    card = await cards_repo.get(selected_universe, int(card_id))
 
     if not card:
         await callback.answer("❌ Ошибка: карта не найдена.", show_alert=True)
-        return
+        return False
 
-    card_id, card_name, photo_path, rarity, points = card
-    await add_user_card(user_id, card_id, selected_universe)
-    await update_user_points(user_id, price)
+    card_name, photo_path, rarity, points = card.name, card.photo_path, card.rarity, card.points
+    if not await shop_repo.purchase_card(user_id, selected_universe, card.card_id, price):
+        await callback.answer("❌ Ошибка: у вас недостаточно очков.", show_alert=True)
+        return False
 
-    if not os.path.isfile(photo_path):
+    if not await image_store.exists(photo_path):
         await callback.answer("❌ Ошибка: изображение карты не найдено.", show_alert=True)
-        return
+        return True
 
-    photo_file = await asyncio.to_thread(FSInputFile, photo_path)
-
-    await callback.message.answer_photo(
-        photo=photo_file,
+    await send_card_photo(photo_path, lambda photo: callback.message.answer_photo(
+        photo=photo,
         caption=f"📜 Вы купили карту:\n🏷️ *{card_name}*\n🎲 *{rarity.capitalize()}*\n💎 *{points}*",
         parse_mode="Markdown"
-    )
+    ))
+    return True
+
+async def buy_item(callback, user_id, selected_universe, item) -> bool:
+    """🔹 Выдаёт товар и списывает очки. :return: False, если покупка не состоялась."""
+    if item.item_type == "spins":
+        return await buy_spins(callback, user_id, int(item.item_value), item.price)
+
+    if item.item_type == "rarity_guarantee":
+        return await buy_card(callback, user_id, selected_universe, item.item_value, item.price)
+
+    if item.item_type == "specific_card":
+        return await buy_specific_card(callback, user_id, selected_universe, int(item.item_value), item.price)
+
+    await callback.answer("❌ Ошибка: неизвестный тип товара.", show_alert=True)
+    return False
+
+async def buyer(callback: types.CallbackQuery):
+    """🔹 Профиль покупателя с выбранной вселенной (или None — ошибка уже показана)."""
+    user = await users_repo.get(callback.from_user.id)
+    if not user:
+        await callback.answer("❌ Ошибка: профиль не найден. Используйте /start.", show_alert=True)
+        return None
+
+    if not user.selected_universe:
+        await callback.answer("❌ Ошибка: вы не выбрали вселенную. Используйте /select_universe.", show_alert=True)
+        return None
+    return user
 
 @shop_callbacks_router.callback_query(F.data.startswith("buy_"))
 async def handle_purchase(callback: types.CallbackQuery):
-    """🔹 Обработчик покупки в магазине."""
+    """🔹 Обработчик покупки в магазине (хранимый ассортимент user_shop)."""
     user_id = callback.from_user.id
     item_id = int(callback.data.split("_")[1])
 
-    user_data = await get_user_data(user_id)
-    if not user_data:
-        await callback.answer("❌ Ошибка: профиль не найден. Используйте /start.", show_alert=True)
+    user = await buyer(callback)
+    if not user:
         return
 
-    total_points, selected_universe = user_data
-    if not selected_universe:
-        await callback.answer("❌ Ошибка: вы не выбрали вселенную. Используйте /select_universe.", show_alert=True)
+    item = await shop_repo.item(item_id, user_id)
+    if not item:
+        await callback.answer("❌ Ошибка: товар не найден или уже куплен.", show_alert=True)
         return
 
-    item_data = await get_item_data(item_id, user_id)
-    if not item_data:
-        await callback.answer("❌ Ошибка: товар не найден или уже куплен.", show_alert=True)
+    if user.total_points < item.price:
+        await callback.answer("❌ Ошибка: у вас недостаточно очков.", show_alert=True)
         return
 
-    item_type, item_value, price = item_data
+    if not await buy_item(callback, user_id, user.selected_universe, item):
+        return
 
-    if total_points < price:
-        await callback.answer("❌ Ошибка: у вас недостаточно очков.", show_alert=True)
+    await shop_repo.delete_item(item_id, user_id)
+    await callback.message.edit_text("🛒 Ваш магазин обновлен. Используйте /shop для просмотра ассортимента.")
+
+@shop_callbacks_router.callback_query(ShopBuyCallback.filter())
+async def handle_daily_purchase(callback: types.CallbackQuery, callback_data: ShopBuyCallback):
+    """🔹 Обработчик покупки в ежедневном магазине: товар выводится заново из (пользователь, вселенная, день)."""
+    user_id = callback.from_user.id
+    day, slot = callback_data.day, callback_data.slot
+
+    user = await buyer(callback)
+    if not user:
+        return
+    selected_universe = user.selected_universe
+
+    if day != shop_day():
+        await callback.answer("🕛 Ассортимент уже обновился. Используйте /shop.", show_alert=True)
         return
 
-    if item_type == "spins":
-        await buy_spins(callback, user_id, int(item_value), price)
+    offer = daily_offer(user_id, selected_universe, day, await cards_repo.snapshot(selected_universe))
+    item = next((item for item in offer if item.item_id == slot), None)
+    if not item or str(item.item_value) != callback_data.value:
+        await callback.answer("❌ Ассортимент изменился. Используйте /shop.", show_alert=True)
+        return
 
-    elif item_type == "rarity_guarantee":
-        await buy_card(callback, user_id, selected_universe, item_value, price)
+    if user.total_points < item.price:
+        await callback.answer("❌ Ошибка: у вас недостаточно очков.", show_alert=True)
+        return
 
-    elif item_type == "specific_card":
-        await buy_specific_card(callback, user_id, selected_universe, item_value, price)
+    # Слот отмечается купленным до списания очков: повторное нажатие не купит товар дважды
+    if not await shop_repo.claim_slot(user_id, selected_universe, day, slot):
+        await callback.answer("❌ Ошибка: товар уже куплен.", show_alert=True)
+        return
 
-    else:
-        await callback.answer("❌ Ошибка: неизвестный тип товара.", show_alert=True)
+    if not await buy_item(callback, user_id, selected_universe, item):
+        await shop_repo.release_slot(user_id, selected_universe, day, slot)
         return
 
-    await delete_shop_item(item_id, user_id)
     await callback.message.edit_text("🛒 Ваш магазин обновлен. Используйте /shop для просмотра ассортимента.")
@@ -1,7 +1,7 @@
 from aiogram import Router, types, F
 from aiogram.filters import Command
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
-import aiosqlite
+from repositories import users_repo
 
 AVAILABLE_UNIVERSES = ["marvel", "star_wars", "dc"]
 
@@ -10,17 +10,12 @@ universechoice_router = Router()
 
 async def get_user_universe(user_id: int) -> str | None:
     """Получаем выбранную вселенную пользователя из базы данных."""
-    async with aiosqlite.connect("bot_database.db") as db:
-        async with db.execute("SELECT selected_universe FROM users WHERE user_id = ?", (user_id,)) as cursor:
-            result = await cursor.fetchone()
-    return result[0] if result else None
+    return await users_repo.get_universe(user_id)
 
 
 async def set_user_universe(user_id: int, universe: str):
     """Сохраняем выбранную вселенную пользователя в базе данных."""
-    async with aiosqlite.connect("bot_database.db") as db:
-        await db.execute("UPDATE users SET selected_universe = ? WHERE user_id = ?", (universe, user_id))
-        await db.commit()
+    await users_repo.set_universe(user_id, universe)
 
 
 # Команда для выбора вселенной
@@ -1,10 +1,394 @@
-import aiosqlite
+import os
+import time
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+import aiosqlite
+
+from dabase.write_queue import WriteQueue
+from dabase.migrations import run_migrations
 
 DB_PATH = "bot_database.db"
+DB_BACKEND = os.getenv("DB_BACKEND", "sqlite").lower()  # sqlite | postgres (см. dabase/pg_backend.py)
+
+# 🔹 Настройки пула соединений
+READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "4"))  # Максимум соединений на чтение
+BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))  # Ожидание блокировки SQLite
+ACQUIRE_TIMEOUT = float(os.getenv("DB_ACQUIRE_TIMEOUT", "10"))  # Ожидание свободного соединения (сек)
+STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))  # Подготовленных запросов на соединение
+
+# 🔹 Профиль хранения SQLite (каждый параметр можно переопределить переменной окружения)
+SQLITE_PROFILE = {
+    "journal_mode": os.getenv("DB_JOURNAL_MODE", "WAL"),  # Читатели не блокируются писателем
+    "synchronous": os.getenv("DB_SYNCHRONOUS", "NORMAL"),  # В WAL безопасно и без fsync на каждый commit
+    "mmap_size": int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024))),  # Байт, 0 — отключить
+    "cache_size": int(os.getenv("DB_CACHE_SIZE", "-16384")),  # Отрицательное значение — в КиБ
+    "temp_store": os.getenv("DB_TEMP_STORE", "MEMORY"),
+    "auto_vacuum": os.getenv("DB_AUTO_VACUUM", "INCREMENTAL"),
+}
+
+# PRAGMA, которые действуют только на конкретное соединение
+CONNECTION_PRAGMAS = ("synchronous", "mmap_size", "cache_size", "temp_store")
 
 logging.basicConfig(level=logging.INFO)
 
+# Соединение-писатель, которым владеет текущая задача (для вложенных транзакций)
+_current_writer: ContextVar = ContextVar("current_writer", default=None)
+# Колбэки, которые нужно вызвать после commit текущей транзакции записи
+_after_commit: ContextVar = ContextVar("after_commit", default=None)
+
+
+def run_callbacks(callbacks: list):
+    """Вызывает колбэки after_commit; ошибка одного не мешает остальным."""
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            logging.error(f"❌ Ошибка колбэка после commit: {e}")
+
+
+class ConnectionPool:
+    """Пул соединений SQLite: ограниченный набор читателей и один писатель."""
+    dialect = "sqlite"
+
+    def __init__(self, path: str, readers: int = READ_POOL_SIZE, busy_timeout_ms: int = BUSY_TIMEOUT_MS,
+                 acquire_timeout: float = ACQUIRE_TIMEOUT, profile: dict | None = None):
+        self.path = path
+        self.profile = dict(SQLITE_PROFILE if profile is None else profile)
+        self.max_readers = max(1, readers)
+        self.busy_timeout_ms = busy_timeout_ms
+        self.acquire_timeout = acquire_timeout
+
+        self._idle_readers: asyncio.Queue = asyncio.Queue()
+        self._all_readers: list[aiosqlite.Connection] = []
+        self._reader_slots = asyncio.Semaphore(self.max_readers)
+        self._writer: aiosqlite.Connection | None = None
+        self._writer_lock = asyncio.Lock()
+        self._closed = True
+        self.journal_mode = None
+
+        # Счётчики для мониторинга
+        self.counters = {
+            "reader_acquired": 0,
+            "reader_wait_total": 0.0,
+            "reader_wait_max": 0.0,
+            "writer_acquired": 0,
+            "writer_wait_total": 0.0,
+            "writer_wait_max": 0.0,
+            "timeouts": 0,
+            "opened": 0,
+            "closed": 0,
+        }
+
+    async def _connect(self, readonly: bool) -> aiosqlite.Connection:
+        """Открывает соединение и один раз применяет к нему PRAGMA."""
+        conn = await aiosqlite.connect(self.path, timeout=self.busy_timeout_ms / 1000,
+                                       cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = aiosqlite.Row
+        await conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        for pragma in CONNECTION_PRAGMAS:
+            if self.profile.get(pragma) is not None:
+                await conn.execute(f"PRAGMA {pragma} = {self.profile[pragma]}")
+        if readonly:
+            await conn.execute("PRAGMA query_only = ON")
+        self.counters["opened"] += 1
+        return conn
+
+    async def open(self):
+        """Открывает соединение-писатель. Читатели создаются лениво."""
+        if not self._closed:
+            return
+        self._writer = await self._connect(readonly=False)
+        await self._apply_database_pragmas()
+        self._closed = False
+        logging.info(f"🔌 Пул соединений открыт ({self.path}, читателей до {self.max_readers}).")
+
+    async def _apply_database_pragmas(self):
+        """Применяет PRAGMA, которые сохраняются в самом файле БД (режим журнала, auto_vacuum)."""
+        auto_vacuum = self.profile.get("auto_vacuum")
+        if auto_vacuum:
+            async with self._writer.execute("PRAGMA auto_vacuum") as cursor:
+                current = (await cursor.fetchone())[0]
+            wanted = {"NONE": 0, "FULL": 1, "INCREMENTAL": 2}.get(str(auto_vacuum).upper(), auto_vacuum)
+            if current != wanted:
+                # Для уже созданной БД режим auto_vacuum вступает в силу только после VACUUM
+                logging.info(f"🧹 Переключаем auto_vacuum {current} → {wanted} (однократный VACUUM)...")
+                await self._writer.execute(f"PRAGMA auto_vacuum = {auto_vacuum}")
+                await self._writer.execute("VACUUM")
+
+        journal_mode = self.profile.get("journal_mode")
+        if journal_mode:
+            async with self._writer.execute(f"PRAGMA journal_mode = {journal_mode}") as cursor:
+                self.journal_mode = (await cursor.fetchone())[0]
+            logging.info(f"📒 Режим журнала SQLite: {self.journal_mode}")
+
+    async def close(self):
+        """Закрывает все соединения пула."""
+        if self._closed:
+            return
+        self._closed = True
+
+        async with self._writer_lock:
+            if self._writer is not None:
+                await self._writer.close()
+                self._writer = None
+                self.counters["closed"] += 1
+
+        for conn in self._all_readers:
+            try:
+                await conn.close()
+                self.counters["closed"] += 1
+            except Exception as e:
+                logging.error(f"❌ Ошибка при закрытии соединения: {e}")
+        self._all_readers.clear()
+        self._idle_readers = asyncio.Queue()
+        logging.info("🔌 Пул соединений закрыт.")
+
+    def _account_wait(self, kind: str, started: float):
+        waited = time.perf_counter() - started
+        self.counters[f"{kind}_acquired"] += 1
+        self.counters[f"{kind}_wait_total"] += waited
+        if waited > self.counters[f"{kind}_wait_max"]:
+            self.counters[f"{kind}_wait_max"] = waited
+
+    def _timeout_error(self) -> RuntimeError:
+        self.counters["timeouts"] += 1
+        return RuntimeError("⏳ База данных перегружена, попробуйте ещё раз через несколько секунд.")
+
+    @asynccontextmanager
+    async def reader(self):
+        """Выдаёт соединение только для чтения и возвращает его в пул."""
+        if self._closed:
+            raise RuntimeError("Пул соединений не открыт. Вызовите db_instance.init_db().")
+
+        # Внутри транзакции записи читаем через то же соединение, чтобы видеть свои изменения
+        writer = _current_writer.get()
+        if writer is not None:
+            yield writer
+            return
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._reader_slots.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise self._timeout_error() from None
+        self._account_wait("reader", started)
+
+        try:
+            try:
+                conn = self._idle_readers.get_nowait()
+            except asyncio.QueueEmpty:
+                conn = await self._connect(readonly=True)
+                self._all_readers.append(conn)
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    await conn.rollback()
+                self._idle_readers.put_nowait(conn)
+        finally:
+            self._reader_slots.release()
+
+    @asynccontextmanager
+    async def writer(self):
+        """
+        Выдаёт единственное соединение на запись.
+        При выходе без ошибок фиксирует транзакцию, при исключении — откатывает.
+        Вложенные вызовы из той же задачи используют уже открытую транзакцию.
+        """
+        if self._closed:
+            raise RuntimeError("Пул соединений не открыт. Вызовите db_instance.init_db().")
+
+        current = _current_writer.get()
+        if current is not None:
+            yield current
+            return
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._writer_lock.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise self._timeout_error() from None
+        self._account_wait("writer", started)
+
+        callbacks = []
+        token = _current_writer.set(self._writer)
+        callbacks_token = _after_commit.set(callbacks)
+        try:
+            yield self._writer
+            await self._writer.commit()
+        except BaseException:
+            await self._writer.rollback()
+            raise
+        finally:
+            _after_commit.reset(callbacks_token)
+            _current_writer.reset(token)
+            self._writer_lock.release()
+        run_callbacks(callbacks)
+
+    def in_transaction(self) -> bool:
+        """Выполняется ли текущая задача внутри writer()."""
+        return _current_writer.get() is not None
+
+    def after_commit(self, callback):
+        """Вызывает callback после commit текущей транзакции записи (вне транзакции — сразу)."""
+        callbacks = _after_commit.get()
+        if callbacks is None:
+            run_callbacks([callback])
+        else:
+            callbacks.append(callback)
+
+    async def create_schema(self, db):
+        """Создаёт таблицы, индексы и стандартные вселенные (схема до миграций)."""
+        # Создаём таблицы
+        await db.executescript("""
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY,
+            username TEXT,
+            registration_date TEXT,
+            selected_universe TEXT DEFAULT NULL,
+            is_blacklisted BOOLEAN DEFAULT 0,
+            last_card_time TEXT DEFAULT NULL,
+            total_points INTEGER DEFAULT 0,
+            spins INTEGER DEFAULT 0,
+            last_claimed TEXT DEFAULT NULL,
+            daily_streak INTEGER DEFAULT 0,
+            referral_code TEXT UNIQUE,
+            referred_by INTEGER DEFAULT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS universes (
+            universe_id TEXT PRIMARY KEY,
+            name TEXT,
+            enabled BOOLEAN DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS user_cards (
+            user_id INTEGER,
+            card_id INTEGER,
+            universe_id TEXT,
+            quantity INTEGER DEFAULT 1,
+            PRIMARY KEY (user_id, card_id, universe_id),
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            FOREIGN KEY (universe_id) REFERENCES universes (universe_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS user_shop (
+            user_id INTEGER,
+            universe_id TEXT,
+            item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_type TEXT,
+            item_value TEXT,
+            price INTEGER,
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            FOREIGN KEY (universe_id) REFERENCES universes (universe_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS promocodes (
+            promocode TEXT PRIMARY KEY,
+            spins_bonus INTEGER,
+            usage_limit INTEGER,
+            usage_count INTEGER DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS user_promocodes (
+            user_id INTEGER,
+            promocode TEXT,
+            PRIMARY KEY (user_id, promocode),
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            FOREIGN KEY (promocode) REFERENCES promocodes (promocode)
+        );
+
+        CREATE TABLE IF NOT EXISTS referrals (
+            referral_id INTEGER PRIMARY KEY,
+            referrer_id INTEGER,
+            joined_date TEXT,
+            cards_collected INTEGER DEFAULT 0,
+            is_valid BOOLEAN DEFAULT 0,
+            FOREIGN KEY (referral_id) REFERENCES users (user_id),
+            FOREIGN KEY (referrer_id) REFERENCES users (user_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS moderation (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chat_id INTEGER,
+            user_id INTEGER,
+            username TEXT DEFAULT NULL,
+            mute_until INTEGER DEFAULT 0,
+            ban_until INTEGER DEFAULT 0,
+            ban_status BOOLEAN DEFAULT 0,
+            reason TEXT,
+            moderator_id INTEGER,
+            timestamp INTEGER DEFAULT (strftime('%s', 'now'))
+        );
+
+        CREATE TABLE IF NOT EXISTS warns_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chat_id INTEGER,
+            user_id INTEGER,
+            reason TEXT,
+            moderator_id INTEGER,
+            timestamp INTEGER,
+            expire_at INTEGER,
+            FOREIGN KEY (chat_id, user_id) REFERENCES moderation (chat_id, user_id) ON DELETE CASCADE
+        );
+
+        CREATE TABLE IF NOT EXISTS chat_users (
+            user_id INTEGER,
+            chat_id INTEGER,
+            username TEXT,
+            full_name TEXT,
+            left BOOLEAN DEFAULT 0,
+            PRIMARY KEY (user_id, chat_id)
+        );
+        """)
+
+        # Добавляем индексы для оптимизации запросов
+        await db.executescript("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_moderation ON moderation(chat_id, user_id);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_warns ON warns_log(chat_id, user_id, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_chat_users_chat_id ON chat_users(chat_id);
+        CREATE INDEX IF NOT EXISTS idx_chat_users_user_id ON chat_users(user_id);
+        """)
+
+        # Добавляем начальные вселенные, если их нет
+        logging.info("🌌 Добавляем стандартные вселенные...")
+        await db.executemany("""
+            INSERT OR IGNORE INTO universes (universe_id, name, enabled)
+            VALUES (?, ?, ?)
+        """, [
+            ("marvel", "Marvel", 1),
+            ("star_wars", "Star Wars", 1),
+        ])
+
+    async def get_schema_version(self, db) -> int:
+        async with db.execute("PRAGMA user_version") as cursor:
+            return (await cursor.fetchone())[0]
+
+    async def set_schema_version(self, db, version: int):
+        await db.execute(f"PRAGMA user_version = {int(version)}")
+
+    def stats(self) -> dict:
+        """Возвращает снимок счётчиков пула."""
+        stats = dict(self.counters)
+        stats["open_connections"] = len(self._all_readers) + (0 if self._writer is None else 1)
+        stats["idle_readers"] = self._idle_readers.qsize()
+        stats["busy_readers"] = len(self._all_readers) - self._idle_readers.qsize()
+        stats["writer_locked"] = self._writer_lock.locked()
+        return stats
+
+
+def create_pool():
+    """Пул соединений выбранного в DB_BACKEND бэкенда."""
+    if DB_BACKEND == "postgres":
+        from dabase.pg_backend import PgConnectionPool  # asyncpg нужен только для этого бэкенда
+        return PgConnectionPool()
+    if DB_BACKEND != "sqlite":
+        raise ValueError(f"Неизвестный DB_BACKEND: {DB_BACKEND}")
+    return ConnectionPool(DB_PATH)
+
 
 class Database:
     """Класс управления базой данных (Singleton)."""
@@ -12,145 +396,84 @@ class Database:
     def __init__(self):
         """Инициализация объекта без открытия соединения."""
         self.ready = False  # Флаг готовности базы
+        self.pool = create_pool()
+        self.write_queue = WriteQueue(self)  # Групповой коммит частых записей
 
     async def init_db(self):
-        """Инициализация базы данных: создание таблиц."""
+        """Инициализация базы данных: создание таблиц и открытие пула соединений."""
         if self.ready:
             logging.info("✅ База данных уже инициализирована.")
             return
 
         logging.info("🚀 Запуск инициализации базы данных...")
 
-        async with aiosqlite.connect(DB_PATH) as db:
-            db.row_factory = aiosqlite.Row  # Доступ к данным через dict-like интерфейс
+        await self.pool.open()
+
+        async with self.pool.writer() as db:
             logging.info("📂 Подключение к БД установлено.")
 
-            # Создаём таблицы
-            await db.executescript("""
-            PRAGMA foreign_keys = ON;
-
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER PRIMARY KEY,
-                username TEXT,
-                registration_date TEXT,
-                selected_universe TEXT DEFAULT NULL,
-                is_blacklisted BOOLEAN DEFAULT 0,
-                last_card_time TEXT DEFAULT NULL,
-                total_points INTEGER DEFAULT 0,
-                spins INTEGER DEFAULT 0,
-                last_claimed TEXT DEFAULT NULL,
-                daily_streak INTEGER DEFAULT 0,
-                referral_code TEXT UNIQUE,
-                referred_by INTEGER DEFAULT NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS universes (
-                universe_id TEXT PRIMARY KEY,
-                name TEXT,
-                enabled BOOLEAN DEFAULT 0
-            );
-
-            CREATE TABLE IF NOT EXISTS user_cards (
-                user_id INTEGER,
-                card_id INTEGER,
-                universe_id TEXT,
-                quantity INTEGER DEFAULT 1,
-                PRIMARY KEY (user_id, card_id, universe_id),
-                FOREIGN KEY (user_id) REFERENCES users (user_id),
-                FOREIGN KEY (universe_id) REFERENCES universes (universe_id)
-            );
-
-            CREATE TABLE IF NOT EXISTS user_shop (
-                user_id INTEGER,
-                universe_id TEXT,
-                item_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                item_type TEXT,
-                item_value TEXT,
-                price INTEGER,
-                FOREIGN KEY (user_id) REFERENCES users (user_id),
-                FOREIGN KEY (universe_id) REFERENCES universes (universe_id)
-            );
-
-            CREATE TABLE IF NOT EXISTS promocodes (
-                promocode TEXT PRIMARY KEY,
-                spins_bonus INTEGER,
-                usage_limit INTEGER,
-                usage_count INTEGER DEFAULT 0
-            );
-
-            CREATE TABLE IF NOT EXISTS referrals (
-                referral_id INTEGER PRIMARY KEY,
-                referrer_id INTEGER,
-                joined_date TEXT,
-                cards_collected INTEGER DEFAULT 0,
-                is_valid BOOLEAN DEFAULT 0,
-                FOREIGN KEY (referral_id) REFERENCES users (user_id),
-                FOREIGN KEY (referrer_id) REFERENCES users (user_id)
-            );
-
-            CREATE TABLE IF NOT EXISTS moderation (
-                id INTEGER PRIMARY KEY AUTOINCREMENT, 
-                chat_id INTEGER, 
-                user_id INTEGER, 
-                username TEXT DEFAULT NULL,
-                mute_until INTEGER DEFAULT 0,
-                ban_until INTEGER DEFAULT 0,  
-                ban_status BOOLEAN DEFAULT 0,
-                reason TEXT, 
-                moderator_id INTEGER, 
-                timestamp INTEGER DEFAULT (strftime('%s', 'now'))
-            );
-
-            CREATE TABLE IF NOT EXISTS warns_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                chat_id INTEGER,
-                user_id INTEGER,
-                reason TEXT,
-                moderator_id INTEGER,
-                timestamp INTEGER,
-                expire_at INTEGER,
-                FOREIGN KEY (chat_id, user_id) REFERENCES moderation (chat_id, user_id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS chat_users (
-                user_id INTEGER,
-                chat_id INTEGER,
-                username TEXT,
-                full_name TEXT,
-                left BOOLEAN DEFAULT 0, 
-                PRIMARY KEY (user_id, chat_id)
-            );
-            """)
-
-            # Добавляем индексы для оптимизации запросов
-            await db.executescript("""
-            CREATE UNIQUE INDEX IF NOT EXISTS idx_moderation ON moderation(chat_id, user_id);
-            CREATE UNIQUE INDEX IF NOT EXISTS idx_warns ON warns_log(chat_id, user_id, timestamp);
-            CREATE INDEX IF NOT EXISTS idx_chat_users_chat_id ON chat_users(chat_id);
-            CREATE INDEX IF NOT EXISTS idx_chat_users_user_id ON chat_users(user_id);
-            """)
-
-            # Добавляем начальные вселенные, если их нет
-            logging.info("🌌 Добавляем стандартные вселенные...")
-            await db.executemany("""
-                INSERT OR IGNORE INTO universes (universe_id, name, enabled)
-                VALUES (?, ?, ?)
-            """, [
-                ("marvel", "Marvel", 1),
-                ("star_wars", "Star Wars", 1),
-            ])
-
-            await db.commit()
+            await self.pool.create_schema(db)
+
+        # Версионированные изменения схемы (PRAGMA user_version / таблица schema_version)
+        version = await run_migrations(self)
+        logging.info(f"🧱 Версия схемы БД: {version}")
+
+        await self.write_queue.start()
 
         self.ready = True
         logging.info("✅ База данных успешно инициализирована.")
 
-    async def get_connection(self):
-        """Создаёт новое соединение с БД."""
-        conn = await aiosqlite.connect(DB_PATH, check_same_thread=False)
-        conn.row_factory = aiosqlite.Row
-        return conn
+    async def close_db(self):
+        """Закрывает все соединения с БД."""
+        await self.write_queue.stop()
+        logging.info(f"📊 Статистика пула соединений: {self.stats()}")
+        if self.ready and self.pool.dialect == "sqlite":
+            try:
+                # Рекомендуемое SQLite обновление статистики перед закрытием
+                async with self.writer() as db:
+                    await db.execute("PRAGMA optimize")
+            except Exception as e:
+                logging.error(f"❌ Ошибка PRAGMA optimize при закрытии БД: {e}")
+        await self.pool.close()
+        self.ready = False
+
+    def reader(self):
+        """Соединение для чтения: `async with db_instance.reader() as db: ...`"""
+        return self.pool.reader()
+
+    def writer(self):
+        """Транзакция записи: `async with db_instance.writer() as db: ...` (commit при выходе)."""
+        return self.pool.writer()
+
+    def in_transaction(self) -> bool:
+        """True внутри `async with db_instance.writer()` текущей задачи."""
+        return self.pool.in_transaction()
+
+    def after_commit(self, callback):
+        """Откладывает callback до commit текущей транзакции (например, обновление кэшей)."""
+        self.pool.after_commit(callback)
+
+    def enqueue(self, sql: str, params: tuple = ()):
+        """Отложенная запись без ожидания: попадёт в ближайший групповой коммит."""
+        self.write_queue.enqueue(sql, params)
+
+    async def execute_write(self, sql: str, params: tuple = ()) -> int:
+        """Отложенная запись с ожиданием фиксации (внутри writer() — сразу). Возвращает число затронутых строк."""
+        return await self.write_queue.execute(sql, params)
+
+    async def execute_write_group(self, statements: list[tuple[str, tuple]], guard: int | None = None) -> list[int] | None:
+        """
+        Отложенная запись нескольких запросов одной неделимой группой (все или ни одного).
+        Если запрос с индексом guard не затронул строк, группа откатывается и возвращается None.
+        """
+        return await self.write_queue.execute_group(statements, guard)
+
+    def stats(self) -> dict:
+        """Статистика пула соединений и очереди записи."""
+        stats = self.pool.stats()
+        stats["write_queue"] = self.write_queue.stats()
+        return stats
 
 
 # Создаём единственный экземпляр БД
-db_instance = Database()
\ No newline at end of file
+db_instance = Database()
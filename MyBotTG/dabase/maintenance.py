@@ -0,0 +1,82 @@
+import os
+import logging
+from dabase.database import db_instance
+
+logging.basicConfig(level=logging.INFO)
+
+# 🔹 Расписание обслуживания БД (в минутах, 0 — задача отключена)
+CHECKPOINT_PASSIVE_MINUTES = int(os.getenv("DB_CHECKPOINT_PASSIVE_MINUTES", "5"))
+CHECKPOINT_TRUNCATE_MINUTES = int(os.getenv("DB_CHECKPOINT_TRUNCATE_MINUTES", "60"))
+OPTIMIZE_MINUTES = int(os.getenv("DB_OPTIMIZE_MINUTES", "360"))
+VACUUM_MINUTES = int(os.getenv("DB_VACUUM_MINUTES", "1440"))
+
+# Сколько свободных страниц освобождать за один проход incremental_vacuum
+VACUUM_PAGES = int(os.getenv("DB_VACUUM_PAGES", "2000"))
+
+
+async def wal_checkpoint(mode: str = "PASSIVE") -> tuple | None:
+    """
+    Переносит страницы из WAL-файла в основной файл БД.
+    PASSIVE не мешает читателям и писателю, TRUNCATE дополнительно обрезает WAL до нуля.
+    :return: (busy, страниц в WAL, перенесено страниц) или None, если БД не в режиме WAL.
+    """
+    if (db_instance.pool.journal_mode or "").lower() != "wal":
+        return None
+
+    async with db_instance.writer() as db:
+        async with db.execute(f"PRAGMA wal_checkpoint({mode})") as cursor:
+            busy, log_pages, checkpointed = await cursor.fetchone()
+
+    logging.info(f"📒 WAL checkpoint ({mode}): busy={busy}, в журнале={log_pages}, перенесено={checkpointed}")
+    return busy, log_pages, checkpointed
+
+
+async def optimize_db(analyze: bool = False):
+    """Обновляет статистику планировщика запросов (PRAGMA optimize или полный ANALYZE)."""
+    async with db_instance.writer() as db:
+        await db.execute("ANALYZE" if analyze else "PRAGMA optimize")
+    logging.info(f"📈 Статистика планировщика обновлена ({'ANALYZE' if analyze else 'PRAGMA optimize'}).")
+
+
+async def incremental_vacuum(pages: int = VACUUM_PAGES) -> tuple[int, int]:
+    """
+    Возвращает ОС до `pages` свободных страниц (работает при auto_vacuum = INCREMENTAL).
+    :return: (свободных страниц до прохода, после прохода).
+    """
+    async with db_instance.writer() as db:
+        async with db.execute("PRAGMA freelist_count") as cursor:
+            free_before = (await cursor.fetchone())[0]
+        free_after = free_before
+        if free_before:
+            # execute() модуля sqlite3 делает один шаг прагмы — это одна страница;
+            # executescript выполняет её до конца (транзакции здесь нет: PRAGMA её не открывает)
+            await db.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+            async with db.execute("PRAGMA freelist_count") as cursor:
+                free_after = (await cursor.fetchone())[0]
+
+    if free_before:
+        logging.info(f"🧹 incremental_vacuum: свободных страниц было {free_before}, стало {free_after} "
+                     f"(лимит за проход {pages}).")
+    return free_before, free_after
+
+
+def register_maintenance_jobs(scheduler):
+    """Регистрирует фоновые задачи обслуживания SQLite в планировщике."""
+    if db_instance.pool.dialect != "sqlite":
+        logging.info("🛠 Обслуживание БД выполняет сам PostgreSQL (autovacuum) — задачи не регистрируем.")
+        return
+
+    jobs = [
+        (wal_checkpoint, CHECKPOINT_PASSIVE_MINUTES, ["PASSIVE"], "db_checkpoint_passive"),
+        (wal_checkpoint, CHECKPOINT_TRUNCATE_MINUTES, ["TRUNCATE"], "db_checkpoint_truncate"),
+        (optimize_db, OPTIMIZE_MINUTES, [], "db_optimize"),
+        (incremental_vacuum, VACUUM_MINUTES, [], "db_incremental_vacuum"),
+    ]
+
+    for func, minutes, args, job_id in jobs:
+        if minutes <= 0:
+            continue
+        scheduler.add_job(func, "interval", minutes=minutes, args=args, id=job_id,
+                          replace_existing=True, max_instances=1, coalesce=True, misfire_grace_time=60)
+
+    logging.info("🛠 Задачи обслуживания БД зарегистрированы в планировщике.")
@@ -0,0 +1,267 @@
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+# 🔹 Версионированные миграции схемы.
+# Номер применённой версии хранится в PRAGMA user_version файла SQLite
+# (в PostgreSQL — в таблице schema_version, см. pool.get_schema_version).
+# Каждая миграция выполняется в отдельной транзакции вместе с обновлением версии,
+# поэтому при ошибке БД остаётся на предыдущей версии.
+# Схема PostgreSQL создаётся сразу в версии PG_BASE_SCHEMA_VERSION; миграции новее неё
+# выполняются на обоих бэкендах (различия диалектов — через dialect_of(db)).
+MIGRATIONS: list[tuple[int, str, object]] = []
+
+
+def migration(version: int, description: str):
+    """Декоратор регистрации миграции: `@migration(2, "описание")`."""
+    def decorator(func):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda item: item[0])
+        return func
+    return decorator
+
+
+def dialect_of(db) -> str:
+    """'sqlite' или 'postgres' — диалект соединения, переданного в миграцию."""
+    return getattr(db, "dialect", "sqlite")
+
+
+async def table_columns(db, table: str) -> list[str]:
+    """Список колонок таблицы (пустой, если таблицы нет)."""
+    async with db.execute(f"PRAGMA table_info([{table}])") as cursor:
+        return [row[1] for row in await cursor.fetchall()]
+
+
+async def run_migrations(database) -> int:
+    """
+    Применяет все миграции новее текущей версии схемы.
+    :return: Версия схемы после миграций.
+    """
+    pool = database.pool
+    async with database.writer() as db:
+        current = await pool.get_schema_version(db)
+
+    for version, description, func in MIGRATIONS:
+        if version <= current:
+            continue
+
+        logging.info(f"🧱 Миграция {version}: {description}...")
+        async with database.writer() as db:
+            # DDL в модуле sqlite3 не открывает транзакцию сам — открываем явно
+            if not db.in_transaction:
+                await db.execute("BEGIN")
+            await func(db)
+            await pool.set_schema_version(db, version)
+        current = version
+        logging.info(f"✅ Миграция {version} применена.")
+
+    return current
+
+
+# ==============================
+# 🔹 Миграции
+# ==============================
+
+LEGACY_CARD_COLUMNS = ("card_id", "name", "rarity", "attack", "hp", "points")
+
+
+@migration(1, "общая таблица cards вместо таблицы на каждую вселенную")
+async def migrate_unified_cards(db):
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS cards (
+            universe_id TEXT NOT NULL,
+            card_id INTEGER NOT NULL,
+            name TEXT,
+            photo_path TEXT,
+            rarity TEXT,
+            attack INTEGER,
+            hp INTEGER,
+            points INTEGER DEFAULT 0,
+            PRIMARY KEY (universe_id, card_id)
+        )
+    """)
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_cards_universe_rarity ON cards(universe_id, rarity)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_cards_universe_name ON cards(universe_id, name)")
+
+    # Счётчик card_id внутри вселенной (замена AUTOINCREMENT отдельных таблиц):
+    # номера удалённых карт не переиспользуются, как и раньше
+    if "last_card_id" not in await table_columns(db, "universes"):
+        await db.execute("ALTER TABLE universes ADD COLUMN last_card_id INTEGER NOT NULL DEFAULT 0")
+
+    async with db.execute("SELECT universe_id FROM universes") as cursor:
+        universes = [row[0] for row in await cursor.fetchall()]
+
+    for universe_id in universes:
+        columns = await table_columns(db, universe_id)
+        if "card_id" not in columns:
+            continue
+
+        # В старых БД путь к картинке хранился в колонке photo_id
+        photo = "photo_path" if "photo_path" in columns else "photo_id" if "photo_id" in columns else "NULL"
+        selected = ", ".join(col if col in columns else "NULL" for col in LEGACY_CARD_COLUMNS)
+        cursor = await db.execute(f"""
+            INSERT OR IGNORE INTO cards (universe_id, card_id, name, rarity, attack, hp, points, photo_path)
+            SELECT ?, {selected}, {photo} FROM [{universe_id}]
+        """, (universe_id,))
+        copied = cursor.rowcount
+
+        await db.execute("""
+            UPDATE universes SET last_card_id = MAX(
+                last_card_id,
+                COALESCE((SELECT MAX(card_id) FROM cards WHERE universe_id = ?), 0),
+                COALESCE((SELECT seq FROM sqlite_sequence WHERE name = ?), 0)
+            )
+            WHERE universe_id = ?
+        """, (universe_id, universe_id, universe_id))
+
+        # Старую таблицу не удаляем: она остаётся резервной копией до ручной очистки
+        logging.info(f"📦 Вселенная {universe_id}: перенесено карт — {copied}.")
+
+
+# Индексы под горячие запросы репозиториев (проверяются tools/check_query_plans.py)
+HOT_QUERY_INDEXES = (
+    # Топ и место в рейтинге: ORDER BY total_points и COUNT(*) WHERE total_points > ?
+    "CREATE INDEX IF NOT EXISTS idx_users_total_points ON users(total_points DESC, username)",
+    # Ежедневная перегенерация магазинов: только пользователи с выбранной вселенной
+    "CREATE INDEX IF NOT EXISTS idx_users_with_universe ON users(selected_universe) WHERE selected_universe IS NOT NULL",
+    # Задачи снятия мутов и банов: частичные индексы только по активным наказаниям
+    "CREATE INDEX IF NOT EXISTS idx_moderation_mute_until ON moderation(mute_until, chat_id, user_id) WHERE mute_until > 0",
+    "CREATE INDEX IF NOT EXISTS idx_moderation_ban_until ON moderation(ban_until, chat_id, user_id) WHERE ban_until > 0",
+    # Очистка истёкших варнов и подсчёт активных
+    "CREATE INDEX IF NOT EXISTS idx_warns_expire_at ON warns_log(expire_at)",
+    "CREATE INDEX IF NOT EXISTS idx_warns_active ON warns_log(chat_id, user_id, expire_at)",
+    # Коллекция пользователя в выбранной вселенной (PK начинается с user_id, card_id)
+    "CREATE INDEX IF NOT EXISTS idx_user_cards_user_universe ON user_cards(user_id, universe_id, card_id)",
+    "CREATE INDEX IF NOT EXISTS idx_user_shop_user_universe ON user_shop(user_id, universe_id)",
+    # Поиск участника чата по username без учёта регистра
+    "CREATE INDEX IF NOT EXISTS idx_chat_users_username ON chat_users(chat_id, LOWER(username))",
+    "CREATE INDEX IF NOT EXISTS idx_referrals_referrer ON referrals(referrer_id, is_valid)",
+)
+
+
+@migration(2, "индексы для горячих запросов")
+async def migrate_hot_query_indexes(db):
+    for statement in HOT_QUERY_INDEXES:
+        await db.execute(statement)
+
+
+@migration(3, "счётчики коллекций user_collection_stats")
+async def migrate_collection_stats(db):
+    # Сколько разных карт каждой редкости у пользователя во вселенной.
+    # Поддерживается репозиториями в тех же транзакциях, что и user_cards
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS user_collection_stats (
+            user_id BIGINT NOT NULL,
+            universe_id TEXT NOT NULL,
+            rarity TEXT NOT NULL,
+            owned INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, universe_id, rarity)
+        )
+    """)
+    # Владельцы карты — при удалении карты или смене её редкости
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_user_cards_card ON user_cards(universe_id, card_id)")
+    await db.execute("""
+        INSERT INTO user_collection_stats (user_id, universe_id, rarity, owned)
+        SELECT uc.user_id, uc.universe_id, c.rarity, COUNT(*)
+        FROM user_cards uc
+        JOIN cards c ON c.universe_id = uc.universe_id AND c.card_id = uc.card_id
+        WHERE c.rarity IS NOT NULL
+        GROUP BY uc.user_id, uc.universe_id, c.rarity
+    """)
+
+
+@migration(4, "file_id изображений карт photo_file_ids")
+async def migrate_photo_file_ids(db):
+    # file_id загруженных в Telegram изображений: повторная отправка идёт без загрузки файла
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS photo_file_ids (
+            photo_path TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            file_id TEXT NOT NULL
+        )
+    """)
+
+
+@migration(5, "счётчики ссылок на изображения image_refs")
+async def migrate_image_refs(db):
+    # Сколько карт ссылается на файл изображения: файл удаляется только вместе с последней картой
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS image_refs (
+            photo_path TEXT PRIMARY KEY,
+            refs INTEGER NOT NULL
+        )
+    """)
+    await db.execute("""
+        INSERT INTO image_refs (photo_path, refs)
+        SELECT photo_path, COUNT(*) FROM cards WHERE photo_path IS NOT NULL GROUP BY photo_path
+    """)
+
+
+@migration(6, "рейтинги вселенных и чатов universe_scores, chat_scores")
+async def migrate_scoped_leaderboards(db):
+    # Очки, заработанные картами вселенной; начисляются в тех же транзакциях, что и награда за карту
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS universe_scores (
+            universe_id TEXT NOT NULL,
+            user_id BIGINT NOT NULL,
+            points BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (universe_id, user_id)
+        )
+    """)
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_universe_scores_top ON universe_scores(universe_id, points DESC, user_id)"
+    )
+    # Очки участников чата (копия users.total_points): меняются вместе с users, строки — вместе с chat_users
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS chat_scores (
+            chat_id BIGINT NOT NULL,
+            user_id BIGINT NOT NULL,
+            points BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (chat_id, user_id)
+        )
+    """)
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_chat_scores_top ON chat_scores(chat_id, points DESC, user_id)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_chat_scores_user ON chat_scores(user_id)")
+
+    # Заработанные раньше очки по вселенным не хранились — берём ценность собранных карт
+    await db.execute("""
+        INSERT INTO universe_scores (universe_id, user_id, points)
+        SELECT uc.universe_id, uc.user_id, SUM(uc.quantity * COALESCE(c.points, 0))
+        FROM user_cards uc
+        JOIN cards c ON c.universe_id = uc.universe_id AND c.card_id = uc.card_id
+        GROUP BY uc.universe_id, uc.user_id
+    """)
+    await db.execute("""
+        INSERT INTO chat_scores (chat_id, user_id, points)
+        SELECT cu.chat_id, cu.user_id, COALESCE(u.total_points, 0)
+        FROM chat_users cu
+        JOIN users u ON u.user_id = cu.user_id
+        WHERE cu."left" = 0
+    """)
+
+
+@migration(7, "купленные товары ежедневных магазинов shop_purchases")
+async def migrate_shop_purchases(db):
+    # Ассортимент ежедневного магазина выводится из (user_id, universe_id, day) и не хранится —
+    # хранятся только купленные слоты. day первым в ключе: старые дни удаляются диапазоном
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS shop_purchases (
+            day INTEGER NOT NULL,
+            user_id BIGINT NOT NULL,
+            universe_id TEXT NOT NULL,
+            slot INTEGER NOT NULL,
+            PRIMARY KEY (day, user_id, universe_id, slot)
+        )
+    """)
+
+
+@migration(8, "внешние ключи в PostgreSQL")
+async def migrate_pg_foreign_keys(db):
+    # В SQLite ключи объявлены в схеме с самого начала; БД PostgreSQL, созданные до этой версии,
+    # получают их как NOT VALID — проверяются новые строки, старые не перечитываются
+    if dialect_of(db) != "postgres":
+        return
+    from dabase.pg_backend import add_foreign_keys
+    added = await add_foreign_keys(db, validate=False)
+    if added:
+        logging.info(f"🔗 Добавлено внешних ключей: {added}")
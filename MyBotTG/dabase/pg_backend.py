@@ -0,0 +1,448 @@
+import os
+import re
+import time
+import asyncio
+import logging
+from functools import lru_cache
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+import asyncpg
+
+from dabase.database import run_callbacks
+
+logging.basicConfig(level=logging.INFO)
+
+# 🔹 Настройки PostgreSQL (используются при DB_BACKEND=postgres)
+PG_DSN = os.getenv("DATABASE_URL", "postgresql://localhost/mybottg")
+PG_POOL_MIN = int(os.getenv("PG_POOL_MIN", "2"))
+PG_POOL_MAX = int(os.getenv("PG_POOL_MAX", "10"))
+PG_COMMAND_TIMEOUT = float(os.getenv("PG_COMMAND_TIMEOUT", "30"))
+PG_STATEMENT_CACHE_SIZE = int(os.getenv("PG_STATEMENT_CACHE_SIZE", "256"))  # Подготовленных запросов на соединение
+PG_ISOLATION = os.getenv("PG_ISOLATION", "read_committed")  # Уровень изоляции транзакций записи
+
+# Портированная схема соответствует этой версии миграций SQLite (cards + индексы горячих запросов)
+PG_BASE_SCHEMA_VERSION = 2
+
+PG_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        user_id BIGINT PRIMARY KEY,
+        username TEXT,
+        registration_date TEXT,
+        selected_universe TEXT DEFAULT NULL,
+        is_blacklisted INTEGER DEFAULT 0,
+        last_card_time TEXT DEFAULT NULL,
+        total_points BIGINT DEFAULT 0,
+        spins INTEGER DEFAULT 0,
+        last_claimed TEXT DEFAULT NULL,
+        daily_streak INTEGER DEFAULT 0,
+        referral_code TEXT UNIQUE,
+        referred_by BIGINT DEFAULT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS universes (
+        universe_id TEXT PRIMARY KEY,
+        name TEXT,
+        enabled INTEGER DEFAULT 0,
+        last_card_id INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cards (
+        universe_id TEXT NOT NULL,
+        card_id INTEGER NOT NULL,
+        name TEXT,
+        photo_path TEXT,
+        rarity TEXT,
+        attack INTEGER,
+        hp INTEGER,
+        points INTEGER DEFAULT 0,
+        PRIMARY KEY (universe_id, card_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_cards (
+        user_id BIGINT,
+        card_id INTEGER,
+        universe_id TEXT,
+        quantity INTEGER DEFAULT 1,
+        PRIMARY KEY (user_id, card_id, universe_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_shop (
+        user_id BIGINT,
+        universe_id TEXT,
+        item_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        item_type TEXT,
+        item_value TEXT,
+        price INTEGER
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS promocodes (
+        promocode TEXT PRIMARY KEY,
+        spins_bonus INTEGER,
+        usage_limit INTEGER,
+        usage_count INTEGER DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_promocodes (
+        user_id BIGINT,
+        promocode TEXT,
+        PRIMARY KEY (user_id, promocode)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS referrals (
+        referral_id BIGINT PRIMARY KEY,
+        referrer_id BIGINT,
+        joined_date TEXT,
+        cards_collected INTEGER DEFAULT 0,
+        is_valid INTEGER DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS moderation (
+        id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        chat_id BIGINT,
+        user_id BIGINT,
+        username TEXT DEFAULT NULL,
+        mute_until BIGINT DEFAULT 0,
+        ban_until BIGINT DEFAULT 0,
+        ban_status INTEGER DEFAULT 0,
+        reason TEXT,
+        moderator_id BIGINT,
+        timestamp BIGINT DEFAULT (EXTRACT(EPOCH FROM now())::BIGINT)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS warns_log (
+        id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        chat_id BIGINT,
+        user_id BIGINT,
+        reason TEXT,
+        moderator_id BIGINT,
+        timestamp BIGINT,
+        expire_at BIGINT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS chat_users (
+        user_id BIGINT,
+        chat_id BIGINT,
+        username TEXT,
+        full_name TEXT,
+        "left" INTEGER DEFAULT 0,
+        PRIMARY KEY (user_id, chat_id)
+    )
+    """,
+    "CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_moderation ON moderation(chat_id, user_id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_warns ON warns_log(chat_id, user_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_chat_users_chat_id ON chat_users(chat_id)",
+    "CREATE INDEX IF NOT EXISTS idx_chat_users_user_id ON chat_users(user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_cards_universe_rarity ON cards(universe_id, rarity)",
+    "CREATE INDEX IF NOT EXISTS idx_cards_universe_name ON cards(universe_id, name)",
+)
+
+# 🔹 Внешние ключи — те же, что объявлены в схеме SQLite: (таблица, имя ограничения, определение).
+# DEFERRABLE INITIALLY DEFERRED: проверка при commit, поэтому порядок вставок внутри транзакции не важен.
+PG_FOREIGN_KEYS = (
+    ("user_cards", "fk_user_cards_user", "FOREIGN KEY (user_id) REFERENCES users (user_id)"),
+    ("user_cards", "fk_user_cards_universe", "FOREIGN KEY (universe_id) REFERENCES universes (universe_id)"),
+    ("user_shop", "fk_user_shop_user", "FOREIGN KEY (user_id) REFERENCES users (user_id)"),
+    ("user_shop", "fk_user_shop_universe", "FOREIGN KEY (universe_id) REFERENCES universes (universe_id)"),
+    ("user_promocodes", "fk_user_promocodes_user", "FOREIGN KEY (user_id) REFERENCES users (user_id)"),
+    ("user_promocodes", "fk_user_promocodes_promocode", "FOREIGN KEY (promocode) REFERENCES promocodes (promocode)"),
+    ("referrals", "fk_referrals_referral", "FOREIGN KEY (referral_id) REFERENCES users (user_id)"),
+    ("referrals", "fk_referrals_referrer", "FOREIGN KEY (referrer_id) REFERENCES users (user_id)"),
+    ("warns_log", "fk_warns_log_moderation",
+     "FOREIGN KEY (chat_id, user_id) REFERENCES moderation (chat_id, user_id) ON DELETE CASCADE"),
+)
+
+RETURNS_ROWS = re.compile(r"^\s*(SELECT|WITH|VALUES)\b|\bRETURNING\b", re.IGNORECASE)
+PLACEHOLDER = re.compile(r"'(?:[^']|'')*'|\"[^\"]*\"|\?")
+
+# Соединение-писатель, которым владеет текущая задача (для вложенных транзакций)
+_current_writer: ContextVar = ContextVar("current_pg_writer", default=None)
+# Колбэки, которые нужно вызвать после commit текущей транзакции записи
+_after_commit: ContextVar = ContextVar("pg_after_commit", default=None)
+
+
+async def add_foreign_keys(db, validate: bool = True) -> int:
+    """
+    Добавляет недостающие ограничения PG_FOREIGN_KEYS.
+    :param validate: False — NOT VALID: проверяются только новые строки (для БД, созданных без ключей).
+    :return: Сколько ограничений добавлено.
+    """
+    async with db.execute("SELECT conname FROM pg_constraint WHERE contype = 'f' AND connamespace = current_schema()::regnamespace") as cursor:
+        existing = {row[0] for row in await cursor.fetchall()}
+    added = 0
+    for table, name, definition in PG_FOREIGN_KEYS:
+        if name in existing:
+            continue
+        await db.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition} DEFERRABLE INITIALLY DEFERRED"
+            + ("" if validate else " NOT VALID")
+        )
+        added += 1
+    return added
+
+
+@lru_cache(maxsize=1024)
+def to_pg_sql(sql: str) -> str:
+    """Переводит плейсхолдеры `?` в `$1, $2, ...` (внутри строк и идентификаторов не трогает)."""
+    counter = 0
+
+    def replace(match):
+        nonlocal counter
+        if match.group(0) != "?":
+            return match.group(0)
+        counter += 1
+        return f"${counter}"
+
+    return PLACEHOLDER.sub(replace, sql)
+
+
+def status_rowcount(status: str) -> int:
+    """Число строк из статуса команды PostgreSQL: 'UPDATE 3' → 3, 'INSERT 0 1' → 1."""
+    last = status.rsplit(" ", 1)[-1] if status else ""
+    return int(last) if last.isdigit() else -1
+
+
+class PgCursor:
+    """Результат запроса в виде курсора aiosqlite: rowcount, fetchone, fetchall."""
+
+    def __init__(self, rows: list, rowcount: int):
+        self._rows = rows
+        self.rowcount = rowcount
+        self.lastrowid = None
+
+    async def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    async def fetchall(self) -> list:
+        return self._rows
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class PgResult:
+    """Как у aiosqlite: результат `execute` можно и дождаться, и открыть через `async with`."""
+
+    def __init__(self, coro):
+        self._coro = coro
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    async def __aenter__(self) -> PgCursor:
+        return await self._coro
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class PgConnection:
+    """
+    Обёртка над соединением asyncpg с интерфейсом aiosqlite.Connection,
+    которым пользуются репозитории и очередь записи.
+    """
+    dialect = "postgres"
+
+    def __init__(self, conn: asyncpg.Connection):
+        self.raw = conn
+
+    @property
+    def in_transaction(self) -> bool:
+        return self.raw.is_in_transaction()
+
+    async def _execute(self, sql: str, params: tuple) -> PgCursor:
+        query = to_pg_sql(sql)
+        if RETURNS_ROWS.search(sql):
+            rows = await self.raw.fetch(query, *params)
+            return PgCursor(rows, len(rows))
+        status = await self.raw.execute(query, *params)
+        return PgCursor([], status_rowcount(status))
+
+    def execute(self, sql: str, params: tuple = ()) -> PgResult:
+        return PgResult(self._execute(sql, tuple(params)))
+
+    async def execute_fetchall(self, sql: str, params: tuple = ()) -> list:
+        return await self.raw.fetch(to_pg_sql(sql), *params)
+
+    async def executemany(self, sql: str, params: list):
+        await self.raw.executemany(to_pg_sql(sql), [tuple(p) for p in params])
+
+    async def executescript(self, script: str):
+        """Несколько выражений без параметров (простой протокол PostgreSQL)."""
+        await self.raw.execute(script)
+
+
+class PgConnectionPool:
+    """Пул соединений PostgreSQL (asyncpg) с тем же интерфейсом, что и ConnectionPool для SQLite."""
+    dialect = "postgres"
+    journal_mode = None  # WAL-обслуживание SQLite здесь не нужно
+
+    def __init__(self, dsn: str = PG_DSN, min_size: int = PG_POOL_MIN, max_size: int = PG_POOL_MAX,
+                 isolation: str = PG_ISOLATION, **pool_kwargs):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max(1, max_size)
+        self.isolation = isolation
+        self.pool_kwargs = pool_kwargs
+        self._pool: asyncpg.Pool | None = None
+        # Один писатель на процесс, как у SQLite: репозитории рассчитывают на последовательные
+        # транзакции записи (read-modify-write в use_spins, add_warn и т. п.)
+        self._writer_lock = asyncio.Lock()
+
+        # Счётчики для мониторинга (те же ключи, что у пула SQLite)
+        self.counters = {
+            "reader_acquired": 0,
+            "reader_wait_total": 0.0,
+            "reader_wait_max": 0.0,
+            "writer_acquired": 0,
+            "writer_wait_total": 0.0,
+            "writer_wait_max": 0.0,
+            "timeouts": 0,
+        }
+
+    async def open(self):
+        if self._pool is not None:
+            return
+        self._pool = await asyncpg.create_pool(
+            self.dsn, min_size=self.min_size, max_size=self.max_size,
+            command_timeout=PG_COMMAND_TIMEOUT, statement_cache_size=PG_STATEMENT_CACHE_SIZE,
+            **self.pool_kwargs,
+        )
+        logging.info(f"🔌 Пул PostgreSQL открыт (соединений {self.min_size}–{self.max_size}).")
+
+    async def close(self):
+        if self._pool is None:
+            return
+        pool, self._pool = self._pool, None
+        await pool.close()
+        logging.info("🔌 Пул PostgreSQL закрыт.")
+
+    def _account_wait(self, kind: str, started: float):
+        waited = time.perf_counter() - started
+        self.counters[f"{kind}_acquired"] += 1
+        self.counters[f"{kind}_wait_total"] += waited
+        if waited > self.counters[f"{kind}_wait_max"]:
+            self.counters[f"{kind}_wait_max"] = waited
+
+    def _timeout_error(self) -> RuntimeError:
+        self.counters["timeouts"] += 1
+        return RuntimeError("⏳ База данных перегружена, попробуйте ещё раз через несколько секунд.")
+
+    async def _acquire(self, kind: str, started: float | None = None) -> asyncpg.Connection:
+        if self._pool is None:
+            raise RuntimeError("Пул соединений не открыт. Вызовите db_instance.init_db().")
+        started = time.perf_counter() if started is None else started
+        try:
+            conn = await self._pool.acquire(timeout=PG_COMMAND_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise self._timeout_error() from None
+        self._account_wait(kind, started)
+        return conn
+
+    @asynccontextmanager
+    async def reader(self):
+        """Соединение для чтения (внутри транзакции записи — её же соединение)."""
+        writer = _current_writer.get()
+        if writer is not None:
+            yield writer
+            return
+
+        conn = await self._acquire("reader")
+        try:
+            yield PgConnection(conn)
+        finally:
+            await self._pool.release(conn)
+
+    @asynccontextmanager
+    async def writer(self):
+        """
+        Транзакция записи: commit при выходе, rollback при исключении.
+        Как и в SQLite, писатель в процессе один: транзакции записи идут строго по очереди.
+        """
+        current = _current_writer.get()
+        if current is not None:
+            yield current
+            return
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._writer_lock.acquire(), PG_COMMAND_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise self._timeout_error() from None
+        try:
+            conn = await self._acquire("writer", started)
+            wrapper = PgConnection(conn)
+            callbacks = []
+            token = _current_writer.set(wrapper)
+            callbacks_token = _after_commit.set(callbacks)
+            try:
+                async with conn.transaction(isolation=self.isolation):
+                    yield wrapper
+            finally:
+                _after_commit.reset(callbacks_token)
+                _current_writer.reset(token)
+                await self._pool.release(conn)
+        finally:
+            self._writer_lock.release()
+        run_callbacks(callbacks)
+
+    def in_transaction(self) -> bool:
+        return _current_writer.get() is not None
+
+    def after_commit(self, callback):
+        callbacks = _after_commit.get()
+        if callbacks is None:
+            run_callbacks([callback])
+        else:
+            callbacks.append(callback)
+
+    def stats(self) -> dict:
+        stats = dict(self.counters)
+        if self._pool is not None:
+            stats["open_connections"] = self._pool.get_size()
+            stats["idle_readers"] = self._pool.get_idle_size()
+        return stats
+
+    # 🔹 Схема
+
+    async def create_schema(self, db: PgConnection):
+        """Создаёт таблицы и индексы; новая БД сразу получает версию PG_BASE_SCHEMA_VERSION."""
+        from dabase.migrations import HOT_QUERY_INDEXES
+
+        for statement in PG_SCHEMA + HOT_QUERY_INDEXES:
+            await db.execute(statement)
+        await add_foreign_keys(db)
+        await db.executemany(
+            "INSERT INTO universes (universe_id, name, enabled) VALUES (?, ?, ?) ON CONFLICT DO NOTHING",
+            [("marvel", "Marvel", 1), ("star_wars", "Star Wars", 1)],
+        )
+        await db.execute(
+            "INSERT INTO schema_version (version) SELECT CAST(? AS INTEGER) WHERE NOT EXISTS (SELECT 1 FROM schema_version)",
+            (PG_BASE_SCHEMA_VERSION,),
+        )
+
+    async def get_schema_version(self, db: PgConnection) -> int:
+        async with db.execute("SELECT version FROM schema_version") as cursor:
+            row = await cursor.fetchone()
+        return row[0] if row else 0
+
+    async def set_schema_version(self, db: PgConnection, version: int):
+        await db.execute("UPDATE schema_version SET version = ?", (version,))
@@ -0,0 +1,183 @@
+import os
+import time
+import asyncio
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+# 🔹 Настройки группового коммита
+FLUSH_INTERVAL_MS = int(os.getenv("DB_WRITE_FLUSH_MS", "50"))  # Как часто сбрасывать очередь
+MAX_BATCH = int(os.getenv("DB_WRITE_MAX_BATCH", "500"))  # Сброс раньше срока при таком числе запросов
+
+
+class WriteQueue:
+    """
+    Очередь отложенной записи (group commit).
+    Собирает запросы на запись из разных обработчиков и фиксирует их одной
+    транзакцией раз в FLUSH_INTERVAL_MS или при накоплении MAX_BATCH запросов.
+    Каждый запрос выполняется в своей точке сохранения, поэтому ошибка одного
+    не откатывает остальные. Группа запросов (execute_group) занимает одну точку
+    сохранения: она не делится между пачками и применяется целиком или никак.
+    Вызов execute/execute_group внутри `database.writer()` выполняется сразу в
+    транзакции вызывающего: сброс очереди ждал бы этот же writer.
+    """
+
+    def __init__(self, database, flush_interval_ms: int = FLUSH_INTERVAL_MS, max_batch: int = MAX_BATCH):
+        self.database = database
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max(1, max_batch)
+
+        self._pending: list[tuple[tuple[tuple[str, tuple], ...], int | None, asyncio.Future | None]] = []
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+
+        # Счётчики для мониторинга
+        self.counters = {
+            "statements": 0,
+            "flushes": 0,
+            "failed": 0,
+            "max_batch_seen": 0,
+            "flush_time_total": 0.0,
+        }
+
+    async def start(self):
+        """Запускает фоновую задачу сброса очереди."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="db-write-queue")
+
+    async def stop(self):
+        """Останавливает фоновую задачу и записывает всё, что осталось в очереди."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def enqueue(self, sql: str, params: tuple = ()):
+        """Ставит запрос в очередь без ожидания (ошибки только логируются)."""
+        self._add(((sql, tuple(params)),), None, None)
+
+    async def execute(self, sql: str, params: tuple = ()) -> int:
+        """
+        Ставит запрос в очередь и ждёт фиксации транзакции, в которую он попал.
+        :return: Количество затронутых строк.
+        """
+        if self.database.in_transaction():
+            return (await self._execute_inline(((sql, tuple(params)),)))[0]
+        future = asyncio.get_running_loop().create_future()
+        self._add(((sql, tuple(params)),), None, future)
+        return (await future)[0]
+
+    async def execute_group(self, statements: list[tuple[str, tuple]], guard: int | None = None) -> list[int] | None:
+        """
+        Ставит несколько запросов одной группой: они выполняются подряд в одной транзакции.
+        :param guard: Индекс запроса-условия (например, списание с проверкой баланса):
+                      если он не затронул ни одной строки, вся группа откатывается.
+        :return: Количество затронутых строк по каждому запросу или None, если группа откачена по guard.
+        """
+        statements = tuple((sql, tuple(params)) for sql, params in statements)
+        if self.database.in_transaction():
+            return await self._execute_inline(statements, guard)
+        future = asyncio.get_running_loop().create_future()
+        self._add(statements, guard, future)
+        return await future
+
+    async def _execute_inline(self, statements: tuple[tuple[str, tuple], ...], guard: int | None = None) -> list[int] | None:
+        """Группа в уже открытой транзакции текущей задачи: фиксируется вместе с ней."""
+        async with self.database.writer() as db:
+            if not db.in_transaction:
+                await db.execute("BEGIN")
+            return await self._run_group(db, statements, guard)
+
+    @staticmethod
+    async def _run_group(db, statements: tuple[tuple[str, tuple], ...], guard: int | None = None) -> list[int] | None:
+        """Выполняет группу в своей точке сохранения: при ошибке или невыполненном guard откатывается только она."""
+        await db.execute("SAVEPOINT write_queue")
+        try:
+            rowcounts = []
+            for sql, params in statements:
+                cursor = await db.execute(sql, params)
+                rowcounts.append(cursor.rowcount)
+                if len(rowcounts) - 1 == guard and cursor.rowcount == 0:
+                    rowcounts = None
+                    break
+        except BaseException:
+            await db.execute("ROLLBACK TO write_queue")
+            await db.execute("RELEASE write_queue")
+            raise
+        if rowcounts is None:
+            await db.execute("ROLLBACK TO write_queue")
+        await db.execute("RELEASE write_queue")
+        return rowcounts
+
+    def _add(self, statements: tuple[tuple[str, tuple], ...], guard: int | None, future: asyncio.Future | None):
+        self._pending.append((statements, guard, future))
+        if len(self._pending) >= self.max_batch or self._task is None:
+            self._wakeup.set()
+            if self._task is None:
+                # Очередь не запущена (например, в скриптах) — пишем сразу
+                asyncio.ensure_future(self.flush())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logging.error(f"❌ Ошибка группового коммита: {e}")
+
+    async def flush(self):
+        """Записывает накопленные запросы одной транзакцией."""
+        async with self._flush_lock:
+            while self._pending:
+                batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+                await self._write_batch(batch)
+
+    async def _write_batch(self, batch: list):
+        started = time.perf_counter()
+        results: list[tuple[asyncio.Future | None, object, BaseException | None]] = []
+
+        try:
+            async with self.database.writer() as db:
+                if not db.in_transaction:
+                    await db.execute("BEGIN")
+                for statements, guard, future in batch:
+                    try:
+                        results.append((future, await self._run_group(db, statements, guard), None))
+                    except Exception as e:
+                        results.append((future, None, e))
+        except Exception as e:
+            # Не удалось зафиксировать транзакцию — ошибка у всех запросов пачки
+            logging.error(f"❌ Ошибка фиксации пачки из {len(batch)} запросов: {e}")
+            results = [(future, None, e) for _, _, future in batch]
+
+        self.counters["flushes"] += 1
+        self.counters["statements"] += sum(len(statements) for statements, _, _ in batch)
+        self.counters["max_batch_seen"] = max(self.counters["max_batch_seen"], len(batch))
+        self.counters["flush_time_total"] += time.perf_counter() - started
+
+        for (statements, _, _), (future, rowcount, error) in zip(batch, results):
+            if error is not None:
+                self.counters["failed"] += 1
+                if future is None:
+                    logging.error(f"❌ Ошибка отложенной записи ({statements[0][0].split()[0]}): {error}")
+            if future is None or future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(rowcount)
+
+    def stats(self) -> dict:
+        """Снимок счётчиков очереди."""
+        stats = dict(self.counters)
+        stats["pending"] = len(self._pending)
+        return stats
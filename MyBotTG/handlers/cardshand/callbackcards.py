@@ -14,11 +14,17 @@ class OwnerRarityCallback(CallbackData, prefix="owner_rarity"):
 
 class PaginationCallback(CallbackData, prefix="paginate"):
     rarity_type: str
-    index: int
+    card_id: int  # Курсор: карта, которую показать
+    position: int  # Её номер в коллекции (для счётчика «N/всего»)
+
+class GridCallback(CallbackData, prefix="grid"):
+    rarity_type: str
+    page: int  # Номер коллажа (по COLLAGE_LIMIT карт)
 
 class AdminPaginationCallback(CallbackData, prefix="admin_paginate"):
+    universe: str
     rarity_type: str
-    index: int
+    card_id: int  # Курсор: карта, которую показать
 
 
 
@@ -1,11 +1,17 @@
+import asyncio
 from aiogram import Router, types, F
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from datetime import datetime, timedelta
-from random import choices
-import os
-from aiogram.types import FSInputFile
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from config import OWNER_ID
 from dabase.database import db_instance  # ✅ Используем db_instance
+from repositories import (
+    users_repo, cards_repo, user_cards_repo, CardRow, UserRow,
+    GRANT_DUPLICATE, GRANT_NOT_ALLOWED, COOLDOWN_CARD,
+)
+from repositories.cooldowns import CARD_COOLDOWN_HOURS
+from utils.card_photos import send_card_photo, send_card_album
+from utils.image_store import image_store
 
 cardreceive_router = Router()
 
@@ -19,120 +25,228 @@ RARITY_WEIGHTS = {
 }
 
 # Время ожидания между получением карт (в часах)
-CARD_RECEIVE_COOLDOWN = 4
+CARD_RECEIVE_COOLDOWN = CARD_COOLDOWN_HOURS
 
+# Пакетное открытие прокруток (/card N и кнопка «Открыть все»)
+CARD_BATCH_LIMIT = 50  # Карт за один раз
+MEDIA_GROUP_SIZE = 10  # Ограничение Telegram на альбом
+CARD_REDRAW_ROUNDS = 3  # Сколько раз перевыбирать карты без файла изображения
+OPEN_ALL_CALLBACK = "open_all_cards"
 
-def get_random_card(cards: list) -> dict:
-    """Выбирает случайную карту с учетом редкости."""
-    rarities = [card[2] for card in cards]  # ✅ Теперь берём редкость из tuple
-    weights = [RARITY_WEIGHTS.get(rarity, 1) for rarity in rarities]
-    return choices(cards, weights=weights, k=1)[0]
 
+async def get_random_card(universe: str) -> CardRow | None:
+    """Выбирает случайную карту с учетом редкости (из каталога в памяти, без запроса к БД)."""
+    return (await cards_repo.snapshot(universe)).random_card(RARITY_WEIGHTS)
 
-async def check_cooldown(user_id: int) -> bool:
-    """Проверяет, действует ли кулдаун."""
-    db = await db_instance.get_connection()
-    async with db.execute("SELECT last_card_time FROM users WHERE user_id = ?", (user_id,)) as cursor:
-        result = await cursor.fetchone()
 
-    if result and result[0]:  # ✅ Теперь корректно
-        last_time = datetime.strptime(result[0], "%Y-%m-%d %H:%M:%S")
-        return datetime.now() - last_time < timedelta(hours=CARD_RECEIVE_COOLDOWN)
+def cooldown_cutoff() -> str:
+    """Бесплатная карта доступна, если последняя получена не позже этого момента."""
+    return (datetime.now() - timedelta(hours=CARD_RECEIVE_COOLDOWN)).strftime("%Y-%m-%d %H:%M:%S")
 
-    return False
 
+async def answer_cooldown(message: types.Message, user_id: int) -> bool:
+    """
+    Сообщает, сколько ждать следующей карты (из памяти, без запроса к БД).
+    :return: False, если кулдаун уже истёк.
+    """
+    seconds_left = await users_repo.cooldown_left(user_id, COOLDOWN_CARD)
+    if not seconds_left:
+        return False
 
-@cardreceive_router.message(Command("card"))
-@cardreceive_router.message(F.text.lower() == "дай карту")
-async def give_card(message: types.Message):
-    user_id = message.from_user.id
-    db = await db_instance.get_connection()
-
-    async with db.execute("SELECT spins FROM users WHERE user_id = ?", (user_id,)) as cursor:
-        result = await cursor.fetchone()
-
-    spins = result[0] if result else 0  # ✅ Теперь корректно
-
-    if spins > 0:
-        await db.execute("UPDATE users SET spins = spins - 1 WHERE user_id = ?", (user_id,))
-        await db.commit()
-    else:
-        if await check_cooldown(user_id):
-            async with db.execute("SELECT last_card_time FROM users WHERE user_id = ?", (user_id,)) as cursor:
-                result = await cursor.fetchone()
+    hours, remainder = divmod(int(seconds_left), 3600)
+    minutes, _ = divmod(remainder, 60)
+    await message.answer(
+        f"Вы уже получали карту! Следующая будет доступна через {hours} час(а) и {minutes} минут(ы)."
+    )
+    return True
+
+
+def open_all_keyboard(spins: int) -> InlineKeyboardMarkup | None:
+    """Кнопка «Открыть все», если прокруток хватает больше чем на одну карту."""
+    if spins < 2:
+        return None
+    return InlineKeyboardMarkup(inline_keyboard=[[
+        InlineKeyboardButton(text=f"🎰 Открыть все ({min(spins, CARD_BATCH_LIMIT)})", callback_data=OPEN_ALL_CALLBACK)
+    ]])
+
+
+async def draw_cards(universe: str, count: int) -> list[CardRow]:
+    """
+    До `count` случайных карт с файлом изображения: файлы проверяются одновременно,
+    выпавшие карты без файла перевыбираются (не больше CARD_REDRAW_ROUNDS раз).
+    """
+    catalog = await cards_repo.snapshot(universe)
+    cards = []
+    for _ in range(CARD_REDRAW_ROUNDS):
+        drawn = catalog.random_cards(RARITY_WEIGHTS, count - len(cards))
+        exists = await asyncio.gather(*(image_store.exists(card.photo_path) for card in drawn))
+        cards += [card for card, ok in zip(drawn, exists) if ok]
+        if len(cards) >= count or not drawn:
+            break
+    return cards
+
+
+async def open_cards(user_id: int, universe: str, count: int) -> tuple[list[tuple[CardRow, bool]], UserRow | None]:
+    """
+    Открывает `count` прокруток: одна пакетная выборка из каталога и одна транзакция
+    (списание прокруток, новые карты в коллекцию, очки — каждое одним запросом).
+    Списывается столько прокруток, сколько карт выдано: без награды прокрутка не тратится.
+    :return: ([(карта, новая ли)], строка пользователя после записи) или ([], None), если прокруток не хватает.
+    """
+    cards = await draw_cards(universe, count)
+    if not cards:
+        return [], await users_repo.get(user_id)
+
+    async with db_instance.writer():
+        user = await users_repo.use_spins(user_id, len(cards))
+        if user is None:
+            return [], None
+
+        owned = await user_cards_repo.owned_ids(user_id, universe)
+        results, new_cards = [], []
+        for card in cards:
+            is_new = card.card_id not in owned
+            if is_new:
+                owned.add(card.card_id)
+                new_cards.append(card)
+            results.append((card, is_new))
+
+        await user_cards_repo.add_new(user_id, universe, new_cards)
+        if results:
+            user = await users_repo.add_card_reward(user_id, sum(card.points for card, _ in results), universe=universe)
+
+    return results, user
+
+
+async def send_opened_cards(message: types.Message, results: list[tuple[CardRow, bool]], count: int, user: UserRow):
+    """Карты уходят альбомами по 10 фото, итог — одним сообщением."""
+    for start in range(0, len(results), MEDIA_GROUP_SIZE):
+        chunk = results[start:start + MEDIA_GROUP_SIZE]
+        photos = [
+            (card.photo_path, f"{'🆕' if is_new else '🔁'} {card.name} — {card.rarity}, +{card.points} очков")
+            for card, is_new in chunk
+        ]
+        if len(photos) == 1:  # Альбом в Telegram — от двух фото
+            photo_path, caption = photos[0]
+            await send_card_photo(photo_path, lambda photo: message.answer_photo(photo=photo, caption=caption))
+        else:
+            await send_card_album(message, photos)
+
+    new_count = sum(1 for _, is_new in results if is_new)
+    text = (
+        f"🎰 Открыто прокруток: {len(results)}\n"
+        f"🆕 Новых карт: {new_count}, 🔁 повторных: {len(results) - new_count}\n"
+        f"💎 Очки: +{sum(card.points for card, _ in results)}\n\n"
+        f"🔄 Осталось прокруток: {user.spins}"
+    )
+    if len(results) < count:
+        text += f"\n⚠ Не выдано карт без изображения: {count - len(results)} (прокрутки за них не списаны)"
+    await message.answer(text, reply_markup=open_all_keyboard(user.spins))
 
-            last_time = datetime.strptime(result[0], "%Y-%m-%d %H:%M:%S") if result else datetime.now()
-            next_available_time = last_time + timedelta(hours=CARD_RECEIVE_COOLDOWN)
-            time_remaining = next_available_time - datetime.now()
 
-            hours, remainder = divmod(time_remaining.seconds, 3600)
-            minutes, _ = divmod(remainder, 60)
+async def give_cards_batch(message: types.Message, user_id: int, count: int):
+    """Пакетное открытие `count` прокруток (count уже проверен и ограничен CARD_BATCH_LIMIT)."""
+    user = await users_repo.get(user_id)
+    if not user or not user.selected_universe:
+        await message.answer("Вы не выбрали вселенную. Используйте /select_universe для выбора.")
+        return
 
-            await message.answer(
-                f"Вы уже получали карту! Следующая будет доступна через {hours} час(а) и {minutes} минут(ы)."
-            )
-            return
+    spins = user.spins or 0
+    if spins < count:
+        await message.answer(
+            f"❌ Недостаточно прокруток: у вас {spins}, нужно {count}."
+            + ("" if spins else f"\nБесплатная карта раз в {CARD_RECEIVE_COOLDOWN} ч — /card.")
+        )
+        return
 
-    async with db.execute("SELECT selected_universe FROM users WHERE user_id = ?", (user_id,)) as cursor:
-        universe_result = await cursor.fetchone()
+    if not await cards_repo.count(user.selected_universe):
+        await message.answer(f"В базе данных {user.selected_universe.capitalize()} нет карт.")
+        return
 
-    if not universe_result or not universe_result[0]:  # ✅ Исправлено
-        await message.answer("Вы не выбрали вселенную. Используйте /select_universe для выбора.")
+    results, user = await open_cards(user_id, user.selected_universe, count)
+    if user is None:  # Прокрутки успели потратить параллельным запросом
+        await message.answer("❌ Недостаточно прокруток.")
         return
 
-    selected_universe = universe_result[0]  # ✅ Достаём значение из tuple
+    await send_opened_cards(message, results, count, user)
 
-    async with db.execute(f"SELECT card_id, name, rarity, photo_path, points FROM [{selected_universe}]") as cursor:
-        cards = await cursor.fetchall()
 
-    if not cards:
-        await message.answer(f"В базе данных {selected_universe.capitalize()} нет карт.")
+@cardreceive_router.message(Command("card"))
+@cardreceive_router.message(F.text.lower() == "дай карту")
+async def give_card(message: types.Message, command: CommandObject | None = None):
+    user_id = message.from_user.id
+
+    # /card N — открыть N прокруток разом
+    if command and command.args:
+        arg = command.args.strip()
+        if not arg.isdigit() or int(arg) < 1:
+            await message.answer(f"❌ Используйте: /card N, где N — число прокруток (до {CARD_BATCH_LIMIT}).")
+            return
+        await give_cards_batch(message, user_id, min(int(arg), CARD_BATCH_LIMIT))
         return
 
-    card = get_random_card(cards)
+    # Спины, кулдаун и вселенная — одной строкой users (из кэша)
+    user = await users_repo.get(user_id)
+    spins = user.spins if user and user.spins else 0
 
-    if not os.path.isfile(card[3]):  # ✅ Берём путь к фото из tuple
-        await message.answer(f"Ошибка: файл изображения не найден по пути {card[3]}.")
+    if spins <= 0 and await answer_cooldown(message, user_id):
         return
 
-    async with db.execute("""
-        SELECT quantity FROM user_cards WHERE user_id = ? AND card_id = ? AND universe_id = ?
-    """, (user_id, card[0], selected_universe)) as cursor:
-        result = await cursor.fetchone()
+    selected_universe = user.selected_universe if user else None
+    if not selected_universe:
+        await message.answer("Вы не выбрали вселенную. Используйте /select_universe для выбора.")
+        return
 
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    card = await get_random_card(selected_universe)
+    if not card:
+        await message.answer(f"В базе данных {selected_universe.capitalize()} нет карт.")
+        return
 
-    if result:
-        await db.execute("UPDATE users SET total_points = total_points + ? WHERE user_id = ?", (card[4], user_id))
-        await db.execute("UPDATE users SET last_card_time = ? WHERE user_id = ?", (now, user_id))
-    else:
-        await db.execute("""
-            INSERT INTO user_cards (user_id, card_id, universe_id, quantity)
-            VALUES (?, ?, ?, 1)
-        """, (user_id, card[0], selected_universe))
+    if not await image_store.exists(card.photo_path):
+        await message.answer(f"Ошибка: файл изображения не найден по пути {card.photo_path}.")
+        return
 
-        await db.execute("UPDATE users SET total_points = total_points + ? WHERE user_id = ?", (card[4], user_id))
-        await db.execute("UPDATE users SET last_card_time = ? WHERE user_id = ?", (now, user_id))
+    # Проверка права, списание, очки и карта — одна транзакция
+    status, user = await user_cards_repo.grant(user_id, card, cooldown_cutoff())
+    if status == GRANT_NOT_ALLOWED:
+        # Параллельное нажатие успело забрать прокрутку или кулдаун
+        if not await answer_cooldown(message, user_id):
+            await message.answer("❌ Не удалось выдать карту, попробуйте ещё раз.")
+        return
 
-    await db.commit()
+    spins_left = user.spins
+    is_duplicate = status == GRANT_DUPLICATE
 
     caption = (
-        f"🎉 Ваша коллекция пополнилась карточкой «*{card[1]}*»!\n\n"
-        f"🎲 Редкость: {card[2].capitalize()}\n"
-        f"💎 Очки: {card[4]}\n\n"
-        f"🔄 Осталось прокруток: {spins - 1 if spins > 0 else 0}"
-    ) if not result else (
-        f"🎉 Вам выпала повторная карточка «*{card[1]}*»!\n"
-        f"🎲 Редкость: {card[2].capitalize()}\n"
-        f"💎 Очки: +{card[4]} добавлено к вашему счёту.\n\n"
-        f"🔄 Осталось прокруток: {spins - 1 if spins > 0 else 0}"
+        f"🎉 Ваша коллекция пополнилась карточкой «*{card.name}*»!\n\n"
+        f"🎲 Редкость: {card.rarity.capitalize()}\n"
+        f"💎 Очки: {card.points}\n\n"
+        f"🔄 Осталось прокруток: {spins_left}"
+    ) if not is_duplicate else (
+        f"🎉 Вам выпала повторная карточка «*{card.name}*»!\n"
+        f"🎲 Редкость: {card.rarity.capitalize()}\n"
+        f"💎 Очки: +{card.points} добавлено к вашему счёту.\n\n"
+        f"🔄 Осталось прокруток: {spins_left}"
     )
 
-    await message.answer_photo(
-        photo=FSInputFile(card[3]),
+    await send_card_photo(card.photo_path, lambda photo: message.answer_photo(
+        photo=photo,
         caption=caption,
-        parse_mode="Markdown"
-    )
+        parse_mode="Markdown",
+        reply_markup=open_all_keyboard(spins_left),
+    ))
+
+
+@cardreceive_router.callback_query(F.data == OPEN_ALL_CALLBACK)
+async def open_all_cards(callback: types.CallbackQuery):
+    """Кнопка «Открыть все»: все прокрутки (не больше CARD_BATCH_LIMIT) одним пакетом."""
+    await callback.answer()
+    user = await users_repo.get(callback.from_user.id)
+    spins = user.spins if user and user.spins else 0
+    if spins <= 0:
+        await callback.message.answer("❌ У вас не осталось прокруток.")
+        return
+    await give_cards_batch(callback.message, callback.from_user.id, min(spins, CARD_BATCH_LIMIT))
 
 
 @cardreceive_router.message(Command("giveadmcard"))
@@ -141,36 +255,23 @@ async def give_admin_card(message: types.Message):
         await message.answer("🚫 У вас нет прав на использование этой команды.")
         return
 
-    db = await db_instance.get_connection()
-
-    async with db.execute("SELECT selected_universe FROM users WHERE user_id = ?", (OWNER_ID,)) as cursor:
-        selected_universe = (await cursor.fetchone())[0]
-
-    async with db.execute(f"SELECT card_id, name, rarity, photo_path, points FROM [{selected_universe}]") as cursor:
-        cards = await cursor.fetchall()
+    selected_universe = await users_repo.get_universe(OWNER_ID)
+    card = await get_random_card(selected_universe) if selected_universe else None
 
-    if not cards:
-        await message.answer(f"⚠ Нет карт во вселенной {selected_universe.capitalize()}.")
+    if not card:
+        await message.answer(f"⚠ Нет карт во вселенной {(selected_universe or '—').capitalize()}.")
         return
 
-    card = get_random_card(cards)
-
-    await db.execute("""
-        INSERT INTO user_cards (user_id, card_id, universe_id, quantity)
-        VALUES (?, ?, ?, 1)
-        ON CONFLICT(user_id, card_id, universe_id) DO UPDATE SET quantity = quantity + 1
-    """, (message.from_user.id, card[0], selected_universe))
+    await user_cards_repo.add(message.from_user.id, selected_universe, card.card_id)
 
-    await db.commit()
-
-    await message.answer_photo(
-        photo=FSInputFile(card[3]),
+    await send_card_photo(card.photo_path, lambda photo: message.answer_photo(
+        photo=photo,
         caption=(
             f"✅ *Администратор получил карту!*\n\n"
-            f"🃏 *Карта:* {card[1]}\n"
-            f"🎲 *Редкость:* {card[2].capitalize()}\n"
-            f"💎 *Очки:* {card[4]}\n\n"
+            f"🃏 *Карта:* {card.name}\n"
+            f"🎲 *Редкость:* {card.rarity.capitalize()}\n"
+            f"💎 *Очки:* {card.points}\n\n"
             f"📦 *Добавлена в коллекцию!*"
         ),
         parse_mode="Markdown"
-    )
+    ))
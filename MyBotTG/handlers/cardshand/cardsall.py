@@ -1,10 +1,12 @@
 from aiogram import Router, types, F
 from aiogram.filters import Command
-from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, FSInputFile, InputMediaPhoto
-from handlers.cardshand.callbackcards import RarityCallback, ReturnCallback
-from kbds.inlinecards import rarity_keyboard_for_user, pagination_keyboard
-import os
-from dabase.database import db_instance  # Используем db_instance
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto
+from handlers.cardshand.callbackcards import RarityCallback, ReturnCallback, GridCallback
+from kbds.inlinecards import rarity_keyboard_for_user, pagination_keyboard, grid_keyboard
+from repositories import users_repo, user_cards_repo
+from utils.card_photos import send_card_photo
+from utils.image_store import image_store
+from utils.collage import COLLAGE_LIMIT, ensure_collage
 
 cardsall_router = Router()
 
@@ -22,45 +24,23 @@ def escape_markdown(text: str) -> str:
 @cardsall_router.callback_query(lambda c: c.data == "view_cards")
 async def show_user_cards(event: types.Message | types.CallbackQuery):
     user_id = event.from_user.id if isinstance(event, types.Message) else event.message.chat.id
-    db = await db_instance.get_connection()
 
-    async with db.execute("SELECT selected_universe FROM users WHERE user_id = ?", (user_id,)) as cursor:
-        selected_universe = await cursor.fetchone()
-
-    if not selected_universe or not selected_universe[0]:
+    universe = await users_repo.get_universe(user_id)
+    if not universe:
         await (event.answer if isinstance(event, types.CallbackQuery) else event.reply)(
             "Вы не выбрали вселенную. Используйте команду /select_universe для выбора."
         )
         return
 
-    universe = selected_universe[0]
-
-    async with db.execute("SELECT name FROM universes WHERE universe_id = ?", (universe,)) as cursor:
-        universe_name = await cursor.fetchone()
-
-    if not universe_name or not universe_name[0]:
+    # Имя вселенной и счётчики по редкостям одним запросом
+    overview = await user_cards_repo.overview(user_id, universe)
+    if not overview:
         await (event.reply if isinstance(event, types.Message) else event.message.edit_text)(
             "Ошибка: Вселенная не найдена в базе данных."
         )
         return
 
-    universe_name = universe_name[0]
-
-    async with db.execute(f"""
-        SELECT c.rarity, COUNT(uc.card_id)
-        FROM user_cards uc
-        JOIN [{universe}] c ON uc.card_id = c.card_id
-        WHERE uc.user_id = ?
-        GROUP BY c.rarity
-    """, (user_id,)) as cursor:
-        user_cards = {row[0]: row[1] for row in await cursor.fetchall()}
-
-    async with db.execute(f"""
-        SELECT rarity, COUNT(card_id)
-        FROM [{universe}]
-        GROUP BY rarity
-    """) as cursor:
-        total_cards = {row[0]: row[1] for row in await cursor.fetchall()}
+    universe_name, user_cards, total_cards = overview.universe_name, overview.owned, overview.total
 
     if not user_cards:
         await (event.answer if isinstance(event, types.CallbackQuery) else event.reply)(
@@ -83,22 +63,15 @@ async def show_cards_by_rarity(callback: types.CallbackQuery, callback_data: Rar
     user_id = callback.from_user.id
     rarity = callback_data.rarity_type
     universe = callback_data.universe
-    db = await db_instance.get_connection()
 
     valid_rarities = ["обычная", "редкая", "эпическая", "легендарная", "мифическая"]
     if rarity not in valid_rarities:
         await callback.answer("Неверный тип редкости.", show_alert=True)
         return
 
-    async with db.execute(f"""
-        SELECT c.card_id, c.name, c.photo_path, c.rarity, c.points
-        FROM user_cards uc
-        JOIN [{universe}] c ON uc.card_id = c.card_id
-        WHERE uc.user_id = ? AND c.rarity = ?
-    """, (user_id, rarity)) as cursor:
-        cards = await cursor.fetchall()
+    page = await user_cards_repo.page(user_id, universe, rarity)
 
-    if not cards:
+    if not page:
         await callback.message.edit_text(
             f"У вас нет карт редкости: {escape_markdown(rarity.capitalize())}.",
             reply_markup=InlineKeyboardMarkup(inline_keyboard=[
@@ -108,10 +81,10 @@ async def show_cards_by_rarity(callback: types.CallbackQuery, callback_data: Rar
         )
         return
 
-    card = cards[0]
-    card_id, name, photo_path, rarity, points = card
+    card = page.card
+    name, photo_path, points = card.name, card.photo_path, card.points
 
-    if not os.path.isfile(photo_path):
+    if not await image_store.exists(photo_path):
         await callback.message.edit_text(
             f"Ошибка: файл изображения для карты '{escape_markdown(name)}' не найден.",
             reply_markup=InlineKeyboardMarkup(inline_keyboard=[
@@ -121,60 +94,73 @@ async def show_cards_by_rarity(callback: types.CallbackQuery, callback_data: Rar
         )
         return
 
-    media = InputMediaPhoto(
-        media=FSInputFile(photo_path),
-        caption=(
-            f"🃏 *Карта*: *{escape_markdown(name)}*\n"
-            f"🎲 *Редкость*: *{escape_markdown(rarity.capitalize())}*\n"
-            f"💎 *Очки*: *{points}*"
-        ),
-        parse_mode="Markdown"
+    caption = (
+        f"🃏 *Карта*: *{escape_markdown(name)}*\n"
+        f"🎲 *Редкость*: *{escape_markdown(rarity.capitalize())}*\n"
+        f"💎 *Очки*: *{points}*"
     )
 
-    reply_markup = pagination_keyboard(rarity=rarity, index=0, total=len(cards), include_return=True)
+    reply_markup = pagination_keyboard(rarity=rarity, page=page, include_return=True)
 
-    await callback.message.edit_media(media=media, reply_markup=reply_markup)
+    await send_card_photo(photo_path, lambda photo: callback.message.edit_media(
+        media=InputMediaPhoto(media=photo, caption=caption, parse_mode="Markdown"),
+        reply_markup=reply_markup
+    ))
 
 
-@cardsall_router.callback_query(ReturnCallback.filter(F.action == "to_categories"))
-async def return_to_categories(callback: types.CallbackQuery):
+def grid_caption(rarity: str, cards: list, total: int) -> str:
+    """Подпись коллажа: номера на картинке → названия карт (в пределах лимита подписи Telegram)."""
+    caption = f"🃏 {rarity.capitalize()}: {total} карт\n\n" + "\n".join(
+        f"{number}. {card.name} — 💎 {card.points}" for number, card in enumerate(cards, start=1)
+    )
+    return caption if len(caption) <= 1024 else caption[:1023] + "…"
+
+
+@cardsall_router.callback_query(GridCallback.filter())
+async def show_cards_grid(callback: types.CallbackQuery, callback_data: GridCallback):
+    """Карты редкости одним коллажем (по COLLAGE_LIMIT штук) вместо листания по одной."""
     user_id = callback.from_user.id
-    db = await db_instance.get_connection()
+    rarity = callback_data.rarity_type
 
-    async with db.execute("SELECT selected_universe FROM users WHERE user_id = ?", (user_id,)) as cursor:
-        selected_universe = await cursor.fetchone()
+    universe = await users_repo.get_universe(user_id)
+    if not universe:
+        await callback.answer("Вы не выбрали вселенную.", show_alert=True)
+        return
 
-    if not selected_universe or not selected_universe[0]:
-        await callback.message.delete()
-        await callback.message.answer("Вы не выбрали вселенную!")
+    cards = await user_cards_repo.owned_of_rarity(user_id, universe, rarity)
+    if not cards:
+        await callback.answer("Нет карт для отображения.", show_alert=True)
         return
+    await callback.answer()
 
-    universe = selected_universe[0]
+    pages = (len(cards) + COLLAGE_LIMIT - 1) // COLLAGE_LIMIT
+    page = callback_data.page % pages
+    chunk = cards[page * COLLAGE_LIMIT:(page + 1) * COLLAGE_LIMIT]
 
-    async with db.execute(f"""
-        SELECT c.rarity, COUNT(uc.card_id)
-        FROM user_cards uc
-        JOIN [{universe}] c ON uc.card_id = c.card_id
-        WHERE uc.user_id = ?
-        GROUP BY c.rarity
-    """, (user_id,)) as cursor:
-        user_cards = {row[0]: row[1] for row in await cursor.fetchall()}
+    # Коллаж рисуется один раз на набор карт, дальше отправляется по file_id
+    collage = await ensure_collage([card.photo_path for card in chunk])
+    await send_card_photo(collage, lambda photo: callback.message.edit_media(
+        media=InputMediaPhoto(media=photo, caption=grid_caption(rarity, chunk, len(cards))),
+        reply_markup=grid_keyboard(rarity, page, pages, chunk[0].card_id)
+    ))
 
-    async with db.execute(f"""
-        SELECT rarity, COUNT(card_id)
-        FROM [{universe}]
-        GROUP BY rarity
-    """) as cursor:
-        total_cards = {row[0]: row[1] for row in await cursor.fetchall()}
 
-    async with db.execute("SELECT name FROM universes WHERE universe_id = ?", (universe,)) as cursor:
-        universe_name = await cursor.fetchone()
+@cardsall_router.callback_query(ReturnCallback.filter(F.action == "to_categories"))
+async def return_to_categories(callback: types.CallbackQuery):
+    user_id = callback.from_user.id
+
+    universe = await users_repo.get_universe(user_id)
+    if not universe:
+        await callback.message.delete()
+        await callback.message.answer("Вы не выбрали вселенную!")
+        return
 
-    if not universe_name or not universe_name[0]:
+    overview = await user_cards_repo.overview(user_id, universe)
+    if not overview:
         await callback.message.answer("Ошибка: Вселенная не найдена в базе данных.")
         return
 
-    universe_name = universe_name[0]
+    universe_name, user_cards, total_cards = overview.universe_name, overview.owned, overview.total
 
     keyboard = rarity_keyboard_for_user(user_cards=user_cards, total_cards=total_cards, universe=universe)
     message_text = f"Какие карты из вселенной {escape_markdown(universe_name)} хотите посмотреть?"
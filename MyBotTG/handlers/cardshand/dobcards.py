@@ -1,4 +1,3 @@
-import os
 import random
 import re
 from aiogram import Router, types, F
@@ -8,7 +7,8 @@ from aiogram.fsm.state import StatesGroup, State
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.exceptions import TelegramNetworkError
 from config import OWNER_ID
-from dabase.database import db_instance  # ✅ Асинхронная работа с БД
+from repositories import cards_repo
+from utils.image_store import image_store
 
 dobcards_router = Router()
 
@@ -44,17 +44,15 @@ def escape_markdown(text: str) -> str:
 
 # 🔹 Получаем вселенные (асинхронно)
 async def get_available_universes() -> list:
-    db = await db_instance.get_connection()
-    async with db.execute("SELECT universe_id, name FROM universes WHERE enabled = 1") as cursor:
-        return await cursor.fetchall()
+    return await cards_repo.universes(enabled_only=True)
 
 # 🔹 Создаем инлайн-клавиатуру для выбора вселенной
 async def create_universe_inline_keyboard() -> InlineKeyboardMarkup:
     universes = await get_available_universes()
     return InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text=name.capitalize(), callback_data=f"universe_{universe_id}")]
-            for universe_id, name in universes
+            [InlineKeyboardButton(text=u.name.capitalize(), callback_data=f"universe_{u.universe_id}")]
+            for u in universes
         ]
     )
 
@@ -87,7 +85,7 @@ async def add_card(message: types.Message, state: FSMContext):
 @dobcards_router.callback_query(F.data.startswith("universe_"))
 async def card_universe_received(callback: types.CallbackQuery, state: FSMContext):
     universe = callback.data.split("_", 1)[1]
-    available_universes = [u[0] for u in await get_available_universes()]
+    available_universes = [u.universe_id for u in await get_available_universes()]
     
     if universe not in available_universes:
         await callback.answer("❌ Недопустимая вселенная!", show_alert=True)
@@ -101,18 +99,8 @@ async def card_universe_received(callback: types.CallbackQuery, state: FSMContex
 # 🔹 Обработка фото карты
 @dobcards_router.message(AddCardState.waiting_for_photo, F.photo)
 async def card_photo_received(message: types.Message, state: FSMContext):
-    data = await state.get_data()
-    universe = data.get("universe")
-    photo = message.photo[-1]
-
-    folder_path = f"images/{universe}"
-    os.makedirs(folder_path, exist_ok=True)
-    file_path = f"{folder_path}/{photo.file_unique_id}.jpg"
-
-    file = await message.bot.get_file(photo.file_id)
-    await message.bot.download_file(file.file_path, destination=file_path)
-
-    await state.update_data(photo_path=file_path)
+    # Файл скачивается в хранилище только при создании карты: брошенная или отклонённая карта не оставляет файлов
+    await state.update_data(photo_file_id=message.photo[-1].file_id)
     await message.answer("✏️ Введите название карты.")
     await state.set_state(AddCardState.waiting_for_name)
 
@@ -120,6 +108,12 @@ async def card_photo_received(message: types.Message, state: FSMContext):
 @dobcards_router.message(AddCardState.waiting_for_name)
 async def card_name_received(message: types.Message, state: FSMContext):
     name = message.text.strip()
+    universe = (await state.get_data())["universe"]
+    if await cards_repo.name_exists(universe, name):
+        await message.answer(f"❌ Карта *{escape_markdown(name)}* уже существует\\! Введите другое название\\.",
+                             parse_mode="MarkdownV2")
+        return
+
     await state.update_data(name=name)
     await message.answer("🎲 Выберите редкость карты:", reply_markup=create_rarity_keyboard())
     await state.set_state(AddCardState.waiting_for_rarity)
@@ -134,24 +128,28 @@ async def card_rarity_received(callback: types.CallbackQuery, state: FSMContext)
         return
 
     card_data = await state.get_data()
-    name, photo_path, universe = card_data["name"], card_data["photo_path"], card_data["universe"]
+    name, photo_file_id, universe = card_data["name"], card_data["photo_file_id"], card_data["universe"]
     
-    db = await db_instance.get_connection()
-    async with db.execute(f"SELECT 1 FROM {universe} WHERE name = ?", (name,)) as cursor:
-        if await cursor.fetchone():
-            await callback.message.answer(f"❌ Карта *{escape_markdown(name)}* уже существует!", parse_mode="MarkdownV2")
-            await state.clear()
-            return
-
     attack = random.randint(*RARITY_RANGES[rarity]["attack"])
     hp = random.randint(*RARITY_RANGES[rarity]["hp"])
     points = random.choice(range(RARITY_POINTS[rarity][0], RARITY_POINTS[rarity][1] + 1, 50))
 
-    await db.execute(f"""
-        INSERT INTO {universe} (name, photo_path, rarity, attack, hp, points)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (name, photo_path, rarity, attack, hp, points))
-    await db.commit()
+    # Файл в хранилище называется по хэшу содержимого: одно изображение у нескольких карт — один файл
+    downloaded = await callback.bot.download(photo_file_id)
+    photo_path = await image_store.put(downloaded.getvalue())
+
+    card_id = None
+    try:
+        card_id = await cards_repo.add(universe, name, photo_path, rarity, attack, hp, points)
+    finally:
+        # Карта не создана — удаляем файл, если на него не ссылается другая карта
+        if card_id is None and not await cards_repo.image_in_use(photo_path):
+            await image_store.remove(photo_path)
+
+    if card_id is None:
+        await callback.message.answer(f"❌ Карта *{escape_markdown(name)}* уже существует!", parse_mode="MarkdownV2")
+        await state.clear()
+        return
 
     try:
         await callback.message.answer(
@@ -5,7 +5,7 @@ import asyncio
 from aiogram import Router, types, Bot
 from aiogram.filters import Command
 from aiogram.exceptions import TelegramAPIError
-from dabase.database import db_instance
+from repositories import moderation_repo
 from handlers.satefy.user_utils import get_user_id_by_username
 from utils.telegram_queue import telegram_queue  # Импортируем очередь
 
@@ -23,15 +23,8 @@ def escape_markdown(text: str) -> str:
 async def check_and_remove_ban(bot: Bot):
     """🔍 Проверяет истёк ли бан и снимает его."""
     now = int(time.time())
-    db = await db_instance.get_connection()
-    try:
-        async with db.execute("SELECT chat_id, user_id FROM moderation WHERE ban_until > 0 AND ban_until <= ?", (now,)) as cursor:
-            expired_bans = await cursor.fetchall()
-
-        for chat_id, user_id in expired_bans:
-            await unban_user(bot, chat_id, user_id)
-    finally:
-        await db.close()  # ✅ Закрываем соединение с БД
+    for chat_id, user_id in await moderation_repo.expired_bans(now):
+        await unban_user(bot, chat_id, user_id)
 
 
 @ban_router.message(Command("ban"))
@@ -150,25 +143,10 @@ async def cmd_unban(message: types.Message, bot: Bot):
 
 async def ban_user(bot: Bot, chat_id: int, user_id: int, mention: str, moderator_id: int, reason: str, days: int) -> bool:
     """🚫 Добавляет бан пользователя в БД и в Telegram."""
-    db = await db_instance.get_connection()
-    try:
-        current_time = int(time.time())
-        ban_until = current_time + days * 86400 if days > 0 else 0  # Конвертируем дни в секунды
-
-        await db.execute("""
-            INSERT INTO moderation (chat_id, user_id, ban_until, ban_status, reason, moderator_id, timestamp)
-            VALUES (?, ?, ?, 1, ?, ?, ?)
-            ON CONFLICT(chat_id, user_id) DO UPDATE SET 
-                ban_until = excluded.ban_until,
-                ban_status = 1,
-                reason = excluded.reason,
-                moderator_id = excluded.moderator_id,
-                timestamp = excluded.timestamp
-        """, (chat_id, user_id, ban_until, reason, moderator_id, current_time))
-
-        await db.commit()
-    finally:
-        await db.close()  # ✅ Закрываем соединение с БД
+    current_time = int(time.time())
+    ban_until = current_time + days * 86400 if days > 0 else 0  # Конвертируем дни в секунды
+
+    await moderation_repo.set_ban(chat_id, user_id, ban_until, reason, moderator_id, current_time)
 
     try:
         await telegram_queue.add_request(
@@ -182,12 +160,7 @@ async def ban_user(bot: Bot, chat_id: int, user_id: int, mention: str, moderator
 
 async def unban_user(bot: Bot, chat_id: int, user_id: int) -> bool:
     """✅ Снимает бан с пользователя и обновляет БД."""
-    db = await db_instance.get_connection()
-    try:
-        await db.execute("UPDATE moderation SET ban_status = 0, ban_until = 0 WHERE chat_id = ? AND user_id = ?", (chat_id, user_id))
-        await db.commit()
-    finally:
-        await db.close()  # ✅ Закрываем соединение с БД
+    await moderation_repo.clear_ban(chat_id, user_id)
 
     try:
         await telegram_queue.add_request(
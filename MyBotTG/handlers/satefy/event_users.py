@@ -6,6 +6,7 @@ from aiogram.types import ChatMemberUpdated
 from aiogram.filters import ChatMemberUpdatedFilter
 from aiogram.exceptions import TelegramAPIError
 from dabase.database import db_instance
+from repositories import moderation_repo
 from utils.telegram_safe_request import safe_telegram_request  # Импортируем безопасный запрос
 
 logging.basicConfig(level=logging.INFO)
@@ -21,21 +22,8 @@ async def save_user_to_db(chat_id: int, user: types.User, left: bool):
 
     logging.info(f"📌 Сохранение пользователя {user.id} (@{username}) в БД (chat_id: {chat_id}, left: {left})")
 
-    db = await db_instance.get_connection()
-    async with db:
-        try:
-            await db.execute("""
-                INSERT INTO chat_users (user_id, chat_id, username, full_name, left)
-                VALUES (?, ?, ?, ?, ?)
-                ON CONFLICT(user_id, chat_id) DO UPDATE SET
-                    username = excluded.username,
-                    full_name = excluded.full_name,
-                    left = excluded.left
-            """, (user.id, chat_id, username, full_name, left))
-            await db.commit()
-            logging.info(f"✅ Пользователь {user.id} (@{username}) успешно сохранён")
-        except Exception as e:
-            logging.error(f"❌ Ошибка при сохранении пользователя {user.id}: {e}")
+    # ✅ Запись уходит в групповой коммит, ошибки логирует сама очередь
+    moderation_repo.save_chat_user(chat_id, user.id, username, full_name, left)
 
 
 async def save_all_chat_members(bot: Bot, chat_id: int):
@@ -61,11 +49,9 @@ async def save_all_chat_members(bot: Bot, chat_id: int):
             raise
 
         # 3. Сохраняем администраторов в БД
-        db = await db_instance.get_connection()
-        async with db:
-            for admin in chat_admins:
-                await save_user_to_db(chat_id, admin.user, left=False)
-            await db.commit()
+        for admin in chat_admins:
+            await save_user_to_db(chat_id, admin.user, left=False)
+        await db_instance.write_queue.flush()
         logging.info(f"✅ Сохранено {len(chat_admins)} администраторов.")
 
         logging.info("📜 Остальные участники будут добавлены через активность (track_all_messages).")
@@ -144,13 +130,7 @@ async def update_all_users(bot: Bot):
     logging.info("📋 Запуск обновления всех чатов...")
 
     try:
-        db = await db_instance.get_connection()
-        async with db:
-            async with db.execute("SELECT DISTINCT chat_id FROM chat_users") as cursor:
-                chat_ids = await cursor.fetchall()
-
-        for chat_id_tuple in chat_ids:
-            chat_id = chat_id_tuple[0]
+        for chat_id in await moderation_repo.chat_ids():
             logging.info(f"🔄 Синхронизация чата {chat_id}...")
             try:
                 await save_all_chat_members(bot, chat_id)
@@ -6,7 +6,7 @@ from aiogram import Router, types, Bot
 from aiogram.filters import Command
 from aiogram.exceptions import TelegramAPIError
 from aiogram.types import ChatPermissions
-from dabase.database import db_instance
+from repositories import moderation_repo
 from handlers.satefy.user_utils import get_user_id_by_username
 
 logging.basicConfig(level=logging.INFO)
@@ -43,15 +43,8 @@ def parse_duration(duration: str) -> int:
 async def check_and_remove_mute(bot: Bot):
     """🔍 Проверяет истёк ли мут и снимает его."""
     now = int(time.time())
-    db = await db_instance.get_connection()
-    try:
-        async with db.execute("SELECT chat_id, user_id FROM moderation WHERE mute_until > 0 AND mute_until <= ?", (now,)) as cursor:
-            expired_mutes = await cursor.fetchall()
-
-        for chat_id, user_id in expired_mutes:
-            await unmute_user(bot, chat_id, user_id)
-    finally:
-        await db.close()  # ✅ Закрываем соединение
+    for chat_id, user_id in await moderation_repo.expired_mutes(now):
+        await unmute_user(bot, chat_id, user_id)
 
 
 async def get_mention(bot: Bot, chat_id: int, user_id: int) -> str:
@@ -113,17 +106,7 @@ async def cmd_mute(message: types.Message, bot: Bot):
 async def mute_user(bot: Bot, chat_id: int, user_id: int, mention: str, duration: int, moderator_id: int, reason: str) -> bool:
     """🚫 Выдаёт мут пользователю на заданное время."""
     until_time = int(time.time()) + duration
-    db = await db_instance.get_connection()
-    try:
-        await db.execute("""
-            INSERT INTO moderation (chat_id, user_id, mute_until, timestamp, reason, moderator_id)
-            VALUES (?, ?, ?, ?, ?, ?) 
-            ON CONFLICT(chat_id, user_id) DO UPDATE SET mute_until = ?, timestamp = ?, reason = ?, moderator_id = ?
-        """, (chat_id, user_id, until_time, int(time.time()), reason, moderator_id,
-              until_time, int(time.time()), reason, moderator_id))
-        await db.commit()
-    finally:
-        await db.close()  # ✅ Закрываем соединение
+    await moderation_repo.set_mute(chat_id, user_id, until_time, int(time.time()), reason, moderator_id)
 
     try:
         await bot.restrict_chat_member(chat_id, user_id, ChatPermissions(), until_date=until_time)
@@ -156,12 +139,7 @@ async def cmd_unmute(message: types.Message, bot: Bot):
 
 async def unmute_user(bot: Bot, chat_id: int, user_id: int) -> bool:
     """✅ Снимает мут с пользователя и обновляет БД."""
-    db = await db_instance.get_connection()
-    try:
-        await db.execute("UPDATE moderation SET mute_until = 0 WHERE chat_id = ? AND user_id = ?", (chat_id, user_id))
-        await db.commit()
-    finally:
-        await db.close()  # ✅ Закрываем соединение
+    await moderation_repo.clear_mute(chat_id, user_id)
 
     try:
         await bot.restrict_chat_member(chat_id, user_id, ChatPermissions(
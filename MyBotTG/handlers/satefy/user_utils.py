@@ -2,7 +2,7 @@ import logging
 import asyncio
 from aiogram import Bot
 from aiogram.exceptions import TelegramAPIError
-from dabase.database import db_instance  # Асинхронная БД
+from repositories import moderation_repo
 
 logging.basicConfig(level=logging.INFO)
 
@@ -22,20 +22,13 @@ async def get_user_id_by_username(bot: Bot, chat_id: int, username: str) -> int
     logging.info(f"🔍 Поиск user_id по username: {username} в чате {chat_id}")
 
     # 1. Проверяем в БД
-    db = await db_instance.get_connection()
     try:
-        async with db.execute(
-            "SELECT user_id FROM chat_users WHERE chat_id = ? AND LOWER(username) = ?",
-            (chat_id, username),
-        ) as cursor:
-            result = await cursor.fetchone()
-        if result:
-            logging.info(f"✅ Найден user_id в БД: {result[0]}")
-            return result[0]
+        user_id = await moderation_repo.find_chat_user(chat_id, username)
+        if user_id:
+            logging.info(f"✅ Найден user_id в БД: {user_id}")
+            return user_id
     except Exception as e:
         logging.error(f"❌ Ошибка при поиске в БД: {e}")
-    finally:
-        await db.close()
 
     # 2. Ищем среди администраторов
     try:
@@ -69,21 +62,12 @@ async def get_chat_members(bot: Bot, chat_id: int):
 
     try:
         # 1. Получаем участников из БД
-        db = await db_instance.get_connection()
         try:
-            async with db.execute(
-                "SELECT user_id, username FROM chat_users WHERE chat_id = ? AND left = 0",
-                (chat_id,),
-            ) as cursor:
-                db_users = await cursor.fetchall()
-            for row in db_users:
-                user_id, username = row[0], row[1]
-                username = f"@{username}" if username else "(без username)"
-                users.add((user_id, username))
+            for member in await moderation_repo.chat_members(chat_id):
+                username = f"@{member.username}" if member.username else "(без username)"
+                users.add((member.user_id, username))
         except Exception as e:
             logging.error(f"❌ Ошибка при запросе к БД: {e}")
-        finally:
-            await db.close()
 
         # 2. Добавляем администраторов
         try:
@@ -6,7 +6,7 @@ from aiogram import Router, types, Bot
 from aiogram.filters import Command
 from aiogram.exceptions import TelegramAPIError
 from aiogram.types import ChatPermissions
-from dabase.database import db_instance
+from repositories import moderation_repo
 from handlers.satefy.user_utils import get_user_id_by_username
 
 logging.basicConfig(level=logging.INFO)
@@ -117,62 +117,30 @@ async def cmd_unwarn(message: types.Message, bot: Bot):
 
 async def warn_user(chat_id: int, user_id: int, moderator_id: int, reason: str) -> int:
     """✅ Выдаёт варн пользователю и записывает его в БД."""
-    expire_at = int(time.time()) + WARN_EXPIRE
-    db = await db_instance.get_connection()
-
-    await db.execute("""
-        INSERT INTO warns_log (chat_id, user_id, reason, moderator_id, timestamp, expire_at) 
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (chat_id, user_id, reason, moderator_id, int(time.time()), expire_at))
-    await db.commit()
-
-    return await get_active_warns(chat_id, user_id)
+    now = int(time.time())
+    return await moderation_repo.add_warn(chat_id, user_id, reason, moderator_id, now, now + WARN_EXPIRE)
 
 
 async def remove_warn(chat_id: int, user_id: int):
     """🗑 Удаляет один варн (самый старый)."""
-    db = await db_instance.get_connection()
-    await db.execute("""
-        DELETE FROM warns_log 
-        WHERE rowid = (
-            SELECT rowid FROM warns_log 
-            WHERE chat_id = ? AND user_id = ? 
-            ORDER BY timestamp ASC LIMIT 1
-        )
-    """, (chat_id, user_id))
-    await db.commit()
+    await moderation_repo.remove_oldest_warn(chat_id, user_id)
 
 
 async def get_active_warns(chat_id: int, user_id: int) -> int:
     """📊 Подсчитывает только активные (не истекшие) варны."""
     await clean_expired_warns()
-    db = await db_instance.get_connection()
-    async with db.execute("""
-        SELECT COUNT(*) FROM warns_log 
-        WHERE chat_id = ? AND user_id = ? AND expire_at > ?
-    """, (chat_id, user_id, int(time.time()))) as cursor:
-        count = await cursor.fetchone()
-    return count[0] if count else 0
+    return await moderation_repo.active_warns(chat_id, user_id, int(time.time()))
 
 
 async def clean_expired_warns():
     """🗑 Удаляет устаревшие варны (старше 7 дней)."""
-    db = await db_instance.get_connection()
-    await db.execute("DELETE FROM warns_log WHERE expire_at <= ?", (int(time.time()),))
-    await db.commit()
+    await moderation_repo.purge_expired_warns(int(time.time()))
 
 
 async def mute_user(bot: Bot, chat_id: int, user_id: int, mention: str):
     """🚫 Выдаёт мут пользователю на 7 дней."""
     until_time = int(time.time()) + MUTE_DURATION
-    db = await db_instance.get_connection()
-
-    await db.execute("""
-        INSERT INTO moderation (chat_id, user_id, mute_until, timestamp)
-        VALUES (?, ?, ?, ?) 
-        ON CONFLICT(chat_id, user_id) DO UPDATE SET mute_until = ?, timestamp = ?
-    """, (chat_id, user_id, until_time, int(time.time()), until_time, int(time.time())))
-    await db.commit()
+    await moderation_repo.set_mute(chat_id, user_id, until_time, int(time.time()))
 
     try:
         await bot.restrict_chat_member(chat_id, user_id, ChatPermissions(), until_date=until_time)
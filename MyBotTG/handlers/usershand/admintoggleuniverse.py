@@ -1,7 +1,7 @@
 from aiogram import Router, types
 from aiogram.filters import Command
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-import aiosqlite
+from repositories import cards_repo
 from config import OWNER_ID
 
 admin_universe_router = Router()
@@ -14,9 +14,7 @@ async def toggle_universe(message: types.Message):
         return
 
     # 🔹 Получаем список вселенных
-    async with aiosqlite.connect("bot_database.db") as db:
-        cursor = await db.execute("SELECT name, enabled FROM universes")
-        universes = await cursor.fetchall()
+    universes = await cards_repo.universes()
 
     if not universes:
         await message.answer("📂 В базе данных нет вселенных.")
@@ -25,10 +23,10 @@ async def toggle_universe(message: types.Message):
     # 🎛 Создаем клавиатуру
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(
-            text=f"{name.capitalize()} - {'✅ Включена' if enabled else '❌ Отключена'}",
-            callback_data=f"toggle:{name}:{1 if enabled == 0 else 0}"
+            text=f"{u.name.capitalize()} - {'✅ Включена' if u.enabled else '❌ Отключена'}",
+            callback_data=f"toggle:{u.name}:{1 if u.enabled == 0 else 0}"
         )]
-        for name, enabled in universes
+        for u in universes
     ])
 
     await message.answer("🔧 Выберите вселенную для изменения состояния:", reply_markup=keyboard)
@@ -39,9 +37,7 @@ async def toggle_universe_callback(callback: types.CallbackQuery):
     _, universe, new_state = callback.data.split(":")
     new_state = int(new_state)
 
-    async with aiosqlite.connect("bot_database.db") as db:
-        await db.execute("UPDATE universes SET enabled = ? WHERE name = ?", (new_state, universe))
-        await db.commit()
+    await cards_repo.set_universe_enabled_by_name(universe, bool(new_state))
 
     status = "✅ включена" if new_state else "❌ отключена"
     await callback.message.edit_text(f"🌌 *Вселенная* `{universe.capitalize()}` *теперь {status}*.", parse_mode="Markdown")
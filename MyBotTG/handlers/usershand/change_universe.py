@@ -1,4 +1,5 @@
-import aiosqlite
+from dabase.database import db_instance
+from repositories import users_repo, cards_repo, user_cards_repo
 from aiogram import Router, types, F
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
@@ -14,17 +15,12 @@ class ChangeUniverseState(StatesGroup):
 
 async def get_available_universes():
     """Получает список доступных вселенных из базы данных."""
-    async with aiosqlite.connect("bot_database.db") as conn:
-        cursor = await conn.execute("SELECT universe_id, name FROM universes WHERE enabled = 1")
-        universes = await cursor.fetchall()
-        return {name: universe_id for universe_id, name in universes}
+    return {u.name: u.universe_id for u in await cards_repo.universes(enabled_only=True)}
 
 
 async def reset_user_universe(user_id: int):
     """Удаляет все карты пользователя, но сохраняет очки."""
-    async with aiosqlite.connect("bot_database.db") as conn:
-        await conn.execute("DELETE FROM user_cards WHERE user_id = ?", (user_id,))
-        await conn.commit()
+    await user_cards_repo.clear(user_id)
 
 
 async def start_universe_change(callback: types.CallbackQuery, state: FSMContext):
@@ -61,11 +57,7 @@ async def process_universe_selection(callback: types.CallbackQuery, state: FSMCo
         return
 
     # Проверяем, существует ли вселенная
-    async with aiosqlite.connect("bot_database.db") as conn:
-        cursor = await conn.execute("SELECT COUNT(*) FROM universes WHERE universe_id = ?", (new_universe_id,))
-        exists = await cursor.fetchone()
-    
-    if not exists or exists[0] == 0:
+    if not await cards_repo.universe(new_universe_id):
         await callback.message.answer("❌ Ошибка: выбранная вселенная не существует!")
         return
 
@@ -103,11 +95,10 @@ async def confirm_change_universe(callback: types.CallbackQuery, state: FSMConte
         await callback.message.answer("⚠️ Ошибка: новая вселенная не найдена. Попробуйте снова.")
         return
 
-    await reset_user_universe(user_id)
-
-    async with aiosqlite.connect("bot_database.db") as conn:
-        await conn.execute("UPDATE users SET selected_universe = ? WHERE user_id = ?", (new_universe_id, user_id))
-        await conn.commit()
+    # Очистка карт и смена вселенной — одной транзакцией
+    async with db_instance.writer():
+        await reset_user_universe(user_id)
+        await users_repo.set_universe(user_id, new_universe_id)
 
     await callback.message.answer("🎉 Вы успешно сменили вселенную! Ваши карты были удалены.")
     await callback.answer()
@@ -1,4 +1,5 @@
-import aiosqlite
+from dabase.database import db_instance
+from repositories import users_repo, COOLDOWN_DAILY
 import logging
 from datetime import datetime, timedelta
 from aiogram import Router, types, F
@@ -25,27 +26,23 @@ async def give_daily_bonus(user_id: int) -> tuple[bool, int, int, str]:
     :return: (успех, новый стрик, полученный бонус, время до следующего бонуса)
     """
     try:
-        async with aiosqlite.connect("bot_database.db") as conn:
-            cursor = await conn.execute("""
-                SELECT last_claimed, daily_streak 
-                FROM users 
-                WHERE user_id = ?
-            """, (user_id,))
-            user_data = await cursor.fetchone()
+        # Отказ — из памяти, без транзакции и без разбора дат
+        seconds_left = await users_repo.cooldown_left(user_id, COOLDOWN_DAILY)
+        if seconds_left:
+            user = await users_repo.get(user_id)
+            return False, user.daily_streak if user else 0, 0, str(timedelta(seconds=int(seconds_left)))
+
+        async with db_instance.writer():
+            user = await users_repo.get(user_id)
 
             now = datetime.now()
 
-            if not user_data or not user_data[0]:
+            if not user or not user.last_claimed:
                 # Если данных нет, создаем начальную запись
-                await conn.execute("""
-                    UPDATE users
-                    SET last_claimed = ?, daily_streak = 1, spins = spins + 1
-                    WHERE user_id = ?
-                """, (get_current_time(), user_id))
-                await conn.commit()
+                await users_repo.set_daily(user_id, get_current_time(), 1, 1)
                 return True, 1, 1, ""  # Выдан 1 бонус, время до следующего бонуса - пусто
 
-            last_claimed, daily_streak = user_data
+            last_claimed, daily_streak = user.last_claimed, user.daily_streak
             last_claimed_time = datetime.strptime(last_claimed, '%Y-%m-%d %H:%M:%S')
 
             hours_since_last_claim = (now - last_claimed_time).total_seconds() / 3600
@@ -61,12 +58,7 @@ async def give_daily_bonus(user_id: int) -> tuple[bool, int, int, str]:
             # Вычисляем бонус (1-7 прокруток в зависимости от стрика)
             bonus = calculate_bonus(daily_streak + 1)
 
-            await conn.execute("""
-                UPDATE users
-                SET last_claimed = ?, daily_streak = ?, spins = spins + ?
-                WHERE user_id = ?
-            """, (get_current_time(), daily_streak + 1, bonus, user_id))
-            await conn.commit()
+            await users_repo.set_daily(user_id, get_current_time(), daily_streak + 1, bonus)
 
             return True, daily_streak + 1, bonus, ""  # ✅ Теперь возвращает только бонус и пустую строку для времени
     except Exception as e:
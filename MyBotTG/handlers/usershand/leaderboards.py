@@ -1,108 +1,187 @@
 from aiogram import Router, types
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
+from aiogram.filters.callback_data import CallbackData
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-import aiosqlite
-from dabase.database import db_instance  # Используем асинхронную БД
+from repositories import users_repo, cards_repo, scores_repo, SCOPE_ALL, SCOPE_UNIVERSE, SCOPE_CHAT
 
 leaderboard_router = Router()
 
-def create_leaderboard_keyboard() -> InlineKeyboardMarkup:
-    """Создаёт клавиатуру для обновления топа."""
+# 🔹 Аргументы /top: `/top`, `/top чат`, `/top вселенная` (выбранная) или `/top <id или имя вселенной>`
+CHAT_SCOPE_ARGS = {"чат", "chat"}
+UNIVERSE_SCOPE_ARGS = {"вселенная", "universe"}
+
+
+class LeaderboardCallback(CallbackData, prefix="top"):
+    """
+    «🔄 Обновить»: какой рейтинг показан (для чата — чат сообщения) и что в нём показано —
+    версия снимка топа и строка «Ваше место» (position=0 — строки нет).
+    Совпало с текущим — данные актуальны, текст не строим.
+    """
+    scope: str
+    universe: str
+    version: int
+    position: int
+    points: int
+
+
+class LeaderboardScopeCallback(CallbackData, prefix="top_scope"):
+    """Переключение рейтинга; пустая universe — выбранная вселенная нажавшего."""
+    scope: str
+    universe: str = ""
+
+
+def is_group(chat: types.Chat) -> bool:
+    return chat.type in ("group", "supergroup")
+
+
+def create_leaderboard_keyboard(state: LeaderboardCallback, in_group: bool) -> InlineKeyboardMarkup:
+    """Создаёт клавиатуру для обновления топа и переключения рейтингов."""
+    switches = [
+        InlineKeyboardButton(text="🌍 Общий", callback_data=LeaderboardScopeCallback(scope=SCOPE_ALL).pack()),
+        InlineKeyboardButton(text="🪐 Вселенная", callback_data=LeaderboardScopeCallback(scope=SCOPE_UNIVERSE).pack()),
+    ]
+    if in_group:
+        switches.append(InlineKeyboardButton(text="💬 Чат", callback_data=LeaderboardScopeCallback(scope=SCOPE_CHAT).pack()))
     return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="🔄 Обновить", callback_data="refresh_leaderboard")]
+        [InlineKeyboardButton(text="🔄 Обновить", callback_data=state.pack())],
+        switches,
     ])
 
-async def get_leaderboard_with_position(user_id: int) -> str:
+async def resolve_scope(user_id: int, chat: types.Chat, scope: str, universe: str = "") -> tuple[str, object, str] | str:
+    """
+    Рейтинг для показа: (scope, id вселенной или чата, заголовок) или текст ошибки.
+    :param universe: id или имя вселенной; пусто — выбранная вселенная пользователя.
+    """
+    if scope == SCOPE_CHAT:
+        if not is_group(chat):
+            return "💬 Рейтинг чата доступен только в группах."
+        return SCOPE_CHAT, chat.id, "🏆 *Топ-10 чата по очкам сезона:*"
+    if scope == SCOPE_UNIVERSE:
+        universe = universe or await users_repo.get_universe(user_id)
+        if not universe:
+            return "🪐 Сначала выберите вселенную."
+        row = next((row for row in await cards_repo.universes()
+                    if universe.lower() in (row.universe_id.lower(), (row.name or "").lower())), None)
+        if row is None:
+            return "❌ Вселенная не найдена."
+        return SCOPE_UNIVERSE, row.universe_id, f"🏆 *Топ-10 вселенной {row.name}:*"
+    return SCOPE_ALL, None, "🏆 *Топ-10 пользователей по очкам сезона:*"
+
+async def leaderboard_state(user_id: int, scope: str, scope_id) -> tuple[list, LeaderboardCallback, tuple | None]:
+    """
+    Снимок топа-10 рейтинга (общий для всех, с коротким TTL) и место пользователя поверх него.
+    :return: (топ, состояние для кнопки, (username, очки) пользователя или None)
+    """
+    snapshot = await scores_repo.top_snapshot(scope, scope_id, 10)
+    user_position, current_user_data = await scores_repo.rank(scope, scope_id, user_id)
+    universe = scope_id if scope == SCOPE_UNIVERSE else ""
+    if user_position <= 10 or not current_user_data:
+        state = LeaderboardCallback(scope=scope, universe=universe, version=snapshot.version, position=0, points=0)
+        return snapshot.top, state, None
+    state = LeaderboardCallback(scope=scope, universe=universe, version=snapshot.version,
+                                position=user_position, points=current_user_data[1])
+    return snapshot.top, state, current_user_data
+
+def format_leaderboard(title: str, top_users: list, state: LeaderboardCallback, current_user_data: tuple | None) -> str:
     """
     Формирует текст топа-10 с позицией текущего пользователя.
-    :param user_id: ID пользователя для отображения его позиции.
     :return: Отформатированный текст топа.
     """
-    async with await db_instance.get_connection() as db:
-        # Получаем топ-10 пользователей
-        async with db.execute("""
-            SELECT username, total_points
-            FROM users
-            WHERE total_points > 0
-            ORDER BY total_points DESC
-            LIMIT 10
-        """) as cursor:
-            top_users = await cursor.fetchall()
-
-        # Определяем позицию текущего пользователя
-        async with db.execute("""
-            SELECT COUNT(*) + 1
-            FROM users
-            WHERE total_points > (SELECT total_points FROM users WHERE user_id = ?)
-        """, (user_id,)) as cursor:
-            user_position = (await cursor.fetchone())[0]
-
-        # Получаем данные текущего пользователя
-        async with db.execute("""
-            SELECT username, total_points
-            FROM users
-            WHERE user_id = ?
-        """, (user_id,)) as cursor:
-            current_user_data = await cursor.fetchone()
-
-    # Формируем текст топа
-    leaderboard_text = "🏆 *Топ-10 пользователей по очкам сезона:*\n\n"
+    leaderboard_text = f"{title}\n\n"
+    if not top_users:
+        leaderboard_text += "Пока никто не набрал очков.\n"
     for i, row in enumerate(top_users, start=1):
         username, points = row
         medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}️⃣"
         leaderboard_text += f"{medal} - {username or 'Безымянный'}: {points} очков\n"
 
     # Добавляем позицию текущего пользователя, если он не в топ-10
-    if user_position > 10 and current_user_data:
+    if current_user_data:
         leaderboard_text += "\n"
-        leaderboard_text += f"ℹ️ *Ваше место*: {user_position} ({current_user_data[0] or 'Безымянный'}: {current_user_data[1]} очков)"
+        leaderboard_text += f"ℹ️ *Ваше место*: {state.position} ({current_user_data[0] or 'Безымянный'}: {state.points} очков)"
 
     return leaderboard_text
 
+async def render_leaderboard(user_id: int, chat: types.Chat, scope: str,
+                             universe: str = "") -> tuple[str, InlineKeyboardMarkup | None]:
+    """:return: (текст, клавиатура) или (текст ошибки, None)."""
+    resolved = await resolve_scope(user_id, chat, scope, universe)
+    if isinstance(resolved, str):
+        return resolved, None
+    scope, scope_id, title = resolved
+    top_users, state, current_user_data = await leaderboard_state(user_id, scope, scope_id)
+    return format_leaderboard(title, top_users, state, current_user_data), create_leaderboard_keyboard(state, is_group(chat))
+
+async def edit_leaderboard(callback: types.CallbackQuery, text: str, reply_markup: InlineKeyboardMarkup):
+    """Обновляет сообщение с топом."""
+    try:
+        await callback.message.edit_text(text, parse_mode="Markdown", reply_markup=reply_markup)
+        await callback.answer("Топ обновлен!")
+    except TelegramBadRequest as e:
+        # Если ошибка возникает, например, из-за того, что текст не изменился
+        if "message is not modified" in str(e):
+            await callback.answer("Данные актуальны!")
+        else:
+            raise
+
 @leaderboard_router.message(Command("top"))
 @leaderboard_router.message(Command("leaders"))
 @leaderboard_router.message(lambda message: message.text and message.text.lower() == "лидеры")
-async def show_leaderboard(message: types.Message):
-    """Отправляет топ-10 игроков с позицией текущего пользователя."""
+async def show_leaderboard(message: types.Message, command: CommandObject | None = None):
+    """Отправляет топ-10 игроков рейтинга (общего, вселенной или чата) с позицией текущего пользователя."""
     user_id = message.from_user.id
 
+    argument = (command.args or "").strip() if command else ""
+    if not argument:
+        scope, universe = SCOPE_ALL, ""
+    elif argument.lower() in CHAT_SCOPE_ARGS:
+        scope, universe = SCOPE_CHAT, ""
+    elif argument.lower() in UNIVERSE_SCOPE_ARGS:
+        scope, universe = SCOPE_UNIVERSE, ""
+    else:
+        scope, universe = SCOPE_UNIVERSE, argument
+
     # Формируем текст топа
-    leaderboard_text = await get_leaderboard_with_position(user_id)
+    leaderboard_text, reply_markup = await render_leaderboard(user_id, message.chat, scope, universe)
 
     # Отправляем сообщение с топом
-    await message.answer(leaderboard_text, parse_mode="Markdown", reply_markup=create_leaderboard_keyboard())
+    await message.answer(leaderboard_text, parse_mode="Markdown", reply_markup=reply_markup)
 
-@leaderboard_router.callback_query(lambda callback: callback.data == "refresh_leaderboard")
-async def refresh_leaderboard(callback: types.CallbackQuery):
+@leaderboard_router.callback_query(LeaderboardCallback.filter())
+@leaderboard_router.callback_query(lambda callback: callback.data == "refresh_leaderboard")  # Сообщения до версий
+async def refresh_leaderboard(callback: types.CallbackQuery, callback_data: LeaderboardCallback | None = None):
     """Обновляет сообщение с топом."""
     user_id = callback.from_user.id
+    chat = callback.message.chat
+    scope, universe = (callback_data.scope, callback_data.universe) if callback_data else (SCOPE_ALL, "")
 
-    # Формируем текст топа
-    leaderboard_text = await get_leaderboard_with_position(user_id)
-
-    # Проверяем текущие текст и клавиатуру
-    current_text = callback.message.text or ""
-    current_reply_markup = callback.message.reply_markup
+    resolved = await resolve_scope(user_id, chat, scope, universe)
+    if isinstance(resolved, str):
+        await callback.answer(resolved, show_alert=True)
+        return
+    scope, scope_id, title = resolved
 
-    new_reply_markup = create_leaderboard_keyboard()
+    # Снимок топа и место пользователя — без перестроения, если снимок свежий
+    top_users, state, current_user_data = await leaderboard_state(user_id, scope, scope_id)
 
-    # Если текст и клавиатура совпадают, уведомляем пользователя
-    if current_text == leaderboard_text and current_reply_markup == new_reply_markup:
+    # Показанное в сообщении состояние совпадает с текущим — текст не строим и не редактируем
+    if state == callback_data:
         await callback.answer("Данные актуальны!")
         return
 
-    # Обновляем текст сообщения
-    try:
-        await callback.message.edit_text(
-            leaderboard_text,
-            parse_mode="Markdown",
-            reply_markup=new_reply_markup
-        )
-        await callback.answer("Топ обновлен!")
-    except TelegramBadRequest as e:
-        # Если ошибка возникает, например, из-за того, что текст не изменился
-        if "message is not modified" in str(e):
-            await callback.answer("Данные актуальны!")
-        else:
-            raise
+    await edit_leaderboard(
+        callback, format_leaderboard(title, top_users, state, current_user_data),
+        create_leaderboard_keyboard(state, is_group(chat))
+    )
+
+@leaderboard_router.callback_query(LeaderboardScopeCallback.filter())
+async def switch_leaderboard(callback: types.CallbackQuery, callback_data: LeaderboardScopeCallback):
+    """Переключает сообщение с топом на другой рейтинг."""
+    leaderboard_text, reply_markup = await render_leaderboard(
+        callback.from_user.id, callback.message.chat, callback_data.scope, callback_data.universe
+    )
+    if reply_markup is None:
+        await callback.answer(leaderboard_text, show_alert=True)
+        return
+    await edit_leaderboard(callback, leaderboard_text, reply_markup)
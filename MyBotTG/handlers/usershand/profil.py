@@ -1,7 +1,7 @@
 from aiogram import Router, types, F
 from aiogram.filters import Command
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from dabase.database import db_instance  # Используем асинхронную БД
+from repositories import users_repo, cards_repo, user_cards_repo
 from handlers.usershand.change_universe import start_universe_change
 from promo.promocode import promocode_keyboard  # Инлайн-клавиатура для промокодов
 
@@ -25,15 +25,13 @@ async def show_profile(event: types.Message | types.CallbackQuery):
     user_id = event.from_user.id
     message = event.message if isinstance(event, types.CallbackQuery) else event
 
-    db = await db_instance.get_connection()  # 🛠 Получаем активное соединение
-    async with db.execute("SELECT total_points, spins, selected_universe FROM users WHERE user_id = ?", (user_id,)) as cursor:
-        user_data = await cursor.fetchone()
+    user = await users_repo.get(user_id)
 
-    if not user_data:
+    if not user:
         await message.answer("Ваш профиль не найден. Пожалуйста, зарегистрируйтесь с помощью команды /start.")
         return
 
-    total_points, spins, selected_universe = user_data
+    total_points, spins, selected_universe = user.total_points, user.spins, user.selected_universe
     spins = spins or 0
 
     if not selected_universe:
@@ -42,11 +40,8 @@ async def show_profile(event: types.Message | types.CallbackQuery):
         )
         return
 
-    async with db.execute("SELECT COUNT(DISTINCT card_id) FROM user_cards WHERE user_id = ?", (user_id,)) as cursor:
-        user_cards_count = (await cursor.fetchone())[0] or 0
-
-    async with db.execute(f"SELECT COUNT(*) FROM [{selected_universe}]") as cursor:
-        total_universe_cards = (await cursor.fetchone())[0] or 0
+    user_cards_count = await user_cards_repo.count_distinct(user_id)
+    total_universe_cards = await cards_repo.count(selected_universe)
 
     profile_text = (
         f"👤 *Ваш профиль:*\n\n"
@@ -3,7 +3,7 @@ from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
-import aiosqlite
+from repositories import promo_repo
 from config import OWNER_ID
 
 admin_router = Router()
@@ -73,12 +73,7 @@ async def process_bonus_and_limit(message: types.Message, state: FSMContext):
     promocode = data["promocode"]
 
     # 🔹 Записываем в базу данных
-    async with aiosqlite.connect("bot_database.db") as db:
-        await db.execute("""
-            INSERT INTO promocodes (promocode, spins_bonus, usage_limit) 
-            VALUES (?, ?, ?)
-        """, (promocode, spins_bonus, usage_limit))
-        await db.commit()
+    await promo_repo.add(promocode, spins_bonus, usage_limit)
 
     await state.clear()
     await message.answer(
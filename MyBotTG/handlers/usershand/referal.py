@@ -1,11 +1,10 @@
-import aiosqlite
 import random
 from aiogram import Router, types, Bot
 from aiogram.exceptions import TelegramAPIError
 from aiogram.filters import Command
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from config import CHANNEL_ID, CHANNEL_LINK
-from dabase.database import db_instance  # Используем асинхронное подключение
+from repositories import user_cards_repo, promo_repo
 
 referal_router = Router()
 
@@ -21,10 +20,7 @@ async def is_user_subscribed(bot: Bot, user_id: int) -> bool:
 
 async def get_user_card_count(user_id: int) -> int:
     """Подсчитывает количество карт у пользователя."""
-    async with await db_instance.get_connection() as db:
-        async with db.execute("SELECT COUNT(*) FROM user_cards WHERE user_id = ?", (user_id,)) as cursor:
-            count = await cursor.fetchone()
-    return count[0] if count else 0
+    return await user_cards_repo.count(user_id)
 
 
 async def check_referral_validity(user_id: int, bot: Bot):
@@ -34,29 +30,23 @@ async def check_referral_validity(user_id: int, bot: Bot):
     - Собрал 3 карты
     - Только после этого реферал засчитывается
     """
-    async with await db_instance.get_connection() as db:
-        async with db.execute("SELECT referrer_id, is_valid FROM referrals WHERE referral_id = ?", (user_id,)) as cursor:
-            referral_data = await cursor.fetchone()
+    referral = await promo_repo.referral(user_id)
 
-        if not referral_data:
-            return
+    if not referral:
+        return
 
-        referrer_id, is_valid = referral_data
+    if referral.is_valid:  # Если уже засчитан — ничего не делаем
+        return  
 
-        if is_valid:  # Если уже засчитан — ничего не делаем
-            return  
+    if not await is_user_subscribed(bot, user_id):  # Проверяем подписку
+        return  
 
-        if not await is_user_subscribed(bot, user_id):  # Проверяем подписку
-            return  
+    if await get_user_card_count(user_id) < 3:  # Проверяем количество карт
+        return  
 
-        if await get_user_card_count(user_id) < 3:  # Проверяем количество карт
-            return  
-
-        # Если все условия выполнены, засчитываем реферала
-        await db.execute("UPDATE referrals SET is_valid = 1 WHERE referral_id = ?", (user_id,))
-        await db.execute("UPDATE users SET spins = spins + 1 WHERE user_id = ?", (referrer_id,))  # 1 крутка пригласившему
-        await db.execute("UPDATE users SET spins = spins + 2 WHERE user_id = ?", (user_id,))  # 2 крутки приглашенному
-        await db.commit()
+    # Если все условия выполнены, засчитываем реферала (повторно не начисляем)
+    # 1 крутка пригласившему, 2 крутки приглашенному
+    await promo_repo.validate_referral(referral, referrer_bonus=1, referral_bonus=2)
 
 
 def get_referral_link(user_id: int) -> str:
@@ -114,11 +104,7 @@ async def my_referrals(callback: types.CallbackQuery):
     """Показывает список рефералов и бонусы."""
     user_id = callback.from_user.id
 
-    async with await db_instance.get_connection() as db:
-        async with db.execute("SELECT COUNT(*) FROM referrals WHERE referrer_id = ? AND is_valid = 1", (user_id,)) as cursor:
-            valid_referrals = await cursor.fetchone()
-
-    valid_referrals = valid_referrals[0] if valid_referrals else 0
+    valid_referrals = await promo_repo.valid_referrals(user_id)
     extra_spins = (valid_referrals // 5) * 2  # +2 крутки за каждые 5 рефералов
 
     await callback.message.edit_text(
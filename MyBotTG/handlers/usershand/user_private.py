@@ -10,10 +10,10 @@ router = Router()
 @router.message(F.chat.type == 'private', CommandStart())
 async def start_cmd(message: types.Message):
     # Регистрируем пользователя
-    register_user(message.from_user.id, message.from_user.username)
+    await register_user(message.from_user.id, message.from_user.username)
 
     # Проверяем, зарегистрирован ли пользователь
-    user_info = get_user_info(message.from_user.id)
+    user_info = await get_user_info(message.from_user.id)
     if user_info:
         # Генерация клавиатуры
         keyboard = get_main_keyboard(user_id=message.from_user.id)
@@ -39,6 +39,7 @@ async def help_cmd(message: types.Message):
         "👤 *Общие команды:*\n"
         "\\/start \\- Начать или перезапустить взаимодействие с ботом\n"
         "\\/card \\- Получить карту\n"
+        "\\/card N \\- Открыть N прокруток разом\n"
         "\\/daily \\- Получить ежедневный бонус\n"
         "\\/cards \\- Просмотреть свои карты\n"
         "\\/profile \\- Просмотреть свой профиль\n"
@@ -58,6 +59,8 @@ async def help_cmd(message: types.Message):
             "\\/toggle\\_universe \\- Включить либо выключить вселенную\n"
             "\\/add\\_universe \\- Добавить вселенную\n"
             "\\/update\\_shop \\- Обновить магазин\n"
+            "\\/loop\\_lag \\- Задержки event loop\n"
+            "\\/db\\_stats \\- Статистика БД и кэшей\n"
         )
 
     await message.answer(help_text, parse_mode="MarkdownV2")
@@ -1,51 +1,39 @@
 from aiogram import Router, types
-from aiogram.types import FSInputFile, InputMediaPhoto
+from aiogram.types import InputMediaPhoto
 from handlers.cardshand.callbackcards import PaginationCallback, ReturnCallback
 from kbds.inlinecards import pagination_keyboard, rarity_keyboard_for_user
-import aiosqlite  # Используем асинхронную версию sqlite3
-import os
+from repositories import users_repo, user_cards_repo
+from utils.card_photos import send_card_photo
+from utils.image_store import image_store
 
 cardspagination_router = Router()
 
 
 @cardspagination_router.callback_query(PaginationCallback.filter())
 async def paginate_cards(callback: types.CallbackQuery, callback_data: PaginationCallback):
-    """Обработчик кнопок пагинации карт."""
+    """Обработчик кнопок пагинации карт: курсор из кнопки — одна карта и её соседи, не весь список."""
     user_id = callback.from_user.id
     rarity = callback_data.rarity_type
-    index = callback_data.index
 
-    async with aiosqlite.connect("bot_database.db") as conn:
-        cursor = await conn.execute("SELECT selected_universe FROM users WHERE user_id = ?", (user_id,))
-        selected_universe = await cursor.fetchone()
+    selected_universe = await users_repo.get_universe(user_id)
 
-        if not selected_universe or not selected_universe[0]:
-            await callback.answer("Вы не выбрали вселенную.", show_alert=True)
-            return
-
-        selected_universe = selected_universe[0]
-
-        # Получаем карты указанной редкости
-        cursor = await conn.execute(f"""
-        SELECT c.card_id, c.name, c.photo_path, c.rarity, c.points
-        FROM user_cards uc
-        JOIN [{selected_universe}] c ON uc.card_id = c.card_id
-        WHERE uc.user_id = ? AND c.rarity = ?
-        """, (user_id, rarity))
+    if not selected_universe:
+        await callback.answer("Вы не выбрали вселенную.", show_alert=True)
+        return
 
-        cards = await cursor.fetchall()
+    page = await user_cards_repo.page(
+        user_id, selected_universe, rarity, card_id=callback_data.card_id, position=callback_data.position
+    )
 
-    if not cards:
+    if not page:
         await callback.answer("Нет карт для отображения.", show_alert=True)
         return
 
-    total = len(cards)
-    index = index % total  # Корректируем индекс
-
-    card_id, name, photo_path, rarity, points = cards[index]
+    card = page.card
+    name, photo_path, rarity, points = card.name, card.photo_path, card.rarity, card.points
 
     # Проверяем, существует ли изображение
-    if not os.path.isfile(photo_path):
+    if not await image_store.exists(photo_path):
         await callback.message.edit_text(
             f"Ошибка: файл изображения для карты '{name}' не найден.",
             reply_markup=rarity_keyboard_for_user({}, {}, selected_universe)
@@ -59,21 +47,14 @@ async def paginate_cards(callback: types.CallbackQuery, callback_data: Paginatio
     )
 
     # Кнопки пагинации
-    pagination_markup = pagination_keyboard(rarity=rarity, index=index, total=total, include_return=True)
-
-    # Создаем объект InputMediaPhoto для отображения изображения
-    media = InputMediaPhoto(
-        media=FSInputFile(photo_path),
-        caption=caption,
-        parse_mode="Markdown"
-    )
+    pagination_markup = pagination_keyboard(rarity=rarity, page=page, include_return=True)
 
     try:
-        # Отправляем обновленное сообщение
-        await callback.message.edit_media(
-            media=media,
+        # Отправляем обновленное сообщение (изображение — по file_id, если уже загружено)
+        await send_card_photo(photo_path, lambda photo: callback.message.edit_media(
+            media=InputMediaPhoto(media=photo, caption=caption, parse_mode="Markdown"),
             reply_markup=pagination_markup
-        )
+        ))
     except Exception as e:
         print(f"Ошибка при обновлении карты: {e}")
         await callback.answer("Произошла ошибка при переключении карт.", show_alert=True)
@@ -89,34 +70,17 @@ async def return_to_categories(callback: types.CallbackQuery, callback_data: Ret
 
     user_id = callback.from_user.id
 
-    async with aiosqlite.connect("bot_database.db") as conn:
-        cursor = await conn.execute("SELECT selected_universe FROM users WHERE user_id = ?", (user_id,))
-        selected_universe = await cursor.fetchone()
-
-        if not selected_universe or not selected_universe[0]:
-            await callback.message.delete()
-            await callback.message.answer("Вы не выбрали вселенную. Используйте команду /select_universe для выбора.")
-            return
-
-        selected_universe = selected_universe[0]
-
-        # Считаем карты пользователя по редкостям
-        cursor = await conn.execute(f"""
-        SELECT c.rarity, COUNT(uc.card_id)
-        FROM user_cards uc
-        JOIN [{selected_universe}] c ON uc.card_id = c.card_id
-        WHERE uc.user_id = ?
-        GROUP BY c.rarity
-        """, (user_id,))
-        user_cards = {row[0]: row[1] for row in await cursor.fetchall()}
-
-        # Считаем общее количество карт в базе по редкостям
-        cursor = await conn.execute(f"""
-        SELECT rarity, COUNT(card_id)
-        FROM [{selected_universe}]
-        GROUP BY rarity
-        """)
-        total_cards = {row[0]: row[1] for row in await cursor.fetchall()}
+    selected_universe = await users_repo.get_universe(user_id)
+
+    # Счётчики карт пользователя и всего каталога по редкостям
+    overview = await user_cards_repo.overview(user_id, selected_universe) if selected_universe else None
+    user_cards = overview.owned if overview else {}
+    total_cards = overview.total if overview else {}
+
+    if not selected_universe:
+        await callback.message.delete()
+        await callback.message.answer("Вы не выбрали вселенную. Используйте команду /select_universe для выбора.")
+        return
 
     # Формируем клавиатуру с кнопками редкостей
     keyboard = rarity_keyboard_for_user(user_cards, total_cards, selected_universe)
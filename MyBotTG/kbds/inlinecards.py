@@ -1,6 +1,8 @@
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from handlers.cardshand.callbackcards import RarityCallback, OwnerRarityCallback, PaginationCallback, AdminPaginationCallback, ReturnCallback, EditCardCallback
+from repositories.rows import CardPage
+from handlers.cardshand.callbackcards import RarityCallback, OwnerRarityCallback, PaginationCallback, AdminPaginationCallback, ReturnCallback, EditCardCallback, GridCallback
+from utils.collage import COLLAGE_LIMIT
 
 
 def rarity_keyboard_for_user(user_cards: dict, total_cards: dict, universe: str) -> InlineKeyboardMarkup:
@@ -28,10 +30,10 @@ def rarity_keyboard_for_user(user_cards: dict, total_cards: dict, universe: str)
     return builder.as_markup()
 
 
-def rarity_keyboard_for_owner(universe: str) -> InlineKeyboardMarkup:
+async def rarity_keyboard_for_owner(universe: str) -> InlineKeyboardMarkup:
     from dabase.databasehelp import fetch_cards_by_rarity
 
-    total_cards = fetch_cards_by_rarity(universe)
+    total_cards = await fetch_cards_by_rarity(universe)
     builder = InlineKeyboardBuilder()
     rarities = ["обычная", "редкая", "эпическая", "легендарная", "мифическая"]
 
@@ -48,30 +50,47 @@ def rarity_keyboard_for_owner(universe: str) -> InlineKeyboardMarkup:
 
 
 
-def pagination_keyboard(rarity, index, total, include_return=True) -> InlineKeyboardMarkup:
+def pager_row(page: CardPage, make_callback) -> list[InlineKeyboardButton]:
+    """
+    Кнопки ⬅️ N/всего ➡️ общего браузера карт. В кнопки кладутся только курсоры —
+    card_id соседних карт из страницы.
+    :param page: Текущая страница (карта и её соседи).
+    :param make_callback: Функция (соседняя карта, её номер) → CallbackData.
+    """
+    return [
+        InlineKeyboardButton(
+            text="⬅️",
+            callback_data=make_callback(page.prev, (page.position - 1) % page.total).pack()
+        ),
+        InlineKeyboardButton(
+            text=f"{page.position + 1}/{page.total}",
+            callback_data="noop"  # Неприменяемая кнопка, отображающая текущий счётчик
+        ),
+        InlineKeyboardButton(
+            text="➡️",
+            callback_data=make_callback(page.next, (page.position + 1) % page.total).pack()
+        ),
+    ]
+
+
+def pagination_keyboard(rarity, page: CardPage, include_return=True) -> InlineKeyboardMarkup:
     """
     Создаёт клавиатуру для пагинации.
     :param rarity: Текущая редкость карт.
-    :param index: Индекс текущей карты.
-    :param total: Общее количество карт.
+    :param page: Текущая страница (UserCardsRepo.page).
     :param include_return: Флаг для добавления кнопки "Вернуться".
     :return: InlineKeyboardMarkup
     """
     builder = InlineKeyboardBuilder()
 
-    if total > 1:
+    if page.total > 1:
+        builder.row(*pager_row(page, lambda card, position: PaginationCallback(
+            rarity_type=rarity, card_id=card.card_id, position=position
+        )))
         builder.row(
             InlineKeyboardButton(
-                text="⬅️",
-                callback_data=PaginationCallback(rarity_type=rarity, index=(index - 1) % total).pack()
-            ),
-            InlineKeyboardButton(
-                text=f"{index + 1}/{total}",
-                callback_data="noop"  # Неприменяемая кнопка, отображающая текущий счётчик
-            ),
-            InlineKeyboardButton(
-                text="➡️",
-                callback_data=PaginationCallback(rarity_type=rarity, index=(index + 1) % total).pack()
+                text="🔲 Сеткой",
+                callback_data=GridCallback(rarity_type=rarity, page=page.position // COLLAGE_LIMIT).pack()
             )
         )
 
@@ -86,62 +105,62 @@ def pagination_keyboard(rarity, index, total, include_return=True) -> InlineKeyb
     return builder.as_markup()
 
 
-def admin_pagination_keyboard(rarity, index, total) -> InlineKeyboardMarkup:
+def grid_keyboard(rarity, page: int, pages: int, first_card_id: int) -> InlineKeyboardMarkup:
     """
-    Создаёт клавиатуру для пагинации карт владельца.
+    Клавиатура коллажа: переключение коллажей и возврат к просмотру по одной карте.
     :param rarity: Текущая редкость карт.
-    :param index: Индекс текущей карты.
-    :param total: Общее количество карт.
+    :param page: Номер коллажа.
+    :param pages: Всего коллажей.
+    :param first_card_id: Первая карта коллажа — с неё продолжится просмотр по одной.
     :return: InlineKeyboardMarkup
     """
     builder = InlineKeyboardBuilder()
 
-    if total > 1:
+    if pages > 1:
         builder.row(
-            InlineKeyboardButton(
-                text="⬅️",
-                callback_data=AdminPaginationCallback(rarity_type=rarity, index=(index - 1) % total).pack()
-            ),
-            InlineKeyboardButton(
-                text=f"{index + 1}/{total}",
-                callback_data="noop"  # Неприменяемая кнопка, отображающая текущий счётчик
-            ),
-            InlineKeyboardButton(
-                text="➡️",
-                callback_data=AdminPaginationCallback(rarity_type=rarity, index=(index + 1) % total).pack()
-            )
+            InlineKeyboardButton(text="⬅️", callback_data=GridCallback(rarity_type=rarity, page=(page - 1) % pages).pack()),
+            InlineKeyboardButton(text=f"{page + 1}/{pages}", callback_data="noop"),
+            InlineKeyboardButton(text="➡️", callback_data=GridCallback(rarity_type=rarity, page=(page + 1) % pages).pack())
         )
 
-    return builder.as_markup()
-
-
-
-def edit_card_keyboard(card_id, universe) -> InlineKeyboardMarkup:
-    """
-    Создает инлайн-кнопки для редактирования карты.
-    :param card_id: ID карты.
-    :param universe: Вселенная карты.
-    :return: InlineKeyboardMarkup
-    """
-    builder = InlineKeyboardBuilder()
-
     builder.row(
         InlineKeyboardButton(
-            text="✏️ Редкость",
-            callback_data=EditCardCallback(action="edit_rarity", card_id=card_id, universe=universe).pack()
+            text="🃏 По одной",
+            callback_data=PaginationCallback(
+                rarity_type=rarity, card_id=first_card_id, position=page * COLLAGE_LIMIT
+            ).pack()
         )
     )
     builder.row(
         InlineKeyboardButton(
-            text="✏️ Очки",
-            callback_data=EditCardCallback(action="edit_points", card_id=card_id, universe=universe).pack()
+            text="Вернуться",
+            callback_data=ReturnCallback(action="to_categories").pack()
         )
     )
+
+    return builder.as_markup()
+
+
+def admin_pagination_keyboard(universe, rarity, page: CardPage) -> InlineKeyboardMarkup:
+    """
+    Создаёт клавиатуру для пагинации карт владельца с кнопками редактирования текущей карты.
+    :param universe: Вселенная карт.
+    :param rarity: Текущая редкость карт.
+    :param page: Текущая страница (CardsRepo.page).
+    :return: InlineKeyboardMarkup
+    """
+    builder = InlineKeyboardBuilder()
+
+    if page.total > 1:
+        builder.row(*pager_row(page, lambda card, position: AdminPaginationCallback(
+            universe=universe, rarity_type=rarity, card_id=card.card_id
+        )))
+
+    card_id = page.card.card_id
     builder.row(
-        InlineKeyboardButton(
-            text="❌ Карту",
-            callback_data=EditCardCallback(action="delete", card_id=card_id, universe=universe).pack()
-        )
+        InlineKeyboardButton(text="✏️ Редкость", callback_data=EditCardCallback(action="edit_rarity", card_id=card_id, universe=universe).pack()),
+        InlineKeyboardButton(text="✏️ Очки", callback_data=EditCardCallback(action="edit_points", card_id=card_id, universe=universe).pack()),
+        InlineKeyboardButton(text="❌ Карту", callback_data=EditCardCallback(action="delete", card_id=card_id, universe=universe).pack())
     )
 
     return builder.as_markup()
@@ -1,25 +1,20 @@
-import sqlite3
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
+from repositories import cards_repo
 
-def get_available_universes():
+async def get_available_universes():
     """
     Получает список доступных вселенных из базы данных.
     """
-    conn = sqlite3.connect("bot_database.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM universes WHERE enabled = 1")
-    universes = [row[0] for row in cursor.fetchall()]
-    conn.close()
-    return universes
+    return [universe.name for universe in await cards_repo.universes(enabled_only=True)]
 
-def create_universe_selection_keyboard():
+async def create_universe_selection_keyboard():
     """
     Создает клавиатуру для выбора вселенной.
     """
-    universes = get_available_universes()
+    universes = await get_available_universes()
     return ReplyKeyboardMarkup(
         keyboard=[
-            [KeyboardButton(universe) for universe in universes],
+            [KeyboardButton(text=universe) for universe in universes],
         ],
         resize_keyboard=True
     )
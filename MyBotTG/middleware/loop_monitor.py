@@ -0,0 +1,27 @@
+from aiogram import types
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from utils.loop_monitor import loop_monitor
+
+
+class LoopMonitorMiddleware(BaseMiddleware):
+    """
+    Внутренний middleware: сообщает монитору о начале и конце каждого обработчика,
+    чтобы монитор event loop мог назвать виновника блокировки.
+    """
+
+    async def __call__(self, handler, event: types.TelegramObject, data: dict):
+        if not loop_monitor.running:
+            return await handler(event, data)
+
+        handler_object = data.get("handler")
+        callback = getattr(handler_object, "callback", None)
+        name = f"{callback.__module__}.{callback.__qualname__}" if callback else type(event).__name__
+        update = data.get("event_update")
+        if update is not None:
+            name += f" (update {update.update_id})"
+
+        token = loop_monitor.handler_started(name)
+        try:
+            return await handler(event, data)
+        finally:
+            loop_monitor.handler_finished(token)
@@ -4,7 +4,7 @@ from aiogram.filters import Command
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.fsm.context import FSMContext
 from asyncio import sleep, create_task
-import sqlite3
+from repositories import promo_repo, PROMO_NOT_FOUND, PROMO_EXHAUSTED, PROMO_ALREADY_USED
 
 promocode_router = Router()
 
@@ -52,48 +52,24 @@ async def process_promocode(message: types.Message, state: FSMContext):
     promocode = message.text.strip()
     user_id = message.from_user.id
 
-    conn = sqlite3.connect("bot_database.db")
-    cursor = conn.cursor()
+    status, promo = await promo_repo.redeem(user_id, promocode)
 
-    # Проверяем существование промокода
-    cursor.execute("""
-        SELECT promocode, spins_bonus, usage_limit, usage_count
-        FROM promocodes
-        WHERE promocode = ?
-    """, (promocode,))
-    promocode_data = cursor.fetchone()
-
-    if not promocode_data:
+    if status == PROMO_NOT_FOUND:
         # Если промокод неверный, отправляем сообщение, но не сбрасываем состояние
         await message.answer("❌ Неверный промокод! Попробуйте ещё раз.")
-        conn.close()
         return
 
-    promocode, spins_bonus, usage_limit, usage_count = promocode_data
-
-    if usage_count >= usage_limit:
+    if status == PROMO_EXHAUSTED:
         await message.answer("❌ Этот промокод уже исчерпан.")
         await state.clear()
-        conn.close()
         return
 
-    cursor.execute("""
-        SELECT 1
-        FROM user_promocodes
-        WHERE user_id = ? AND promocode = ?
-    """, (user_id, promocode))
-    if cursor.fetchone():
+    if status == PROMO_ALREADY_USED:
         await message.answer("❌ Вы уже использовали этот промокод!")
         await state.clear()
-        conn.close()
         return
 
-    # Если проверки пройдены, начисляем бонусы
-    cursor.execute("UPDATE users SET spins = spins + ? WHERE user_id = ?", (spins_bonus, user_id))
-    cursor.execute("INSERT INTO user_promocodes (user_id, promocode) VALUES (?, ?)", (user_id, promocode))
-    cursor.execute("UPDATE promocodes SET usage_count = usage_count + 1 WHERE promocode = ?", (promocode,))
-    conn.commit()
-    conn.close()
+    promocode, spins_bonus = promo.promocode, promo.spins_bonus
 
     # Успешное использование промокода
     await message.answer(f"🎉 Промокод «*{promocode}*» успешно активирован! Вы получили {spins_bonus} прокруток.",
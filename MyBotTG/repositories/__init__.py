@@ -0,0 +1,48 @@
+"""
+Репозитории — единственное место, где живёт SQL.
+Обработчики работают с объектами-строками (`user.spins`, `card.photo_path`)
+и готовыми экземплярами репозиториев ниже.
+"""
+from repositories.rows import (
+    SlottedRow, UserRow, UniverseRow, CardRow, ShopItemRow, PromocodeRow, ReferralRow, ChatUserRow,
+    CollectionOverview, CardPage, TopSnapshot,
+)
+from repositories.cache import RowCache
+from repositories.catalog import CardCatalog, UniverseCatalog, card_catalog
+from repositories.cooldowns import CooldownService, cooldowns, COOLDOWN_CARD, COOLDOWN_DAILY
+from repositories.leaderboard import (
+    LeaderboardIndex, TopSnapshotCache, leaderboard_index, top_snapshots, SCOPE_ALL, SCOPE_UNIVERSE, SCOPE_CHAT,
+)
+from repositories.users import UsersRepo, users_cache
+from repositories.cards import CardsRepo
+from repositories.user_cards import UserCardsRepo, GRANT_NEW, GRANT_DUPLICATE, GRANT_NOT_ALLOWED
+from repositories.shop import ShopRepo
+from repositories.moderation import ModerationRepo
+from repositories.photos import PhotosRepo
+from repositories.scores import ScoresRepo
+from repositories.promo import (
+    PromoRepo, PROMO_OK, PROMO_NOT_FOUND, PROMO_EXHAUSTED, PROMO_ALREADY_USED,
+)
+
+users_repo = UsersRepo()
+cards_repo = CardsRepo()
+user_cards_repo = UserCardsRepo()
+shop_repo = ShopRepo()
+moderation_repo = ModerationRepo()
+promo_repo = PromoRepo()
+photos_repo = PhotosRepo()
+scores_repo = ScoresRepo()
+
+__all__ = [
+    "SlottedRow", "UserRow", "UniverseRow", "CardRow", "ShopItemRow", "PromocodeRow", "ReferralRow",
+    "ChatUserRow", "CollectionOverview", "CardPage", "TopSnapshot", "RowCache", "users_cache",
+    "CardCatalog", "UniverseCatalog", "card_catalog",
+    "CooldownService", "cooldowns", "COOLDOWN_CARD", "COOLDOWN_DAILY", "LeaderboardIndex", "leaderboard_index",
+    "TopSnapshotCache", "top_snapshots", "SCOPE_ALL", "SCOPE_UNIVERSE", "SCOPE_CHAT",
+    "UsersRepo", "CardsRepo", "UserCardsRepo", "ShopRepo", "ModerationRepo", "PromoRepo", "PhotosRepo",
+    "ScoresRepo",
+    "PROMO_OK", "PROMO_NOT_FOUND", "PROMO_EXHAUSTED", "PROMO_ALREADY_USED",
+    "GRANT_NEW", "GRANT_DUPLICATE", "GRANT_NOT_ALLOWED",
+    "users_repo", "cards_repo", "user_cards_repo", "shop_repo", "moderation_repo", "promo_repo", "photos_repo",
+    "scores_repo",
+]
@@ -0,0 +1,39 @@
+from dabase.database import db_instance
+
+
+class BaseRepo:
+    """
+    Базовый репозиторий.
+
+    Все SQL-запросы хранятся в константах модулей: sqlite3 и asyncpg кэшируют подготовленные
+    выражения на каждом соединении по тексту запроса, поэтому одинаковый текст
+    переиспользует уже скомпилированный statement. SQL пишется переносимо
+    (SQLite и PostgreSQL), плейсхолдеры `?` для PostgreSQL переводит dabase/pg_backend.py. Чтение идёт через
+    `execute_fetchall` — один переход в поток соединения вместо трёх
+    (execute → fetch → close).
+    """
+
+    def __init__(self, database=db_instance):
+        self.database = database
+
+    async def _fetchall(self, sql: str, params: tuple = ()) -> list:
+        async with self.database.reader() as db:
+            return list(await db.execute_fetchall(sql, params))
+
+    async def _fetchone(self, sql: str, params: tuple = ()):
+        rows = await self._fetchall(sql, params)
+        return rows[0] if rows else None
+
+    async def _fetchval(self, sql: str, params: tuple = (), default=None):
+        row = await self._fetchone(sql, params)
+        return row[0] if row is not None and row[0] is not None else default
+
+    async def _execute(self, sql: str, params: tuple = ()) -> int:
+        """Запись в текущей (или новой) транзакции. Возвращает число затронутых строк."""
+        async with self.database.writer() as db:
+            cursor = await db.execute(sql, params)
+            return cursor.rowcount
+
+    async def _executemany(self, sql: str, params: list):
+        async with self.database.writer() as db:
+            await db.executemany(sql, params)
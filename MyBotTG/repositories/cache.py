@@ -0,0 +1,68 @@
+from collections import OrderedDict
+
+
+class RowCache:
+    """
+    LRU-кэш строк по ключу с ограниченным размером.
+
+    Запись идёт «сквозь» кэш: после commit репозиторий кладёт сюда актуальную строку
+    (put) или выбрасывает её (invalidate). Чтение из БД заполняет кэш через fill()
+    только если с начала чтения не было ни одной записи — иначе старая строка,
+    прочитанная до чужого commit, могла бы перетереть свежую.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max(0, max_size)
+        self._rows: OrderedDict = OrderedDict()
+        self.write_seq = 0  # Растёт при каждой записи/инвалидации
+
+        # Счётчики для мониторинга
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key):
+        row = self._rows.get(key)
+        if row is None:
+            self.counters["misses"] += 1
+            return None
+        self._rows.move_to_end(key)
+        self.counters["hits"] += 1
+        return row
+
+    def fill(self, key, row, seq: int):
+        """Кладёт строку, прочитанную из БД, если после snapshot `seq` записей не было."""
+        if row is not None and seq == self.write_seq:
+            self._store(key, row)
+
+    def put(self, key, row):
+        """Сквозная запись: актуальная строка после commit."""
+        self.write_seq += 1
+        if row is None:
+            self._rows.pop(key, None)
+        else:
+            self._store(key, row)
+
+    def invalidate(self, key):
+        self.write_seq += 1
+        if self._rows.pop(key, None) is not None:
+            self.counters["invalidations"] += 1
+
+    def clear(self):
+        self.write_seq += 1
+        self._rows.clear()
+
+    def _store(self, key, row):
+        if not self.max_size:
+            return
+        self._rows[key] = row
+        self._rows.move_to_end(key)
+        while len(self._rows) > self.max_size:
+            self._rows.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def stats(self) -> dict:
+        stats = dict(self.counters)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["size"] = len(self._rows)
+        stats["max_size"] = self.max_size
+        return stats
@@ -0,0 +1,177 @@
+from dabase.database import db_instance
+from repositories.base import BaseRepo
+from repositories.catalog import CardCatalog, UniverseCatalog, card_catalog
+from repositories.collection_stats import REMOVE_CARD_STATS, ADD_CARD_OWNERS_STATS, card_owners_params
+from repositories.rows import CardRow, CardPage, UniverseRow
+
+CARD_COLUMNS = "universe_id, card_id, name, photo_path, rarity, attack, hp, points"
+
+# Карты читаются только целой вселенной — в каталог в памяти (repositories/catalog.py)
+SELECT_CARDS = f"SELECT {CARD_COLUMNS} FROM cards WHERE universe_id = ? ORDER BY card_id"
+NAME_EXISTS = "SELECT 1 FROM cards WHERE universe_id = ? AND name = ?"
+# card_id выдаётся счётчиком вселенной, поэтому номера удалённых карт не переиспользуются
+NEXT_CARD_ID = "UPDATE universes SET last_card_id = last_card_id + 1 WHERE universe_id = ? RETURNING last_card_id"
+INSERT_CARD = f"INSERT INTO cards ({CARD_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+UPDATE_RARITY = "UPDATE cards SET rarity = ?, attack = ?, hp = ? WHERE universe_id = ? AND card_id = ?"
+UPDATE_POINTS = "UPDATE cards SET points = ? WHERE universe_id = ? AND card_id = ?"
+DELETE_CARD = "DELETE FROM cards WHERE universe_id = ? AND card_id = ? RETURNING photo_path"
+
+# 🔹 Ссылки карт на файлы изображений (одно изображение может быть у нескольких карт)
+ADD_IMAGE_REF = """
+    INSERT INTO image_refs (photo_path, refs) VALUES (?, 1)
+    ON CONFLICT (photo_path) DO UPDATE SET refs = image_refs.refs + 1
+"""
+RELEASE_IMAGE_REF = "UPDATE image_refs SET refs = refs - 1 WHERE photo_path = ? RETURNING refs"
+DELETE_IMAGE_REF = "DELETE FROM image_refs WHERE photo_path = ?"
+IMAGE_IN_USE = "SELECT 1 FROM image_refs WHERE photo_path = ? AND refs > 0"
+
+SELECT_UNIVERSES = "SELECT universe_id, name, enabled FROM universes"
+INSERT_UNIVERSE = "INSERT INTO universes (universe_id, name, enabled) VALUES (?, ?, ?) ON CONFLICT DO NOTHING"
+SET_UNIVERSE_ENABLED = "UPDATE universes SET enabled = ? WHERE universe_id = ?"
+SET_UNIVERSE_ENABLED_BY_NAME = "UPDATE universes SET enabled = ? WHERE name = ?"
+
+
+class CardsRepo(BaseRepo):
+    """Каталог карт и список вселенных."""
+
+    def __init__(self, database=db_instance, catalog: CardCatalog = card_catalog):
+        super().__init__(database)
+        self.catalog = catalog
+
+    # 🔹 Карты
+
+    async def snapshot(self, universe: str) -> UniverseCatalog:
+        """
+        Каталог вселенной из памяти; при первом обращении (или после правки карт) — одним запросом.
+        Внутри транзакции записи читается БД: там могут быть ещё не закоммиченные правки.
+        """
+        in_transaction = self.database.in_transaction()
+        if not in_transaction:
+            snapshot = self.catalog.get(universe)
+            if snapshot is not None:
+                return snapshot
+
+        generation = self.catalog.generation
+        snapshot = UniverseCatalog(universe, CardRow.from_rows(await self._fetchall(SELECT_CARDS, (universe,))))
+        if not in_transaction:
+            self.catalog.fill(universe, snapshot, generation)
+        return snapshot
+
+    async def load_catalog(self):
+        """Загружает в память каталоги всех вселенных (при старте бота)."""
+        for universe in await self.universes():
+            await self.snapshot(universe.universe_id)
+
+    async def all(self, universe: str) -> list[CardRow]:
+        return list((await self.snapshot(universe)).cards)
+
+    async def get(self, universe: str, card_id: int) -> CardRow | None:
+        return (await self.snapshot(universe)).by_id.get(card_id)
+
+    async def by_rarity(self, universe: str, rarity: str) -> list[CardRow]:
+        return list((await self.snapshot(universe)).by_rarity.get(rarity, ()))
+
+    async def page(self, universe: str, rarity: str, card_id: int = 0) -> CardPage | None:
+        """Страница браузера карт владельца — из снимка каталога, без запросов к БД."""
+        return (await self.snapshot(universe)).page(rarity, card_id)
+
+    async def random_by_rarity(self, universe: str, rarity: str) -> CardRow | None:
+        return (await self.snapshot(universe)).random_by_rarity(rarity)
+
+    async def count(self, universe: str) -> int:
+        return len((await self.snapshot(universe)).cards)
+
+    async def count_by_rarity(self, universe: str) -> dict[str, int]:
+        return (await self.snapshot(universe)).counts()
+
+    async def name_exists(self, universe: str, name: str) -> bool:
+        return await self._fetchval(NAME_EXISTS, (universe, name)) is not None
+
+    async def image_in_use(self, photo_path: str) -> bool:
+        """Ссылается ли на файл изображения хоть одна карта."""
+        return await self._fetchval(IMAGE_IN_USE, (photo_path,)) is not None
+
+    async def add(self, universe: str, name: str, photo_path: str, rarity: str,
+                  attack: int, hp: int, points: int) -> int | None:
+        """Добавляет карту. :return: card_id новой карты или None, если карта с таким именем уже есть."""
+        async with self.database.writer() as db:
+            async with db.execute(NAME_EXISTS, (universe, name)) as cursor:
+                if await cursor.fetchone():
+                    return None
+            async with db.execute(NEXT_CARD_ID, (universe,)) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                raise ValueError(f"Вселенная {universe} не найдена")
+            card_id = row[0]
+            await db.execute(INSERT_CARD, (universe, card_id, name, photo_path, rarity, attack, hp, points))
+            await db.execute(ADD_IMAGE_REF, (photo_path,))
+            self._changed(universe)
+        return card_id
+
+    async def update_rarity(self, universe: str, card_id: int, rarity: str, attack: int, hp: int):
+        """Меняет редкость; счётчики коллекций владельцев переносятся на новую редкость в той же транзакции."""
+        async with self.database.writer() as db:
+            await db.execute(REMOVE_CARD_STATS, card_owners_params(universe, card_id))
+            await db.execute(UPDATE_RARITY, (rarity, attack, hp, universe, card_id))
+            await db.execute(ADD_CARD_OWNERS_STATS, (rarity, universe, card_id))
+            self._changed(universe)
+
+    async def update_points(self, universe: str, card_id: int, points: int):
+        async with self.database.writer():
+            await self._execute(UPDATE_POINTS, (points, universe, card_id))
+            self._changed(universe)
+
+    async def delete(self, universe: str, card_id: int) -> str | None:
+        """
+        Удаляет карту.
+        :return: путь к её изображению, если на него больше не ссылается ни одна карта
+            (файл можно удалять), иначе None.
+        """
+        async with self.database.writer() as db:
+            await db.execute(REMOVE_CARD_STATS, card_owners_params(universe, card_id))
+            async with db.execute(DELETE_CARD, (universe, card_id)) as cursor:
+                row = await cursor.fetchone()
+            photo_path = row[0] if row else None
+            unused = False
+            if photo_path is not None:
+                async with db.execute(RELEASE_IMAGE_REF, (photo_path,)) as cursor:
+                    refs = await cursor.fetchone()
+                unused = refs is not None and refs[0] <= 0
+                if unused:
+                    await db.execute(DELETE_IMAGE_REF, (photo_path,))
+            self._changed(universe)
+        return photo_path if unused else None
+
+    def _changed(self, universe: str):
+        """Каталог вселенной устарел: сбрасываем его после commit текущей транзакции."""
+        self.database.after_commit(lambda: self.catalog.invalidate(universe))
+
+    # 🔹 Вселенные
+
+    async def universes(self, enabled_only: bool = False) -> list[UniverseRow]:
+        rows = self.catalog.universe_rows() if not self.database.in_transaction() else None
+        if rows is None:
+            generation = self.catalog.generation
+            rows = UniverseRow.from_rows(await self._fetchall(SELECT_UNIVERSES))
+            if not self.database.in_transaction():
+                self.catalog.fill_universes(rows, generation)
+        return [row for row in rows if row.enabled] if enabled_only else list(rows)
+
+    async def universe(self, universe_id: str) -> UniverseRow | None:
+        return next((row for row in await self.universes() if row.universe_id == universe_id), None)
+
+    async def add_universe(self, universe_id: str, name: str, enabled: bool = False) -> bool:
+        """Создаёт вселенную (карты живут в общей таблице cards). :return: False, если такая вселенная уже есть."""
+        return await self._universes_write(INSERT_UNIVERSE, (universe_id, name, int(enabled))) > 0
+
+    async def set_universe_enabled(self, universe_id: str, enabled: bool):
+        await self._universes_write(SET_UNIVERSE_ENABLED, (int(enabled), universe_id))
+
+    async def set_universe_enabled_by_name(self, name: str, enabled: bool):
+        await self._universes_write(SET_UNIVERSE_ENABLED_BY_NAME, (int(enabled), name))
+
+    async def _universes_write(self, sql: str, params: tuple) -> int:
+        async with self.database.writer():
+            rowcount = await self._execute(sql, params)
+            self.database.after_commit(self.catalog.invalidate_universes)
+        return rowcount
@@ -0,0 +1,134 @@
+import random
+from bisect import bisect_left
+from operator import attrgetter
+from repositories.rows import CardRow, CardPage, UniverseRow
+from utils.alias_sampler import AliasSampler
+
+CARD_ID = attrgetter("card_id")
+
+
+class UniverseCatalog:
+    """
+    Неизменяемый снимок карт одной вселенной.
+
+    Карты сгруппированы по редкостям в кортежи, упорядоченные по card_id (по ним же
+    листает браузер карт владельца). Для взвешенной выдачи снимок строит
+    таблицы псевдонимов (AliasSampler) один раз на набор весов: снимок неизменяем
+    и заменяется при правке каталога, поэтому таблицы пересобираются только тогда.
+    """
+    __slots__ = ("universe_id", "cards", "by_id", "by_rarity", "_samplers")
+
+    def __init__(self, universe_id: str, cards: list[CardRow]):
+        self.universe_id = universe_id
+        self.cards = tuple(cards)
+        self.by_id = {card.card_id: card for card in cards}
+        groups: dict[str, list[CardRow]] = {}
+        for card in cards:
+            groups.setdefault(card.rarity, []).append(card)
+        self.by_rarity = {rarity: tuple(sorted(group, key=CARD_ID)) for rarity, group in groups.items()}
+        self._samplers: dict[tuple, AliasSampler] = {}
+
+    def counts(self) -> dict[str, int]:
+        return {rarity: len(group) for rarity, group in self.by_rarity.items()}
+
+    def page(self, rarity: str, card_id: int = 0) -> CardPage | None:
+        """
+        Карта редкости с курсором card_id (удалённая — следующая за ней, за последней — первая)
+        и её соседи по кругу. Поиск — bisect по упорядоченному кортежу, O(log n).
+        """
+        group = self.by_rarity.get(rarity)
+        if not group:
+            return None
+        position = bisect_left(group, card_id, key=CARD_ID)
+        if position == len(group):
+            position = 0
+        return CardPage(group[position], position, len(group), group[position - 1], group[(position + 1) % len(group)])
+
+    def sampler(self, weights: dict[str, int]) -> AliasSampler:
+        """Таблицы псевдонимов по картам: вес карты — вес её редкости (неизвестная редкость — 1)."""
+        key = tuple(sorted(weights.items()))
+        sampler = self._samplers.get(key)
+        if sampler is None:
+            sampler = self._samplers[key] = AliasSampler([weights.get(card.rarity, 1) for card in self.cards])
+        return sampler
+
+    def random_card(self, weights: dict[str, int], rng=random) -> CardRow | None:
+        """Случайная карта за O(1) — то же распределение, что у choices(cards, weights=...)."""
+        if not self.cards:
+            return None
+        return self.cards[self.sampler(weights).draw(rng)]
+
+    def random_cards(self, weights: dict[str, int], count: int, rng=random) -> list[CardRow]:
+        """`count` независимых выпадений одной пачкой (индексы пишутся в заранее выделенный массив)."""
+        if not self.cards or count <= 0:
+            return []
+        cards = self.cards
+        return [cards[i] for i in self.sampler(weights).draw_many(count, rng)]
+
+    def random_by_rarity(self, rarity: str, rng=random) -> CardRow | None:
+        group = self.by_rarity.get(rarity)
+        return rng.choice(group) if group else None
+
+
+class CardCatalog:
+    """
+    Каталог карт и вселенных в памяти процесса.
+
+    Снимки заменяются целиком: репозиторий сбрасывает вселенную после commit
+    любой правки карт, следующее обращение загружает её заново одним запросом.
+    Как и в RowCache, загрузка кладёт результат только если за время запроса
+    не было сброса (`generation` не изменился).
+    """
+
+    def __init__(self):
+        self._universes: dict[str, UniverseCatalog] = {}
+        self._universe_rows: tuple[UniverseRow, ...] | None = None
+        self.generation = 0
+
+        # Счётчики для мониторинга
+        self.counters = {"hits": 0, "loads": 0, "invalidations": 0}
+
+    def get(self, universe_id: str) -> UniverseCatalog | None:
+        snapshot = self._universes.get(universe_id)
+        if snapshot is not None:
+            self.counters["hits"] += 1
+        return snapshot
+
+    def fill(self, universe_id: str, snapshot: UniverseCatalog, generation: int):
+        self.counters["loads"] += 1
+        if generation == self.generation:
+            self._universes[universe_id] = snapshot
+
+    def universe_rows(self) -> tuple[UniverseRow, ...] | None:
+        return self._universe_rows
+
+    def fill_universes(self, rows: list[UniverseRow], generation: int):
+        if generation == self.generation:
+            self._universe_rows = tuple(rows)
+
+    def invalidate(self, universe_id: str):
+        """Сбрасывает карты вселенной (после добавления, правки или удаления карты)."""
+        self.generation += 1
+        self.counters["invalidations"] += 1
+        self._universes.pop(universe_id, None)
+
+    def invalidate_universes(self):
+        """Сбрасывает список вселенных (после добавления или включения/выключения)."""
+        self.generation += 1
+        self.counters["invalidations"] += 1
+        self._universe_rows = None
+
+    def clear(self):
+        self.generation += 1
+        self._universes.clear()
+        self._universe_rows = None
+
+    def stats(self) -> dict:
+        stats = dict(self.counters)
+        stats["universes"] = len(self._universes)
+        stats["cards"] = sum(len(snapshot.cards) for snapshot in self._universes.values())
+        return stats
+
+
+# Каталог процесса (общий для всех экземпляров CardsRepo)
+card_catalog = CardCatalog()
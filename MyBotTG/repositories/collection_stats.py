@@ -0,0 +1,50 @@
+"""
+Счётчики коллекций (таблица user_collection_stats): сколько разных карт каждой редкости
+есть у пользователя во вселенной.
+
+Запросы ниже выполняются в тех же транзакциях, что и изменения user_cards (выдача,
+покупка, сброс коллекции) и cards (удаление карты, смена редкости), поэтому экраны
+«Мои карты» и профиль читают готовые счётчики вместо GROUP BY по user_cards.
+"""
+
+SELECT_STATS = "SELECT rarity, owned FROM user_collection_stats WHERE user_id = ? AND universe_id = ?"
+SELECT_STATS_RARITY = "SELECT owned FROM user_collection_stats WHERE user_id = ? AND universe_id = ? AND rarity = ?"
+SELECT_STATS_TOTAL = "SELECT COALESCE(SUM(owned), 0) FROM user_collection_stats WHERE user_id = ?"
+CLEAR_STATS = "DELETE FROM user_collection_stats WHERE user_id = ?"
+
+# +owned к редкости (редкость карт известна вызывающему коду)
+ADD_STATS = """
+    INSERT INTO user_collection_stats (user_id, universe_id, rarity, owned)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (user_id, universe_id, rarity) DO UPDATE SET owned = user_collection_stats.owned + excluded.owned
+"""
+# Выполняется ДО вставки в user_cards: +1, если такой карты у пользователя ещё нет (редкость — из cards).
+# CAST: параметр в списке SELECT asyncpg иначе выводит как text, а user_id — BIGINT
+ADD_STATS_IF_NEW = """
+    INSERT INTO user_collection_stats (user_id, universe_id, rarity, owned)
+    SELECT CAST(? AS BIGINT), universe_id, rarity, 1 FROM cards
+    WHERE universe_id = ? AND card_id = ?
+      AND NOT EXISTS (SELECT 1 FROM user_cards WHERE user_id = ? AND card_id = ? AND universe_id = ?)
+    ON CONFLICT (user_id, universe_id, rarity) DO UPDATE SET owned = user_collection_stats.owned + 1
+"""
+# Выполняется ДО удаления карты или смены её редкости: −1 у всех владельцев по текущей редкости
+REMOVE_CARD_STATS = """
+    UPDATE user_collection_stats SET owned = owned - 1
+    WHERE universe_id = ?
+      AND rarity = (SELECT rarity FROM cards WHERE universe_id = ? AND card_id = ?)
+      AND user_id IN (SELECT user_id FROM user_cards WHERE universe_id = ? AND card_id = ?)
+"""
+# После смены редкости: +1 у всех владельцев по новой редкости
+ADD_CARD_OWNERS_STATS = """
+    INSERT INTO user_collection_stats (user_id, universe_id, rarity, owned)
+    SELECT user_id, universe_id, ?, 1 FROM user_cards WHERE universe_id = ? AND card_id = ?
+    ON CONFLICT (user_id, universe_id, rarity) DO UPDATE SET owned = user_collection_stats.owned + 1
+"""
+
+
+def add_if_new_params(user_id: int, universe: str, card_id: int) -> tuple:
+    return user_id, universe, card_id, user_id, card_id, universe
+
+
+def card_owners_params(universe: str, card_id: int) -> tuple:
+    return universe, universe, card_id, universe, card_id
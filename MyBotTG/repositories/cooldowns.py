@@ -0,0 +1,99 @@
+import os
+import time
+from datetime import datetime
+from repositories.rows import UserRow
+
+CARD_COOLDOWN_HOURS = 4  # Между бесплатными картами
+DAILY_COOLDOWN_HOURS = 24  # Между ежедневными бонусами
+# Раз в столько секунд из памяти убираются истёкшие кулдауны (такой пользователь снова загрузится лениво)
+COOLDOWN_PRUNE_INTERVAL = float(os.getenv("COOLDOWN_PRUNE_INTERVAL", "600"))
+
+# 🔹 Виды кулдаунов
+COOLDOWN_CARD = "card"
+COOLDOWN_DAILY = "daily"
+
+COOLDOWN_SECONDS = {
+    COOLDOWN_CARD: CARD_COOLDOWN_HOURS * 3600,
+    COOLDOWN_DAILY: DAILY_COOLDOWN_HOURS * 3600,
+}
+
+
+def parse_db_time(value: str | None) -> float:
+    """Время из users (TEXT 'YYYY-MM-DD HH:MM:SS') в Unix-время; пусто — 0."""
+    return datetime.fromisoformat(value).timestamp() if value else 0.0
+
+
+class CooldownService:
+    """
+    Кулдауны в памяти процесса: для каждого пользователя — момент, когда действие снова доступно.
+
+    Источник правды — строки users: UsersRepo передаёт сюда каждую строку, которую читает
+    из БД или записывает (observe), поэтому время разбирается один раз на запись, а отказ
+    «ещё рано» не требует ни запроса, ни разбора строки. Неизвестный пользователь
+    загружается лениво (UsersRepo.cooldown_left).
+
+    Хранятся только нужные записи: раз в COOLDOWN_PRUNE_INTERVAL истёкшие кулдауны
+    удаляются, поэтому память растёт с числом пользователей на кулдауне, а не со всеми,
+    кто когда-либо писал боту.
+    """
+
+    def __init__(self, prune_interval: float = COOLDOWN_PRUNE_INTERVAL):
+        self._next_allowed: dict[str, dict[int, float]] = {kind: {} for kind in COOLDOWN_SECONDS}
+        self.prune_interval = prune_interval
+        self._pruned_at = time.monotonic()
+
+        # Счётчики для мониторинга
+        self.counters = {"hits": 0, "misses": 0, "denied": 0, "pruned": 0}
+
+    def observe(self, user_id: int, user: UserRow | None):
+        """Запоминает кулдауны из актуальной строки users (None — пользователя нет, ограничений нет)."""
+        if time.monotonic() - self._pruned_at >= self.prune_interval:
+            self.prune()
+        last_card = parse_db_time(user.last_card_time) if user else 0.0
+        last_claimed = parse_db_time(user.last_claimed) if user else 0.0
+        self._next_allowed[COOLDOWN_CARD][user_id] = last_card + COOLDOWN_SECONDS[COOLDOWN_CARD] if last_card else 0.0
+        self._next_allowed[COOLDOWN_DAILY][user_id] = (
+            last_claimed + COOLDOWN_SECONDS[COOLDOWN_DAILY] if last_claimed else 0.0
+        )
+
+    def left(self, kind: str, user_id: int, now: float | None = None) -> float | None:
+        """Секунд до следующего действия (0 — уже можно) или None, если пользователь ещё не загружен."""
+        next_allowed = self._next_allowed[kind].get(user_id)
+        if next_allowed is None:
+            self.counters["misses"] += 1
+            return None
+        self.counters["hits"] += 1
+        left = max(0.0, next_allowed - (time.time() if now is None else now))
+        if left:
+            self.counters["denied"] += 1
+        return left
+
+    def prune(self, now: float | None = None) -> int:
+        """Удаляет истёкшие кулдауны. :return: Сколько записей удалено."""
+        now = time.time() if now is None else now
+        removed = 0
+        for next_allowed in self._next_allowed.values():
+            expired = [user_id for user_id, deadline in next_allowed.items() if deadline <= now]
+            for user_id in expired:
+                del next_allowed[user_id]
+            removed += len(expired)
+        self._pruned_at = time.monotonic()
+        self.counters["pruned"] += removed
+        return removed
+
+    def forget(self, user_id: int):
+        for kind in COOLDOWN_SECONDS:
+            self._next_allowed[kind].pop(user_id, None)
+
+    def clear(self):
+        for kind in COOLDOWN_SECONDS:
+            self._next_allowed[kind].clear()
+
+    def stats(self) -> dict:
+        stats = dict(self.counters)
+        stats["users"] = len(self._next_allowed[COOLDOWN_CARD])
+        return stats
+
+
+# Кулдауны процесса (общие для всех экземпляров UsersRepo)
+cooldowns = CooldownService()
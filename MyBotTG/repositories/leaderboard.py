@@ -0,0 +1,295 @@
+import os
+import time
+import zlib
+import asyncio
+from bisect import bisect_left, insort
+from repositories.rows import TopSnapshot
+
+# Ключей в одной корзине индекса: корзина делится пополам, когда вырастает вдвое
+LEADERBOARD_BUCKET_SIZE = int(os.getenv("LEADERBOARD_BUCKET_SIZE", "512"))
+# Ключ пользователя — одно целое: сначала больше очков, при равенстве — меньший user_id
+USER_ID_SPAN = 1 << 48
+# 🔹 Рейтинги /top: общий (users.total_points), вселенной (universe_scores) и чата (chat_scores)
+SCOPE_ALL = "all"
+SCOPE_UNIVERSE = "universe"
+SCOPE_CHAT = "chat"
+# Сколько секунд снимок топа отдаётся без перестроения (все «🔄 Обновить» в чате за это время — один снимок)
+LEADERBOARD_TTL = float(os.getenv("LEADERBOARD_TTL", "5"))
+
+
+def rank_key(user_id: int, points: int) -> int:
+    return -points * USER_ID_SPAN + user_id
+
+
+def key_points(key: int) -> int:
+    return -(key // USER_ID_SPAN)  # user_id < USER_ID_SPAN, поэтому деление нацело отбрасывает именно его
+
+
+class LeaderboardIndex:
+    """
+    Рейтинг по total_points в памяти процесса (порядковая статистика).
+
+    Все пользователи лежат в отсортированном списке ключей, разбитом на корзины
+    по LEADERBOARD_BUCKET_SIZE; дерево Фенвика над размерами корзин даёт число
+    пользователей перед любой корзиной за O(log n). Поэтому место пользователя —
+    O(log n), топ-K — O(log n + K), изменение очков — O(log n) плюс сдвиг внутри
+    одной корзины.
+
+    Индекс строится из users один раз (UsersRepo.load_leaderboard), дальше UsersRepo
+    передаёт сюда очки из каждой записанной строки (observe) и изменения в обход
+    RETURNING (add). Пока идёт загрузка, изменения только помечают пользователя —
+    его строка перечитывается после загрузки.
+    """
+
+    def __init__(self, bucket_size: int = LEADERBOARD_BUCKET_SIZE):
+        self.bucket_size = max(16, bucket_size)
+        self._keys: dict[int, int] = {}  # user_id → ключ в индексе
+        self._buckets: list[list[int]] = []
+        self._maxes: list[int] = []  # Последний ключ каждой корзины
+        self._tree: list[int] = [0]  # Дерево Фенвика над размерами корзин (с 1)
+        self._touched: set[int] | None = None  # Изменённые во время загрузки
+        self.loaded = False
+        self.load_lock = asyncio.Lock()
+
+        # Счётчики для мониторинга
+        self.counters = {"ranks": 0, "tops": 0, "updates": 0, "splits": 0}
+
+    # 🔹 Загрузка
+
+    def begin_load(self):
+        self._touched = set()
+
+    def finish_load(self, rows) -> set[int]:
+        """
+        Добавляет строки (user_id, total_points), пропуская пользователей, изменённых за время чтения.
+        :return: Изменённые пользователи — их нужно перечитать и передать сюда же;
+            пустое множество — загрузка завершена.
+        """
+        touched, self._touched = self._touched or set(), set()
+        rows = [(user_id, points) for user_id, points in rows if user_id not in touched]
+        if self._keys:
+            for user_id, points in rows:
+                self._set(user_id, points)
+        else:
+            self._build(rows)
+        if not touched:
+            self._touched = None
+            self.loaded = True
+        return touched
+
+    def _build(self, rows):
+        self._keys = {user_id: rank_key(user_id, points or 0) for user_id, points in rows}
+        keys = sorted(self._keys.values())
+        size = self.bucket_size
+        self._buckets = [keys[i:i + size] for i in range(0, len(keys), size)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._rebuild_tree()
+
+    # 🔹 Изменения
+
+    def observe(self, user_id: int, points: int | None):
+        """Актуальные очки пользователя из записанной строки users."""
+        if self._touched is not None:
+            self._touched.add(user_id)
+        elif self.loaded:
+            self._set(user_id, points or 0)
+
+    def add(self, user_id: int, delta: int):
+        """Изменение очков, записанное без RETURNING (например, покупки в магазине)."""
+        if not delta:
+            return
+        if self._touched is not None:
+            self._touched.add(user_id)
+        elif self.loaded and user_id in self._keys:
+            self._set(user_id, self.points(user_id) + delta)
+
+    def _set(self, user_id: int, points: int):
+        key = rank_key(user_id, points)
+        old = self._keys.get(user_id)
+        if old == key:
+            return
+        if old is not None:
+            self._remove(old)
+        self._insert(key)
+        self._keys[user_id] = key
+        self.counters["updates"] += 1
+
+    def _insert(self, key: int):
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._rebuild_tree()
+            return
+        i = min(bisect_left(self._maxes, key), len(self._buckets) - 1)
+        bucket = self._buckets[i]
+        insort(bucket, key)
+        self._maxes[i] = bucket[-1]
+        if len(bucket) > 2 * self.bucket_size:
+            half = len(bucket) // 2
+            self._buckets[i:i + 1] = [bucket[:half], bucket[half:]]
+            self._maxes[i:i + 1] = [bucket[half - 1], bucket[-1]]
+            self._rebuild_tree()
+            self.counters["splits"] += 1
+        else:
+            self._tree_add(i, 1)
+
+    def _remove(self, key: int):
+        i = bisect_left(self._maxes, key)
+        bucket = self._buckets[i]
+        del bucket[bisect_left(bucket, key)]
+        if bucket:
+            self._maxes[i] = bucket[-1]
+            self._tree_add(i, -1)
+        else:
+            del self._buckets[i], self._maxes[i]
+            self._rebuild_tree()
+
+    # 🔹 Дерево Фенвика
+
+    def _rebuild_tree(self):
+        """O(число корзин): только при появлении или исчезновении корзины."""
+        tree = [0] + [len(bucket) for bucket in self._buckets]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, index: int, delta: int):
+        tree = self._tree
+        i = index + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def _before_bucket(self, index: int) -> int:
+        """Сколько ключей в корзинах перед корзиной index."""
+        total, tree = 0, self._tree
+        while index > 0:
+            total += tree[index]
+            index -= index & -index
+        return total
+
+    # 🔹 Запросы
+
+    def points(self, user_id: int) -> int | None:
+        key = self._keys.get(user_id)
+        return None if key is None else key_points(key)
+
+    def rank(self, user_id: int) -> int | None:
+        """Место пользователя: 1 + число пользователей, у которых очков строго больше (None — неизвестен)."""
+        points = self.points(user_id)
+        if points is None:
+            return None
+        self.counters["ranks"] += 1
+        bound = -points * USER_ID_SPAN  # Меньше любого ключа с теми же очками
+        i = bisect_left(self._maxes, bound)
+        if i == len(self._buckets):
+            return len(self._keys) + 1
+        return self._before_bucket(i) + bisect_left(self._buckets[i], bound) + 1
+
+    def top(self, limit: int) -> list[tuple[int, int]]:
+        """Первые `limit` пользователей с положительными очками: [(user_id, total_points)]."""
+        self.counters["tops"] += 1
+        result = []
+        for bucket in self._buckets:
+            for key in bucket:
+                points = key_points(key)
+                if len(result) >= limit or points <= 0:
+                    return result
+                result.append((key % USER_ID_SPAN, points))
+        return result
+
+    def forget(self, user_id: int):
+        key = self._keys.pop(user_id, None)
+        if key is not None:
+            self._remove(key)
+
+    def clear(self):
+        self._keys.clear()
+        self._buckets.clear()
+        self._maxes.clear()
+        self._tree = [0]
+        self._touched = None
+        self.loaded = False
+
+    def stats(self) -> dict:
+        stats = dict(self.counters)
+        stats["users"] = len(self._keys)
+        stats["buckets"] = len(self._buckets)
+        return stats
+
+
+def top_version(top: list[tuple[str | None, int]]) -> int:
+    return zlib.crc32(repr(top).encode())
+
+
+class TopSnapshotCache:
+    """
+    Снимки топа (по рейтингу и размеру топа) с коротким TTL и перестроением «в один полёт».
+
+    Пока снимок моложе ttl, он отдаётся как есть. Устаревший снимок перестраивает
+    одна задача; все, кто пришёл за топом в это время, ждут её результата, а не
+    строят свой. Версия снимка зависит только от содержимого топа, поэтому
+    «Данные актуальны!» — сравнение двух чисел.
+
+    Каждое перестроение заодно удаляет устаревшие снимки других рейтингов, поэтому
+    в памяти остаются только рейтинги, которые смотрели за последние ttl секунд.
+    """
+
+    def __init__(self, ttl: float = LEADERBOARD_TTL):
+        self.ttl = ttl
+        self._snapshots: dict[tuple, TopSnapshot] = {}
+        self._building: dict[tuple, asyncio.Future] = {}
+
+        # Счётчики для мониторинга
+        self.counters = {"hits": 0, "rebuilds": 0, "joined": 0, "evicted": 0}
+
+    async def get(self, key: tuple, build) -> TopSnapshot:
+        """
+        :param key: (рейтинг, id вселенной или чата, размер топа).
+        :param build: Корутинная функция без аргументов → [(username, очки)].
+        """
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and time.monotonic() - snapshot.built_at < self.ttl:
+            self.counters["hits"] += 1
+            return snapshot
+
+        building = self._building.get(key)
+        if building is None:
+            building = self._building[key] = asyncio.ensure_future(self._rebuild(key, build))
+        else:
+            self.counters["joined"] += 1
+        # shield: отменённый ожидающий (например, по таймауту) не отменяет перестроение для остальных
+        return await asyncio.shield(building)
+
+    async def _rebuild(self, key: tuple, build) -> TopSnapshot:
+        try:
+            top = await build()
+            now = time.monotonic()
+            self._evict(now)
+            snapshot = self._snapshots[key] = TopSnapshot(top, top_version(top), now)
+            self.counters["rebuilds"] += 1
+            return snapshot
+        finally:
+            self._building.pop(key, None)
+
+    def _evict(self, now: float):
+        expired = [key for key, snapshot in self._snapshots.items() if now - snapshot.built_at >= self.ttl]
+        for key in expired:
+            del self._snapshots[key]
+        self.counters["evicted"] += len(expired)
+
+    def clear(self):
+        self._snapshots.clear()
+
+    def stats(self) -> dict:
+        stats = dict(self.counters)
+        stats["snapshots"] = len(self._snapshots)
+        return stats
+
+
+# Рейтинг процесса (общий для всех экземпляров UsersRepo)
+leaderboard_index = LeaderboardIndex()
+# Снимки топа процесса
+top_snapshots = TopSnapshotCache()
@@ -0,0 +1,24 @@
+"""
+Материализованные рейтинги вселенных и чатов (таблицы universe_scores и chat_scores).
+
+universe_scores — очки, заработанные картами вселенной: ADD_UNIVERSE_POINTS выполняется
+в той же транзакции, что и награда за карту (UsersRepo.claim_card, add_card_reward).
+chat_scores — очки участников чата (копия users.total_points): SYNC_CHAT_POINTS и
+SPEND_CHAT_POINTS идут вместе с изменениями очков, JOIN/LEAVE_CHAT_SCORES — вместе
+с записью chat_users. Поэтому топ любого рейтинга читается LIMIT K по индексу, без JOIN
+(ScoresRepo в repositories/scores.py).
+"""
+
+ADD_UNIVERSE_POINTS = """
+    INSERT INTO universe_scores (universe_id, user_id, points) VALUES (?, ?, ?)
+    ON CONFLICT (universe_id, user_id) DO UPDATE SET points = universe_scores.points + excluded.points
+"""
+SYNC_CHAT_POINTS = "UPDATE chat_scores SET points = ? WHERE user_id = ?"
+SPEND_CHAT_POINTS = "UPDATE chat_scores SET points = points - ? WHERE user_id = ?"
+# CAST: параметр в списке SELECT asyncpg иначе выводит как text, а chat_id — BIGINT
+JOIN_CHAT_SCORES = """
+    INSERT INTO chat_scores (chat_id, user_id, points)
+    SELECT CAST(? AS BIGINT), user_id, COALESCE(total_points, 0) FROM users WHERE user_id = ?
+    ON CONFLICT (chat_id, user_id) DO NOTHING
+"""
+LEAVE_CHAT_SCORES = "DELETE FROM chat_scores WHERE chat_id = ? AND user_id = ?"
@@ -0,0 +1,123 @@
+from repositories.base import BaseRepo
+from repositories.leaderboard_scores import JOIN_CHAT_SCORES, LEAVE_CHAT_SCORES
+from repositories.rows import ChatUserRow
+
+SELECT_EXPIRED_MUTES = "SELECT chat_id, user_id FROM moderation WHERE mute_until > 0 AND mute_until <= ?"
+SELECT_EXPIRED_BANS = "SELECT chat_id, user_id FROM moderation WHERE ban_until > 0 AND ban_until <= ?"
+SET_MUTE = """
+    INSERT INTO moderation (chat_id, user_id, mute_until, timestamp, reason, moderator_id)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(chat_id, user_id) DO UPDATE SET
+        mute_until = excluded.mute_until,
+        timestamp = excluded.timestamp,
+        reason = COALESCE(excluded.reason, moderation.reason),
+        moderator_id = COALESCE(excluded.moderator_id, moderation.moderator_id)
+"""
+CLEAR_MUTE = "UPDATE moderation SET mute_until = 0 WHERE chat_id = ? AND user_id = ?"
+SET_BAN = """
+    INSERT INTO moderation (chat_id, user_id, ban_until, ban_status, reason, moderator_id, timestamp)
+    VALUES (?, ?, ?, 1, ?, ?, ?)
+    ON CONFLICT(chat_id, user_id) DO UPDATE SET
+        ban_until = excluded.ban_until,
+        ban_status = 1,
+        reason = excluded.reason,
+        moderator_id = excluded.moderator_id,
+        timestamp = excluded.timestamp
+"""
+CLEAR_BAN = "UPDATE moderation SET ban_status = 0, ban_until = 0 WHERE chat_id = ? AND user_id = ?"
+
+# Строка moderation — родитель варнов (внешний ключ warns_log → moderation в PostgreSQL)
+ENSURE_MODERATION_ROW = """
+    INSERT INTO moderation (chat_id, user_id, timestamp) VALUES (?, ?, ?)
+    ON CONFLICT(chat_id, user_id) DO NOTHING
+"""
+INSERT_WARN = """
+    INSERT INTO warns_log (chat_id, user_id, reason, moderator_id, timestamp, expire_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+DELETE_OLDEST_WARN = """
+    DELETE FROM warns_log
+    WHERE id = (
+        SELECT id FROM warns_log
+        WHERE chat_id = ? AND user_id = ?
+        ORDER BY timestamp ASC LIMIT 1
+    )
+"""
+COUNT_ACTIVE_WARNS = "SELECT COUNT(*) FROM warns_log WHERE chat_id = ? AND user_id = ? AND expire_at > ?"
+DELETE_EXPIRED_WARNS = "DELETE FROM warns_log WHERE expire_at <= ?"
+
+UPSERT_CHAT_USER = """
+    INSERT INTO chat_users (user_id, chat_id, username, full_name, "left")
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, chat_id) DO UPDATE SET
+        username = excluded.username,
+        full_name = excluded.full_name,
+        "left" = excluded."left"
+"""
+SELECT_CHAT_USER_BY_USERNAME = "SELECT user_id FROM chat_users WHERE chat_id = ? AND LOWER(username) = ?"
+SELECT_CHAT_MEMBERS = 'SELECT user_id, username FROM chat_users WHERE chat_id = ? AND "left" = 0'
+SELECT_CHAT_IDS = "SELECT DISTINCT chat_id FROM chat_users"
+
+
+class ModerationRepo(BaseRepo):
+    """Муты, баны, варны и участники чатов."""
+
+    # 🔹 Муты и баны
+
+    async def expired_mutes(self, now: int) -> list[tuple[int, int]]:
+        return [(row[0], row[1]) for row in await self._fetchall(SELECT_EXPIRED_MUTES, (now,))]
+
+    async def expired_bans(self, now: int) -> list[tuple[int, int]]:
+        return [(row[0], row[1]) for row in await self._fetchall(SELECT_EXPIRED_BANS, (now,))]
+
+    async def set_mute(self, chat_id: int, user_id: int, until: int, timestamp: int,
+                       reason: str | None = None, moderator_id: int | None = None):
+        await self._execute(SET_MUTE, (chat_id, user_id, until, timestamp, reason, moderator_id))
+
+    async def clear_mute(self, chat_id: int, user_id: int):
+        await self._execute(CLEAR_MUTE, (chat_id, user_id))
+
+    async def set_ban(self, chat_id: int, user_id: int, until: int, reason: str, moderator_id: int, timestamp: int):
+        await self._execute(SET_BAN, (chat_id, user_id, until, reason, moderator_id, timestamp))
+
+    async def clear_ban(self, chat_id: int, user_id: int):
+        await self._execute(CLEAR_BAN, (chat_id, user_id))
+
+    # 🔹 Варны
+
+    async def add_warn(self, chat_id: int, user_id: int, reason: str, moderator_id: int,
+                       timestamp: int, expire_at: int) -> int:
+        """Записывает варн и возвращает число активных варнов в той же транзакции."""
+        async with self.database.writer():
+            await self._execute(DELETE_EXPIRED_WARNS, (timestamp,))
+            await self._execute(ENSURE_MODERATION_ROW, (chat_id, user_id, timestamp))
+            await self._execute(INSERT_WARN, (chat_id, user_id, reason, moderator_id, timestamp, expire_at))
+            return await self._fetchval(COUNT_ACTIVE_WARNS, (chat_id, user_id, timestamp), default=0)
+
+    async def remove_oldest_warn(self, chat_id: int, user_id: int):
+        await self._execute(DELETE_OLDEST_WARN, (chat_id, user_id))
+
+    async def active_warns(self, chat_id: int, user_id: int, now: int) -> int:
+        return await self._fetchval(COUNT_ACTIVE_WARNS, (chat_id, user_id, now), default=0)
+
+    async def purge_expired_warns(self, now: int):
+        await self._execute(DELETE_EXPIRED_WARNS, (now,))
+
+    # 🔹 Участники чатов
+
+    def save_chat_user(self, chat_id: int, user_id: int, username: str, full_name: str, left: bool):
+        """Ставит UPSERT участника (и его строку рейтинга чата) в очередь группового коммита (без ожидания)."""
+        self.database.enqueue(UPSERT_CHAT_USER, (user_id, chat_id, username, full_name, left))
+        if left:
+            self.database.enqueue(LEAVE_CHAT_SCORES, (chat_id, user_id))
+        else:
+            self.database.enqueue(JOIN_CHAT_SCORES, (chat_id, user_id))
+
+    async def find_chat_user(self, chat_id: int, username: str) -> int | None:
+        return await self._fetchval(SELECT_CHAT_USER_BY_USERNAME, (chat_id, username.lower()))
+
+    async def chat_members(self, chat_id: int) -> list[ChatUserRow]:
+        return ChatUserRow.from_rows(await self._fetchall(SELECT_CHAT_MEMBERS, (chat_id,)))
+
+    async def chat_ids(self) -> list[int]:
+        return [row[0] for row in await self._fetchall(SELECT_CHAT_IDS)]
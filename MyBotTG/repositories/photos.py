@@ -0,0 +1,90 @@
+import os
+import aiofiles.os
+from dabase.database import db_instance
+from repositories.base import BaseRepo
+from utils.image_store import image_store
+
+SELECT_FILE_IDS = "SELECT photo_path, fingerprint, file_id FROM photo_file_ids"
+UPSERT_FILE_ID = """
+    INSERT INTO photo_file_ids (photo_path, fingerprint, file_id) VALUES (?, ?, ?)
+    ON CONFLICT (photo_path) DO UPDATE SET fingerprint = excluded.fingerprint, file_id = excluded.file_id
+"""
+DELETE_FILE_ID = "DELETE FROM photo_file_ids WHERE photo_path = ?"
+
+
+async def file_fingerprint(photo_path: str) -> str | None:
+    """
+    Отпечаток файла: заменённое изображение получает новый (None — файла нет).
+    Файл хранилища неизменяем — его отпечаток имя, без обращения к диску; старые пути — размер и mtime.
+    """
+    if image_store.is_content_addressed(photo_path):
+        return os.path.basename(photo_path)
+    try:
+        stat = await aiofiles.os.stat(photo_path)
+    except OSError:
+        return None
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class PhotosRepo(BaseRepo):
+    """
+    file_id изображений карт, уже загруженных в Telegram (таблица photo_file_ids).
+
+    Первая отправка файла загружает его, file_id из ответа запоминается здесь,
+    и дальше то же изображение отправляется по file_id без загрузки. Все записи
+    держатся в памяти (загружаются одним запросом при первом обращении); запись
+    привязана к отпечатку файла, поэтому заменённое изображение загрузится заново.
+    """
+
+    def __init__(self, database=db_instance):
+        super().__init__(database)
+        self._file_ids: dict[str, tuple[str, str]] | None = None  # photo_path → (отпечаток, file_id)
+
+        # Счётчики для мониторинга
+        self.counters = {"hits": 0, "misses": 0, "uploads": 0, "stale": 0}
+
+    async def load(self) -> dict[str, tuple[str, str]]:
+        if self._file_ids is None:
+            rows = await self._fetchall(SELECT_FILE_IDS)
+            self._file_ids = {photo_path: (fingerprint, file_id) for photo_path, fingerprint, file_id in rows}
+        return self._file_ids
+
+    async def file_id(self, photo_path: str) -> str | None:
+        """file_id изображения, если оно уже загружено и файл с тех пор не менялся."""
+        entry = (await self.load()).get(photo_path)
+        if entry is None or entry[0] != await file_fingerprint(photo_path):
+            self.counters["misses"] += 1
+            self.counters["stale"] += entry is not None
+            return None
+        self.counters["hits"] += 1
+        return entry[1]
+
+    async def remember(self, photo_path: str, file_id: str):
+        """Запоминает file_id из ответа Telegram на загрузку файла."""
+        fingerprint = await file_fingerprint(photo_path)
+        file_ids = await self.load()
+        if fingerprint is None or file_ids.get(photo_path) == (fingerprint, file_id):
+            return
+        file_ids[photo_path] = (fingerprint, file_id)
+        self.counters["uploads"] += 1
+        self.database.enqueue(UPSERT_FILE_ID, (photo_path, fingerprint, file_id))  # Кэш: ждать commit незачем
+
+    async def forget(self, photo_path: str):
+        """Забывает file_id, который Telegram больше не принимает."""
+        if (await self.load()).pop(photo_path, None) is not None:
+            self.database.enqueue(DELETE_FILE_ID, (photo_path,))
+
+    async def forget_many(self, photo_paths: list[str]):
+        """Забывает file_id удалённых файлов (например, старых коллажей)."""
+        file_ids = await self.load()
+        for photo_path in photo_paths:
+            if file_ids.pop(photo_path, None) is not None:
+                self.database.enqueue(DELETE_FILE_ID, (photo_path,))
+
+    def clear(self):
+        self._file_ids = None
+
+    def stats(self) -> dict:
+        stats = dict(self.counters)
+        stats["cached"] = len(self._file_ids or ())
+        return stats
@@ -0,0 +1,77 @@
+from dabase.database import db_instance
+from repositories.base import BaseRepo
+from repositories.rows import PromocodeRow, ReferralRow
+from repositories.users import UsersRepo
+
+SELECT_PROMOCODE = "SELECT promocode, spins_bonus, usage_limit, usage_count FROM promocodes WHERE promocode = ?"
+INSERT_PROMOCODE = "INSERT INTO promocodes (promocode, spins_bonus, usage_limit) VALUES (?, ?, ?)"
+PROMOCODE_USED = "SELECT 1 FROM user_promocodes WHERE user_id = ? AND promocode = ?"
+MARK_PROMOCODE_USED = "INSERT INTO user_promocodes (user_id, promocode) VALUES (?, ?)"
+# Счётчик растёт только пока лимит не исчерпан — защищает от гонки двух активаций
+INCREMENT_USAGE = "UPDATE promocodes SET usage_count = usage_count + 1 WHERE promocode = ? AND usage_count < usage_limit"
+
+SELECT_REFERRAL = "SELECT referral_id, referrer_id, is_valid FROM referrals WHERE referral_id = ?"
+VALIDATE_REFERRAL = "UPDATE referrals SET is_valid = 1 WHERE referral_id = ? AND is_valid = 0"
+COUNT_VALID_REFERRALS = "SELECT COUNT(*) FROM referrals WHERE referrer_id = ? AND is_valid = 1"
+
+# 🔹 Результаты активации промокода
+PROMO_OK = "ok"
+PROMO_NOT_FOUND = "not_found"
+PROMO_EXHAUSTED = "exhausted"
+PROMO_ALREADY_USED = "already_used"
+
+
+class PromoRepo(BaseRepo):
+    """Бонусы: промокоды и реферальная программа."""
+
+    def __init__(self, database=db_instance):
+        super().__init__(database)
+        self.users = UsersRepo(database)  # Прокрутки начисляются через него, чтобы обновлялся кэш users
+
+    # 🔹 Промокоды
+
+    async def get(self, promocode: str) -> PromocodeRow | None:
+        return PromocodeRow.from_row(await self._fetchone(SELECT_PROMOCODE, (promocode,)))
+
+    async def add(self, promocode: str, spins_bonus: int, usage_limit: int):
+        await self._execute(INSERT_PROMOCODE, (promocode, spins_bonus, usage_limit))
+
+    async def redeem(self, user_id: int, promocode: str) -> tuple[str, PromocodeRow | None]:
+        """
+        Активирует промокод одной транзакцией: проверки, отметка об использовании и начисление прокруток.
+        :return: (PROMO_OK | PROMO_NOT_FOUND | PROMO_EXHAUSTED | PROMO_ALREADY_USED, строка промокода)
+        """
+        async with self.database.writer():
+            promo = await self.get(promocode)
+            if not promo:
+                return PROMO_NOT_FOUND, None
+            if promo.usage_count >= promo.usage_limit:
+                return PROMO_EXHAUSTED, promo
+            if await self._fetchone(PROMOCODE_USED, (user_id, promocode)):
+                return PROMO_ALREADY_USED, promo
+            if not await self._execute(INCREMENT_USAGE, (promocode,)):
+                return PROMO_EXHAUSTED, promo
+
+            await self._execute(MARK_PROMOCODE_USED, (user_id, promocode))
+            await self.users.add_spins(user_id, promo.spins_bonus)
+        return PROMO_OK, promo
+
+    # 🔹 Рефералы
+
+    async def referral(self, user_id: int) -> ReferralRow | None:
+        return ReferralRow.from_row(await self._fetchone(SELECT_REFERRAL, (user_id,)))
+
+    async def validate_referral(self, referral: ReferralRow, referrer_bonus: int, referral_bonus: int) -> bool:
+        """
+        Засчитывает реферала и начисляет бонусы обоим (только один раз).
+        :return: True, если реферал засчитан этим вызовом.
+        """
+        async with self.database.writer():
+            if not await self._execute(VALIDATE_REFERRAL, (referral.referral_id,)):
+                return False
+            await self.users.add_spins(referral.referrer_id, referrer_bonus)
+            await self.users.add_spins(referral.referral_id, referral_bonus)
+        return True
+
+    async def valid_referrals(self, referrer_id: int) -> int:
+        return await self._fetchval(COUNT_VALID_REFERRALS, (referrer_id,), default=0)
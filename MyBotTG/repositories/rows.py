@@ -0,0 +1,80 @@
+class SlottedRow:
+    """
+    Базовый класс строк БД: атрибуты вместо индексов (`card.photo_path` вместо `card[3]`).
+    `__slots__` убирает `__dict__` у каждой строки, поэтому большие выборки занимают меньше памяти.
+    """
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def from_row(cls, row):
+        """Создаёт объект из строки курсора (или возвращает None, если строки нет)."""
+        return cls(*row) if row is not None else None
+
+    @classmethod
+    def from_rows(cls, rows) -> list:
+        return [cls(*row) for row in rows]
+
+    def __iter__(self):
+        """Позволяет распаковывать строку: `card_id, name, *_ = card`."""
+        return (getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and tuple(self) == tuple(other)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class UserRow(SlottedRow):
+    __slots__ = ("user_id", "username", "registration_date", "selected_universe", "is_blacklisted",
+                 "last_card_time", "total_points", "spins", "last_claimed", "daily_streak")
+
+
+class UniverseRow(SlottedRow):
+    __slots__ = ("universe_id", "name", "enabled")
+
+
+class CardRow(SlottedRow):
+    __slots__ = ("universe_id", "card_id", "name", "photo_path", "rarity", "attack", "hp", "points")
+
+
+class ShopItemRow(SlottedRow):
+    __slots__ = ("item_id", "item_type", "item_value", "price")
+
+
+class PromocodeRow(SlottedRow):
+    __slots__ = ("promocode", "spins_bonus", "usage_limit", "usage_count")
+
+
+class ReferralRow(SlottedRow):
+    __slots__ = ("referral_id", "referrer_id", "is_valid")
+
+
+class ChatUserRow(SlottedRow):
+    __slots__ = ("user_id", "username")
+
+
+class CollectionOverview(SlottedRow):
+    """Всё, что нужно экрану «Мои карты»: имя вселенной и счётчики по редкостям."""
+    __slots__ = ("universe_id", "universe_name", "owned", "total")
+
+
+class CardPage(SlottedRow):
+    """
+    Страница браузера карт: текущая карта, её номер и соседи по кругу.
+    Соседи нужны клавиатуре — в кнопки ⬅️/➡️ кладутся их card_id (курсоры), а не весь список.
+    """
+    __slots__ = ("card", "position", "total", "prev", "next")
+
+
+class TopSnapshot(SlottedRow):
+    """
+    Снимок топа: [(username, total_points)], версия содержимого (CRC32, одинакова для одинакового топа
+    и после перезапуска) и момент построения (time.monotonic).
+    """
+    __slots__ = ("top", "version", "built_at")
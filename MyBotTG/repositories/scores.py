@@ -0,0 +1,70 @@
+from dabase.database import db_instance
+from repositories.base import BaseRepo
+from repositories.leaderboard import SCOPE_ALL, SCOPE_UNIVERSE, SCOPE_CHAT, TopSnapshotCache, top_snapshots
+from repositories.rows import TopSnapshot
+from repositories.users import UsersRepo
+
+SELECT_UNIVERSE_TOP = """
+    SELECT user_id, points FROM universe_scores
+    WHERE universe_id = ? AND points > 0
+    ORDER BY points DESC, user_id
+    LIMIT ?
+"""
+SELECT_UNIVERSE_POINTS = "SELECT points FROM universe_scores WHERE universe_id = ? AND user_id = ?"
+COUNT_UNIVERSE_AHEAD = "SELECT COUNT(*) FROM universe_scores WHERE universe_id = ? AND points > ?"
+SELECT_CHAT_TOP = """
+    SELECT user_id, points FROM chat_scores
+    WHERE chat_id = ? AND points > 0
+    ORDER BY points DESC, user_id
+    LIMIT ?
+"""
+SELECT_CHAT_POINTS = "SELECT points FROM chat_scores WHERE chat_id = ? AND user_id = ?"
+COUNT_CHAT_AHEAD = "SELECT COUNT(*) FROM chat_scores WHERE chat_id = ? AND points > ?"
+
+# Рейтинг → (топ, очки пользователя, сколько пользователей впереди)
+SCOPE_QUERIES = {
+    SCOPE_UNIVERSE: (SELECT_UNIVERSE_TOP, SELECT_UNIVERSE_POINTS, COUNT_UNIVERSE_AHEAD),
+    SCOPE_CHAT: (SELECT_CHAT_TOP, SELECT_CHAT_POINTS, COUNT_CHAT_AHEAD),
+}
+
+
+class ScoresRepo(BaseRepo):
+    """
+    Единый интерфейс /top для всех рейтингов: общего (рейтинг в памяти UsersRepo),
+    вселенной и чата (материализованные таблицы). scope_id — id вселенной или чата.
+
+    Топ — O(K) по индексу (scope, points DESC). Место в рейтинге вселенной или чата —
+    COUNT по тому же индексу (покрывающий, без чтения строк), то есть O(место): для
+    лидеров дёшево, для хвоста большой вселенной — пропорционально числу игроков впереди.
+    Рейтинга в памяти, как у общего топа, для этих таблиц нет.
+    """
+
+    def __init__(self, database=db_instance, snapshots: TopSnapshotCache = top_snapshots):
+        super().__init__(database)
+        self.users = UsersRepo(database, snapshots=snapshots)
+        self.snapshots = snapshots
+
+    async def _top(self, scope: str, scope_id, limit: int) -> list[tuple[str | None, int]]:
+        top = []
+        for user_id, points in await self._fetchall(SCOPE_QUERIES[scope][0], (scope_id, limit)):
+            user = await self.users.get(user_id)  # Имена лидеров почти всегда уже в кэше users
+            top.append((user.username if user else None, points))
+        return top
+
+    async def top_snapshot(self, scope: str, scope_id=None, limit: int = 10) -> TopSnapshot:
+        """Топ рейтинга: снимок с коротким TTL, O(limit) по индексу (scope, points DESC) при перестроении."""
+        if scope == SCOPE_ALL:
+            return await self.users.top_snapshot(limit)
+        return await self.snapshots.get((scope, scope_id, limit), lambda: self._top(scope, scope_id, limit))
+
+    async def rank(self, scope: str, scope_id, user_id: int) -> tuple[int, tuple | None]:
+        """:return: (место пользователя, (username, очки в рейтинге) или None, если его в рейтинге нет)"""
+        if scope == SCOPE_ALL:
+            return await self.users.rank(user_id)
+        _, select_points, count_ahead = SCOPE_QUERIES[scope]
+        points = await self._fetchval(select_points, (scope_id, user_id))
+        if points is None:
+            return 1, None
+        user = await self.users.get(user_id)
+        ahead = await self._fetchval(count_ahead, (scope_id, points), default=0)
+        return ahead + 1, (user.username if user else None, points)
@@ -0,0 +1,120 @@
+from dabase.database import db_instance
+from repositories.base import BaseRepo
+from repositories.collection_stats import ADD_STATS_IF_NEW, add_if_new_params
+from repositories.leaderboard_scores import SPEND_CHAT_POINTS
+from repositories.rows import ShopItemRow
+from repositories.users import UsersRepo
+
+SELECT_ITEMS = """
+    SELECT item_id, item_type, item_value, price
+    FROM user_shop
+    WHERE user_id = ? AND universe_id = ?
+"""
+SELECT_ITEM = "SELECT item_id, item_type, item_value, price FROM user_shop WHERE item_id = ? AND user_id = ?"
+DELETE_USER_ITEMS = "DELETE FROM user_shop WHERE user_id = ? AND universe_id = ?"
+INSERT_ITEM = "INSERT INTO user_shop (user_id, universe_id, item_type, item_value, price) VALUES (?, ?, ?, ?, ?)"
+DELETE_ITEM = "DELETE FROM user_shop WHERE item_id = ? AND user_id = ?"
+SELECT_PURCHASED_SLOTS = "SELECT slot FROM shop_purchases WHERE day = ? AND user_id = ? AND universe_id = ?"
+CLAIM_SLOT = "INSERT INTO shop_purchases (day, user_id, universe_id, slot) VALUES (?, ?, ?, ?) ON CONFLICT DO NOTHING"
+RELEASE_SLOT = "DELETE FROM shop_purchases WHERE day = ? AND user_id = ? AND universe_id = ? AND slot = ?"
+PRUNE_PURCHASES = "DELETE FROM shop_purchases WHERE day < ?"
+BUY_SPINS = """
+    UPDATE users SET spins = spins + ?, total_points = total_points - ?
+    WHERE user_id = ? AND total_points >= ?
+"""
+SPEND_POINTS = "UPDATE users SET total_points = total_points - ? WHERE user_id = ? AND total_points >= ?"
+GRANT_CARD = """
+    INSERT INTO user_cards (user_id, card_id, universe_id, quantity)
+    VALUES (?, ?, ?, 1)
+    ON CONFLICT(user_id, card_id, universe_id) DO UPDATE SET quantity = user_cards.quantity + 1
+"""
+
+
+class ShopRepo(BaseRepo):
+    """
+    Персональные магазины: хранимый ассортимент (таблица user_shop) или ежедневный,
+    который выводится из (пользователь, вселенная, день) — для него хранятся только
+    купленные слоты (shop_purchases).
+    """
+
+    def __init__(self, database=db_instance):
+        super().__init__(database)
+        self.users = UsersRepo(database)
+
+    async def items(self, user_id: int, universe: str) -> list[ShopItemRow]:
+        return ShopItemRow.from_rows(await self._fetchall(SELECT_ITEMS, (user_id, universe)))
+
+    async def item(self, item_id: int, user_id: int) -> ShopItemRow | None:
+        return ShopItemRow.from_row(await self._fetchone(SELECT_ITEM, (item_id, user_id)))
+
+    async def replace_items(self, user_id: int, universe: str, items: list[tuple[str, object, int]]):
+        """Заменяет ассортимент пользователя. :param items: (item_type, item_value, price)."""
+        async with self.database.writer() as db:
+            await db.execute(DELETE_USER_ITEMS, (user_id, universe))
+            # item_value хранится как TEXT: число прокруток и card_id приводим к строке явно
+            await db.executemany(INSERT_ITEM, [
+                (user_id, universe, item_type, str(item_value), price) for item_type, item_value, price in items
+            ])
+
+    async def replace_many(self, universe: str, user_ids: list[int], items: list[tuple[int, str, object, int]]):
+        """
+        Заменяет ассортимент пачки пользователей одной транзакцией (массовая перегенерация).
+        :param items: (user_id, item_type, item_value, price).
+        """
+        async with self.database.writer() as db:
+            await db.executemany(DELETE_USER_ITEMS, [(user_id, universe) for user_id in user_ids])
+            await db.executemany(INSERT_ITEM, [
+                (user_id, universe, item_type, str(item_value), price) for user_id, item_type, item_value, price in items
+            ])
+
+    # 🔹 Покупки идут через очередь группового коммита; внутри database.writer() — сразу в его транзакции.
+    # Списание проверяет баланс в самом UPDATE (guard): при нехватке очков группа откатывается целиком.
+    # Очередь возвращает только rowcount, поэтому строку users в кэше не обновляем, а выбрасываем после commit.
+
+    async def purchase_spins(self, user_id: int, spins: int, price: int) -> bool:
+        """Начисляет прокрутки за очки. :return: False, если очков не хватило (ничего не изменено)."""
+        done = await self.database.execute_write_group([
+            (BUY_SPINS, (spins, price, user_id, price)),
+            (SPEND_CHAT_POINTS, (price, user_id)),  # Рейтинги чатов — в той же транзакции
+        ], guard=0)
+        if done is None:
+            return False
+        self.database.after_commit(lambda: self.users.invalidate(user_id, points_delta=-price))
+        return True
+
+    async def purchase_card(self, user_id: int, universe: str, card_id: int, price: int) -> bool:
+        """
+        Выдаёт карту (со счётчиком коллекции) и списывает очки — одной неделимой группой очереди.
+        :return: False, если очков не хватило (карта не выдана).
+        """
+        done = await self.database.execute_write_group([
+            (SPEND_POINTS, (price, user_id, price)),
+            (SPEND_CHAT_POINTS, (price, user_id)),
+            (ADD_STATS_IF_NEW, add_if_new_params(user_id, universe, card_id)),  # До вставки: карта ещё новая?
+            (GRANT_CARD, (user_id, card_id, universe)),
+        ], guard=0)
+        if done is None:
+            return False
+        self.database.after_commit(lambda: self.users.invalidate(user_id, points_delta=-price))
+        return True
+
+    async def delete_item(self, item_id: int, user_id: int) -> bool:
+        """Удаляет купленный товар. :return: False, если товара уже нет."""
+        return await self.database.execute_write(DELETE_ITEM, (item_id, user_id)) > 0
+
+    # 🔹 Ежедневные магазины: ассортимент не хранится, только купленные слоты
+
+    async def purchased_slots(self, user_id: int, universe: str, day: int) -> set[int]:
+        return {slot for slot, in await self._fetchall(SELECT_PURCHASED_SLOTS, (day, user_id, universe))}
+
+    async def claim_slot(self, user_id: int, universe: str, day: int, slot: int) -> bool:
+        """Отмечает слот купленным до списания очков. :return: False, если слот уже куплен."""
+        return await self.database.execute_write(CLAIM_SLOT, (day, user_id, universe, slot)) > 0
+
+    async def release_slot(self, user_id: int, universe: str, day: int, slot: int):
+        """Возвращает слот в продажу, если покупка не состоялась."""
+        await self.database.execute_write(RELEASE_SLOT, (day, user_id, universe, slot))
+
+    async def prune_purchases(self, before_day: int) -> int:
+        """Удаляет покупки за дни раньше `before_day`. :return: Сколько строк удалено."""
+        return await self.database.execute_write(PRUNE_PURCHASES, (before_day,))
@@ -0,0 +1,155 @@
+from collections import Counter
+from dabase.database import db_instance
+from repositories.base import BaseRepo
+from repositories.cards import CardsRepo
+from repositories.collection_stats import (
+    SELECT_STATS, SELECT_STATS_RARITY, SELECT_STATS_TOTAL, CLEAR_STATS, ADD_STATS, ADD_STATS_IF_NEW, add_if_new_params,
+)
+from repositories.rows import CardRow, CardPage, CollectionOverview, UserRow
+from repositories.users import UsersRepo, now_str
+
+SELECT_QUANTITY = "SELECT quantity FROM user_cards WHERE user_id = ? AND card_id = ? AND universe_id = ?"
+ADD_CARD = """
+    INSERT INTO user_cards (user_id, card_id, universe_id, quantity)
+    VALUES (?, ?, ?, 1)
+    ON CONFLICT(user_id, card_id, universe_id) DO UPDATE SET quantity = user_cards.quantity + 1
+"""
+ADD_NEW_CARD = """
+    INSERT INTO user_cards (user_id, card_id, universe_id, quantity)
+    VALUES (?, ?, ?, 1)
+    ON CONFLICT DO NOTHING
+"""
+# Строка возвращается только для новой карты — так одним запросом понятно, повтор это или нет
+GRANT_CARD = f"{ADD_NEW_CARD.rstrip()} RETURNING card_id"
+SELECT_OWNED_IDS = "SELECT card_id FROM user_cards WHERE user_id = ? AND universe_id = ?"
+# 🔹 Курсоры браузера карт: шаг по индексу (user_id, universe_id, card_id) от текущей карты
+OWNED_OF_RARITY = """
+    SELECT uc.card_id
+    FROM user_cards uc
+    JOIN cards c ON c.universe_id = uc.universe_id AND c.card_id = uc.card_id
+    WHERE uc.user_id = ? AND uc.universe_id = ? AND c.rarity = ?
+"""
+SELECT_OWNED_FROM = f"{OWNED_OF_RARITY} AND uc.card_id >= ? ORDER BY uc.card_id LIMIT 2"
+SELECT_OWNED_BEFORE = f"{OWNED_OF_RARITY} AND uc.card_id < ? ORDER BY uc.card_id DESC LIMIT 1"
+SELECT_OWNED_LAST = f"{OWNED_OF_RARITY} ORDER BY uc.card_id DESC LIMIT 1"
+SELECT_OWNED_OF_RARITY = f"{OWNED_OF_RARITY} ORDER BY uc.card_id"
+COUNT_ALL = "SELECT COUNT(*) FROM user_cards WHERE user_id = ?"
+DELETE_ALL = "DELETE FROM user_cards WHERE user_id = ?"
+
+# 🔹 Результаты выдачи карты
+GRANT_NEW = "new"
+GRANT_DUPLICATE = "duplicate"
+GRANT_NOT_ALLOWED = "not_allowed"
+
+
+class UserCardsRepo(BaseRepo):
+    """Коллекции пользователей (таблица user_cards и её счётчики user_collection_stats)."""
+
+    def __init__(self, database=db_instance):
+        super().__init__(database)
+        self.users = UsersRepo(database)
+        self.cards = CardsRepo(database)  # Имя вселенной и размер каталога — из каталога в памяти
+
+    async def grant(self, user_id: int, card: CardRow, cooldown_cutoff: str) -> tuple[str, UserRow | None]:
+        """
+        Выдача карты одной транзакцией из двух запросов: условное списание прокрутки/кулдауна
+        с начислением очков (UPDATE ... RETURNING) и добавление карты, если её ещё нет.
+        :return: (GRANT_NEW | GRANT_DUPLICATE | GRANT_NOT_ALLOWED, строка пользователя после выдачи)
+        """
+        async with self.database.writer() as db:
+            user = await self.users.claim_card(user_id, card.points, now_str(), cooldown_cutoff, card.universe_id)
+            if user is None:
+                return GRANT_NOT_ALLOWED, None
+            async with db.execute(GRANT_CARD, (user_id, card.card_id, card.universe_id)) as cursor:
+                is_new = await cursor.fetchone() is not None
+            if is_new:
+                await db.execute(ADD_STATS, (user_id, card.universe_id, card.rarity, 1))
+        return (GRANT_NEW if is_new else GRANT_DUPLICATE), user
+
+    async def quantity(self, user_id: int, universe: str, card_id: int) -> int:
+        return await self._fetchval(SELECT_QUANTITY, (user_id, card_id, universe), default=0)
+
+    async def add(self, user_id: int, universe: str, card_id: int):
+        """Добавляет карту в коллекцию (повторная карта увеличивает quantity)."""
+        async with self.database.writer() as db:
+            await db.execute(ADD_STATS_IF_NEW, add_if_new_params(user_id, universe, card_id))
+            await db.execute(ADD_CARD, (user_id, card_id, universe))
+
+    async def add_new(self, user_id: int, universe: str, cards: list[CardRow]):
+        """
+        Добавляет пачку ещё не полученных карт (без повторов внутри пачки) одним executemany
+        и увеличивает счётчики по редкостям.
+        """
+        if not cards:
+            return
+        async with self.database.writer() as db:
+            await db.executemany(ADD_NEW_CARD, [(user_id, card.card_id, universe) for card in cards])
+            await db.executemany(ADD_STATS, [
+                (user_id, universe, rarity, count) for rarity, count in Counter(card.rarity for card in cards).items()
+            ])
+
+    async def owned_ids(self, user_id: int, universe: str) -> set[int]:
+        return {row[0] for row in await self._fetchall(SELECT_OWNED_IDS, (user_id, universe))}
+
+    async def page(self, user_id: int, universe: str, rarity: str, card_id: int = 0, position: int = 0) -> CardPage | None:
+        """
+        Страница браузера «Мои карты»: карта с курсором card_id (если её уже нет — следующая,
+        за последней — первая) и соседи по кругу. Вместо чтения всей коллекции — счётчик
+        из user_collection_stats и два запроса LIMIT по индексу коллекции; карты берутся
+        из каталога в памяти. Номер карты приходит из кнопки (position), поэтому не считается.
+        :return: None, если карт этой редкости у пользователя нет.
+        """
+        snapshot = await self.cards.snapshot(universe)
+        key = (user_id, universe, rarity)
+        async with self.database.reader() as db:
+            total = await db.execute_fetchall(SELECT_STATS_RARITY, key)
+            ids = [row[0] for row in await db.execute_fetchall(SELECT_OWNED_FROM, (*key, card_id))]
+            if not ids and card_id:
+                position = 0  # Курсор за последней картой — начинаем сначала
+                ids = [row[0] for row in await db.execute_fetchall(SELECT_OWNED_FROM, (*key, 0))]
+            if not ids or not total or not total[0][0]:
+                return None
+            # У краёв соседи замыкаются по кругу: за последней — первая, перед первой — последняя
+            if len(ids) < 2:
+                ids += [row[0] for row in await db.execute_fetchall(SELECT_OWNED_FROM, (*key, 0))][:1]
+            before = (await db.execute_fetchall(SELECT_OWNED_BEFORE, (*key, ids[0]))
+                      or await db.execute_fetchall(SELECT_OWNED_LAST, key))
+
+        total = total[0][0]
+        current, prev_card, next_card = (snapshot.by_id.get(ids[0]), snapshot.by_id.get(before[0][0]),
+                                         snapshot.by_id.get(ids[1]))
+        if current is None:
+            return None
+        return CardPage(current, position % total, total, prev_card or current, next_card or current)
+
+    async def owned_of_rarity(self, user_id: int, universe: str, rarity: str) -> list[CardRow]:
+        """Карты редкости у пользователя по порядку card_id (для коллажа): id из индекса, карты — из каталога."""
+        snapshot = await self.cards.snapshot(universe)
+        rows = await self._fetchall(SELECT_OWNED_OF_RARITY, (user_id, universe, rarity))
+        return [snapshot.by_id[card_id] for card_id, in rows if card_id in snapshot.by_id]
+
+    async def overview(self, user_id: int, universe: str) -> CollectionOverview | None:
+        """
+        Данные для экрана «Мои карты»: счётчики пользователя — одним чтением по ключу,
+        имя вселенной и размер каталога по редкостям — из памяти.
+        :return: None, если вселенной нет в таблице universes.
+        """
+        universe_row = await self.cards.universe(universe)
+        if universe_row is None:
+            return None
+        owned = {rarity: count for rarity, count in await self._fetchall(SELECT_STATS, (user_id, universe)) if count > 0}
+        total = (await self.cards.snapshot(universe)).counts()
+        return CollectionOverview(universe, universe_row.name, owned, total)
+
+    async def count_distinct(self, user_id: int) -> int:
+        """Сколько разных карт у пользователя (по счётчикам коллекций)."""
+        return await self._fetchval(SELECT_STATS_TOTAL, (user_id,), default=0)
+
+    async def count(self, user_id: int) -> int:
+        return await self._fetchval(COUNT_ALL, (user_id,), default=0)
+
+    async def clear(self, user_id: int):
+        """Удаляет все карты пользователя (при смене вселенной)."""
+        async with self.database.writer() as db:
+            await db.execute(DELETE_ALL, (user_id,))
+            await db.execute(CLEAR_STATS, (user_id,))
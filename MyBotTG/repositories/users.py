@@ -0,0 +1,212 @@
+import os
+from datetime import datetime
+from dabase.database import db_instance
+from repositories.base import BaseRepo
+from repositories.cache import RowCache
+from repositories.cooldowns import CooldownService, cooldowns
+from repositories.leaderboard import LeaderboardIndex, TopSnapshotCache, SCOPE_ALL, leaderboard_index, top_snapshots
+from repositories.leaderboard_scores import ADD_UNIVERSE_POINTS, SYNC_CHAT_POINTS
+from repositories.rows import UserRow, TopSnapshot
+
+USERS_CACHE_SIZE = int(os.getenv("USERS_CACHE_SIZE", "10000"))  # Строк users в памяти процесса, 0 — без кэша
+
+USER_COLUMNS = ("user_id, username, registration_date, selected_universe, is_blacklisted, "
+                "last_card_time, total_points, spins, last_claimed, daily_streak")
+
+SELECT_USER = f"SELECT {USER_COLUMNS} FROM users WHERE user_id = ?"
+# Все изменения users возвращают строку целиком (RETURNING) — ею обновляется кэш
+INSERT_USER = ("INSERT INTO users (user_id, username, registration_date) VALUES (?, ?, ?) "
+               f"ON CONFLICT DO NOTHING RETURNING {USER_COLUMNS}")
+SET_UNIVERSE = f"UPDATE users SET selected_universe = ? WHERE user_id = ? RETURNING {USER_COLUMNS}"
+ADD_SPINS = f"UPDATE users SET spins = spins + ? WHERE user_id = ? RETURNING {USER_COLUMNS}"
+USE_SPIN = f"UPDATE users SET spins = spins - 1 WHERE user_id = ? AND spins > 0 RETURNING {USER_COLUMNS}"
+USE_SPINS = f"UPDATE users SET spins = spins - ? WHERE user_id = ? AND spins >= ? RETURNING {USER_COLUMNS}"
+ADD_POINTS = f"UPDATE users SET total_points = total_points + ? WHERE user_id = ? RETURNING {USER_COLUMNS}"
+ADD_CARD_REWARD = (f"UPDATE users SET total_points = total_points + ?, last_card_time = ? WHERE user_id = ? "
+                   f"RETURNING {USER_COLUMNS}")
+# Право на карту и награда одним UPDATE: прокрутка (если есть) или истёкший кулдаун.
+# Условие в WHERE не даёт двум быстрым нажатиям потратить одну прокрутку или один кулдаун дважды
+CLAIM_CARD = f"""
+    UPDATE users
+    SET spins = CASE WHEN spins > 0 THEN spins - 1 ELSE spins END,
+        total_points = total_points + ?,
+        last_card_time = ?
+    WHERE user_id = ? AND (spins > 0 OR last_card_time IS NULL OR last_card_time <= ?)
+    RETURNING {USER_COLUMNS}
+"""
+# Записи, меняющие total_points: рейтинги чатов (chat_scores) обновляются в той же транзакции
+POINTS_WRITES = frozenset((ADD_POINTS, ADD_CARD_REWARD, CLAIM_CARD))
+SET_DAILY = (f"UPDATE users SET last_claimed = ?, daily_streak = ?, spins = spins + ? WHERE user_id = ? "
+             f"RETURNING {USER_COLUMNS}")
+SELECT_WITH_UNIVERSE = "SELECT user_id, selected_universe FROM users WHERE selected_universe IS NOT NULL"
+# Рейтинг строится в памяти (LeaderboardIndex) из очков всех пользователей
+SELECT_RANKS = "SELECT user_id, COALESCE(total_points, 0) FROM users"
+SELECT_RANK = "SELECT user_id, COALESCE(total_points, 0) FROM users WHERE user_id = ?"
+
+
+def now_str() -> str:
+    """Текущее время в формате, в котором даты хранятся в таблице users."""
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+# Кэш строк users процесса (общий для всех репозиториев, меняющих users)
+users_cache = RowCache(USERS_CACHE_SIZE)
+
+
+class UsersRepo(BaseRepo):
+    """Таблица users: профиль, очки, прокрутки, выбранная вселенная."""
+
+    def __init__(self, database=db_instance, cache: RowCache = users_cache, cooldown_service: CooldownService = cooldowns,
+                 rank_index: LeaderboardIndex = leaderboard_index, snapshots: TopSnapshotCache = top_snapshots):
+        super().__init__(database)
+        self.cache = cache
+        self.cooldowns = cooldown_service
+        self.ranks = rank_index
+        self.snapshots = snapshots
+
+    async def get(self, user_id: int) -> UserRow | None:
+        """
+        Вся строка пользователя одним запросом (вместо отдельных SELECT по каждому полю).
+        Сначала смотрит в кэш; внутри транзакции записи всегда читает БД.
+        """
+        in_transaction = self.database.in_transaction()
+        if not in_transaction:
+            user = self.cache.get(user_id)
+            if user is not None:
+                return user
+
+        seq = self.cache.write_seq
+        user = UserRow.from_row(await self._fetchone(SELECT_USER, (user_id,)))
+        if not in_transaction and seq == self.cache.write_seq:
+            self.cache.fill(user_id, user, seq)
+            self.cooldowns.observe(user_id, user)
+        return user
+
+    async def cooldown_left(self, user_id: int, kind: str) -> float:
+        """Секунд до следующей карты/бонуса (0 — уже можно); пользователь загружается только при первом обращении."""
+        left = self.cooldowns.left(kind, user_id)
+        if left is None:
+            self.cooldowns.observe(user_id, await self.get(user_id))
+            left = self.cooldowns.left(kind, user_id)
+        return left
+
+    async def _write(self, user_id: int, sql: str, params: tuple) -> UserRow | None:
+        """UPDATE/INSERT ... RETURNING: новая строка попадает в кэш, кулдауны и рейтинг после commit."""
+        async with self.database.writer() as db:
+            async with db.execute(sql, params) as cursor:
+                user = UserRow.from_row(await cursor.fetchone())
+            if user is not None:
+                if sql in POINTS_WRITES:
+                    await db.execute(SYNC_CHAT_POINTS, (user.total_points, user_id))
+                self.database.after_commit(lambda: self._committed(user_id, user))
+        return user
+
+    async def _reward(self, user_id: int, universe: str | None, points: int, sql: str, params: tuple) -> UserRow | None:
+        """Награда за карты: строка users и очки вселенной (universe_scores) — одной транзакцией."""
+        async with self.database.writer() as db:
+            user = await self._write(user_id, sql, params)
+            if user is not None and universe and points:
+                await db.execute(ADD_UNIVERSE_POINTS, (universe, user_id, points))
+        return user
+
+    def _committed(self, user_id: int, user: UserRow):
+        self.cache.put(user_id, user)
+        self.cooldowns.observe(user_id, user)
+        self.ranks.observe(user_id, user.total_points)
+
+    def invalidate(self, user_id: int, points_delta: int = 0):
+        """
+        Выбрасывает строку из кэша (для записей в обход UsersRepo, например через очередь).
+        :param points_delta: На сколько такая запись изменила total_points — для рейтинга.
+        """
+        def committed():
+            self.cache.invalidate(user_id)
+            self.ranks.add(user_id, points_delta)
+
+        self.database.after_commit(committed)
+
+    async def get_universe(self, user_id: int) -> str | None:
+        user = await self.get(user_id)
+        return user.selected_universe if user else None
+
+    async def create(self, user_id: int, username: str | None) -> bool:
+        """Регистрирует пользователя. :return: True, если запись создана."""
+        return await self._write(user_id, INSERT_USER, (user_id, username, now_str())) is not None
+
+    async def set_universe(self, user_id: int, universe: str | None):
+        await self._write(user_id, SET_UNIVERSE, (universe, user_id))
+
+    async def add_spins(self, user_id: int, spins: int):
+        await self._write(user_id, ADD_SPINS, (spins, user_id))
+
+    async def use_spin(self, user_id: int) -> bool:
+        """Списывает одну прокрутку. :return: False, если прокруток не осталось."""
+        return await self._write(user_id, USE_SPIN, (user_id,)) is not None
+
+    async def use_spins(self, user_id: int, count: int) -> UserRow | None:
+        """Списывает `count` прокруток разом. :return: новая строка или None, если прокруток не хватает."""
+        return await self._write(user_id, USE_SPINS, (count, user_id, count))
+
+    async def add_points(self, user_id: int, points: int):
+        await self._write(user_id, ADD_POINTS, (points, user_id))
+
+    async def add_card_reward(self, user_id: int, points: int, when: str | None = None,
+                              universe: str | None = None) -> UserRow | None:
+        """Начисляет очки за карты вселенной `universe` и обновляет время последнего получения одним UPDATE."""
+        return await self._reward(user_id, universe, points, ADD_CARD_REWARD, (points, when or now_str(), user_id))
+
+    async def claim_card(self, user_id: int, points: int, now: str, cooldown_cutoff: str,
+                         universe: str | None = None) -> UserRow | None:
+        """
+        Списывает прокрутку (или, если их нет, ставит кулдаун) и начисляет очки за карту вселенной `universe`.
+        :return: новая строка или None, если нет ни прокруток, ни истёкшего кулдауна (последняя карта позже cutoff).
+        """
+        return await self._reward(user_id, universe, points, CLAIM_CARD, (points, now, user_id, cooldown_cutoff))
+
+    async def set_daily(self, user_id: int, last_claimed: str, streak: int, bonus: int) -> UserRow | None:
+        return await self._write(user_id, SET_DAILY, (last_claimed, streak, bonus, user_id))
+
+    async def with_universe(self) -> list[tuple[int, str]]:
+        """Пары (user_id, selected_universe) всех пользователей с выбранной вселенной."""
+        return [(row[0], row[1]) for row in await self._fetchall(SELECT_WITH_UNIVERSE)]
+
+    async def load_leaderboard(self):
+        """Строит рейтинг в памяти из users: при запуске бота, иначе — при первом запросе топа."""
+        index = self.ranks
+        async with index.load_lock:
+            if index.loaded:
+                return
+            index.begin_load()
+            touched = index.finish_load(await self._fetchall(SELECT_RANKS))
+            while touched:  # Очки этих пользователей менялись во время чтения — перечитываем после commit
+                rows = [await self._fetchone(SELECT_RANK, (user_id,)) for user_id in touched]
+                touched = index.finish_load([row for row in rows if row is not None])
+
+    async def _top(self, limit: int) -> list[tuple[str | None, int]]:
+        await self.load_leaderboard()
+        top = []
+        for leader_id, points in self.ranks.top(limit):
+            leader = await self.get(leader_id)  # Имена лидеров почти всегда уже в кэше users
+            top.append((leader.username if leader else None, points))
+        return top
+
+    async def top_snapshot(self, limit: int = 10) -> TopSnapshot:
+        """Топ для /top и «🔄 Обновить»: снимок с коротким TTL, одно перестроение на всех ожидающих."""
+        return await self.snapshots.get((SCOPE_ALL, None, limit), lambda: self._top(limit))
+
+    async def rank(self, user_id: int) -> tuple[int, tuple | None]:
+        """:return: (место пользователя, (username, total_points) пользователя или None)"""
+        await self.load_leaderboard()
+        user = await self.get(user_id)
+        current = (user.username, user.total_points) if user else None
+        return self.ranks.rank(user_id) or 1, current
+
+    async def leaderboard(self, user_id: int, limit: int = 10) -> tuple[list, int, tuple | None]:
+        """
+        Актуальные (без снимка) топ и место пользователя из рейтинга в памяти: O(log n + limit)
+        вместо сортировки и COUNT по users.
+        :return: (топ [(username, total_points)], место пользователя, (username, total_points) пользователя или None)
+        """
+        top = await self._top(limit)
+        position, current = await self.rank(user_id)
+        return top, position, current
@@ -1,24 +1,48 @@
 import pytz
 import asyncio
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from cards.shop import update_all_shops
+from cards.shop import update_all_shops, prune_shop_purchases, SHOP_MODE, SHOP_MODE_DAILY, SHOP_MODE_STORED
 from handlers.satefy.event_users import update_all_users
 from handlers.satefy.mute import check_and_remove_mute
 from handlers.satefy.ban import check_and_remove_ban
+from dabase.maintenance import register_maintenance_jobs
+from utils.card_photos import warm_up_card_photos, PHOTO_WARMUP_CHAT_ID
+from utils.collage import prune_collages, COLLAGE_MAX_AGE_DAYS
 
 # ✅ Создаём планировщик
 scheduler = AsyncIOScheduler(timezone=pytz.timezone("Europe/Moscow"))
 
 def start_scheduler(bot):
     """Запуск планировщика (с защитой от повторного запуска)"""
-    print("⚠️ Планировщик временно отключен для теста.")
-    # if not scheduler.running:  # ✅ Проверяем, запущен ли он уже
-    #     scheduler.start()
+    if scheduler.running:  # ✅ Проверяем, запущен ли он уже
+        print("⚠️ Планировщик уже работает, повторный запуск не требуется.")
+        return
 
-    #     scheduler.add_job(update_all_shops, "cron", hour=0, minute=0, misfire_grace_time=60)
-    #     scheduler.add_job(check_and_remove_mute, "interval", minutes=10, args=[bot])
-    #     scheduler.add_job(check_and_remove_ban, "interval", minutes=10, args=[bot])
+    scheduler.start()
 
-    #     print("✅ Планировщик запущен!")
-    # else:
-    #     print("⚠️ Планировщик уже работает, повторный запуск не требуется.")
\ No newline at end of file
+    # 🛠 Обслуживание БД (checkpoint WAL, optimize, incremental vacuum)
+    register_maintenance_jobs(scheduler)
+
+    # 🖼 Прогрев file_id: однократная загрузка каталога в служебный чат (PHOTO_WARMUP_CHAT_ID)
+    if PHOTO_WARMUP_CHAT_ID:
+        scheduler.add_job(warm_up_card_photos, args=[bot])
+
+    # 🧹 Коллажи коллекций, которые давно не показывали, удаляются вместе с их file_id
+    if COLLAGE_MAX_AGE_DAYS > 0:
+        scheduler.add_job(prune_collages, "cron", hour=4, minute=30, id="collages_prune",
+                          replace_existing=True, max_instances=1, misfire_grace_time=3600)
+
+    # 🛒 Ежедневные магазины не перегенерируются по ночам — остаётся удалить покупки прошлых дней;
+    # хранимые (user_shop) перегенерируются пакетно в полночь
+    if SHOP_MODE == SHOP_MODE_DAILY:
+        scheduler.add_job(prune_shop_purchases, "cron", hour=0, minute=5, id="shop_prune_purchases",
+                          replace_existing=True, misfire_grace_time=3600)
+    elif SHOP_MODE == SHOP_MODE_STORED:
+        scheduler.add_job(update_all_shops, "cron", hour=0, minute=0, id="shop_regenerate",
+                          replace_existing=True, max_instances=1, misfire_grace_time=60)
+
+    print("⚠️ Задачи модерации временно отключены для теста.")
+    # scheduler.add_job(check_and_remove_mute, "interval", minutes=10, args=[bot])
+    # scheduler.add_job(check_and_remove_ban, "interval", minutes=10, args=[bot])
+
+    print("✅ Планировщик запущен!")
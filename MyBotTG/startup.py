@@ -2,19 +2,31 @@ import logging
 from aiogram import Bot
 from dabase.database import db_instance
 from scheduler_jobs import start_scheduler
+from utils.loop_monitor import loop_monitor, LOOP_MONITOR_ENABLED
+from repositories import users_cache, cards_repo, users_repo
+from utils.image_store import image_store
 
 async def on_startup(bot: Bot):
     """Функция, вызываемая при запуске бота."""
     print("⏳ Запускаем инициализацию БД...")
     await db_instance.init_db()  # ✅ Инициализация БД
+    await cards_repo.load_catalog()  # ✅ Каталог карт в память: выдача карт не ходит в таблицу cards
+    await users_repo.load_leaderboard()  # ✅ Рейтинг в память: /top не сортирует users
 
     start_scheduler(bot)  # ✅ Запускаем планировщик с передачей bot
 
+    if LOOP_MONITOR_ENABLED:
+        loop_monitor.start()  # ✅ Монитор задержек event loop (LOOP_MONITOR=1)
+
     print("✅ База данных готова, бот запущен!")
 
 async def on_shutdown(bot: Bot):
     """Функция, вызываемая при остановке бота."""
     print("⚠️ Остановка бота...")
+    await loop_monitor.stop()
+    logging.info(f"📊 Кэш users: {users_cache.stats()}")
+    image_store.close()
+
     try:
         await db_instance.close_db()
     except Exception as e:
@@ -0,0 +1,138 @@
+"""
+Бенчмарк выдачи карты: прежняя последовательность запросов give_card против UserCardsRepo.grant.
+
+Прежний путь: чтение строки users, затем в транзакции use_spin, проверка quantity,
+добавление карты и отдельный UPDATE очков. Новый — одна транзакция из двух запросов
+(условный UPDATE users ... RETURNING и INSERT ... RETURNING). Печатает задержку
+одной выдачи (последовательно и при параллельных пользователях) и число двойных
+трат при «двойном нажатии».
+
+Запуск из каталога MyBotTG:
+    python -m tools.bench_card_grant --grants 2000 --concurrency 16
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import logging
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dabase.database import Database, ConnectionPool  # noqa: E402
+from repositories import CardsRepo, UserCardsRepo, UsersRepo, RowCache, CardCatalog, GRANT_NOT_ALLOWED  # noqa: E402
+from tools.bench_storage_profile import percentile  # noqa: E402
+
+UNIVERSE = "marvel"
+CUTOFF = "2000-01-01 00:00:00"  # Кулдаун у всех активен: выдача только за прокрутки
+
+
+async def seed(db: Database, users: int, cards: int) -> list:
+    async with db.writer() as conn:
+        await conn.executemany(
+            "INSERT INTO users (user_id, username, registration_date, spins) VALUES (?, ?, datetime('now'), ?)",
+            [(i, f"user_{i}", 1_000_000) for i in range(1, users + 1)]
+        )
+    repo = CardsRepo(db, CardCatalog())
+    for i in range(cards):
+        await repo.add(UNIVERSE, f"card {i}", f"images/{i}.jpg", "обычная", 1, 1, random.randint(10, 500))
+    return list((await repo.snapshot(UNIVERSE)).cards)
+
+
+async def legacy_grant(users: UsersRepo, user_cards: UserCardsRepo, db: Database, user_id: int, card) -> bool:
+    """Последовательность запросов give_card до атомарной выдачи."""
+    user = await users.get(user_id)
+    if not user.spins:
+        return False
+    async with db.writer():
+        await users.use_spin(user_id)  # Результат не проверялся — отсюда двойная трата
+        if not await user_cards.quantity(user_id, UNIVERSE, card.card_id):
+            await user_cards.add(user_id, UNIVERSE, card.card_id)
+        await users.add_card_reward(user_id, card.points)
+    return True
+
+
+async def atomic_grant(user_cards: UserCardsRepo, user_id: int, card) -> bool:
+    status, _ = await user_cards.grant(user_id, card, CUTOFF)
+    return status != GRANT_NOT_ALLOWED
+
+
+async def measure(grant, grants: int, concurrency: int, users: int, cards: list) -> list:
+    latencies, counter = [], iter(range(grants))
+
+    async def worker():
+        for _ in counter:
+            user_id, card = random.randint(1, users), random.choice(cards)
+            started = time.perf_counter()
+            await grant(user_id, card)
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def double_taps(grant, db: Database, users: UsersRepo, cards: list, taps: int) -> int:
+    """Сколько выдач прошло сверх одной прокрутки, когда два нажатия приходят одновременно."""
+    extra = 0
+    for _ in range(taps):
+        async with db.writer() as conn:
+            await conn.execute("UPDATE users SET spins = 1 WHERE user_id = 1")
+        users.cache.clear()
+        results = await asyncio.gather(grant(1, random.choice(cards)), grant(1, random.choice(cards)))
+        extra += sum(results) - 1
+    return extra
+
+
+async def run(name: str, args) -> dict:
+    random.seed(42)
+    db = Database()
+    db.pool = ConnectionPool(os.path.join(tempfile.mkdtemp(prefix="bench_grant_"), "bench.db"))
+    await db.init_db()
+    cards = await seed(db, args.users, args.cards)
+    users = UsersRepo(db, RowCache(0))  # Без кэша: сравниваются именно запросы к БД
+    user_cards = UserCardsRepo(db)
+    user_cards.users = users
+
+    if name == "legacy":
+        grant = lambda user_id, card: legacy_grant(users, user_cards, db, user_id, card)  # noqa: E731
+    else:
+        grant = lambda user_id, card: atomic_grant(user_cards, user_id, card)  # noqa: E731
+
+    try:
+        sequential = await measure(grant, args.grants, 1, args.users, cards)
+        started = time.perf_counter()
+        concurrent = await measure(grant, args.grants, args.concurrency, args.users, cards)
+        elapsed = time.perf_counter() - started
+        extra = await double_taps(grant, db, users, cards, args.taps)
+    finally:
+        await db.close_db()
+
+    return {
+        "p50 ms": percentile(sequential, 0.50) * 1000,
+        "p99 ms": percentile(sequential, 0.99) * 1000,
+        f"p99 ms ×{args.concurrency}": percentile(concurrent, 0.99) * 1000,
+        "выдач/с": len(concurrent) / elapsed,
+        "двойных трат": extra,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grants", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--cards", type=int, default=200)
+    parser.add_argument("--taps", type=int, default=200, help="Число «двойных нажатий»")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    results = {name: await run(name, args) for name in ("legacy", "atomic")}
+    print(f"{'':<16}" + "".join(f"{name:>12}" for name in results))
+    for metric in results["legacy"]:
+        print(f"{metric:<16}" + "".join(f"{results[name][metric]:>12.2f}" for name in results))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
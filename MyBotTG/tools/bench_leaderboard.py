@@ -0,0 +1,120 @@
+"""
+Бенчмарк рейтинга: прежний SQL (ORDER BY total_points + COUNT(*) по users) против
+рейтинга в памяти (repositories/leaderboard.py) на большом числе пользователей.
+
+Измеряются построение индекса, полный запрос /top (UsersRepo.leaderboard),
+отдельные операции индекса и изменение очков.
+
+Запуск из каталога MyBotTG:
+    python -m tools.bench_leaderboard --users 1000000 --queries 2000
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import logging
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dabase.database import Database, ConnectionPool  # noqa: E402
+from repositories import UsersRepo, RowCache, LeaderboardIndex, cooldowns  # noqa: E402
+
+# Запросы /top до рейтинга в памяти
+LEGACY_TOP = "SELECT username, total_points FROM users WHERE total_points > 0 ORDER BY total_points DESC LIMIT ?"
+LEGACY_RANK = "SELECT COUNT(*) + 1 FROM users WHERE total_points > (SELECT total_points FROM users WHERE user_id = ?)"
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def row(name: str, latencies: list) -> dict:
+    return {
+        "операция": name,
+        "ops/s": len(latencies) / sum(latencies) if latencies else 0.0,
+        "p50 мкс": percentile(latencies, 0.50) * 1e6,
+        "p95 мкс": percentile(latencies, 0.95) * 1e6,
+        "p99 мкс": percentile(latencies, 0.99) * 1e6,
+    }
+
+
+async def seed(db: Database, users: int, batch: int = 100_000):
+    for start in range(1, users + 1, batch):
+        async with db.writer() as conn:
+            await conn.executemany(
+                "INSERT INTO users (user_id, username, registration_date, total_points) VALUES (?, ?, datetime('now'), ?)",
+                [(i, f"user_{i}", int(random.paretovariate(1.2) * 100) - 100)
+                 for i in range(start, min(start + batch, users + 1))]
+            )
+
+
+async def measure(func, arguments: list) -> list:
+    latencies = []
+    for argument in arguments:
+        started = time.perf_counter()
+        await func(argument)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def measure_sync(func, arguments: list) -> list:
+    latencies = []
+    for argument in arguments:
+        started = time.perf_counter()
+        func(argument)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000, help="Запросов /top к индексу")
+    parser.add_argument("--legacy-queries", type=int, default=200, help="Запросов /top прежним SQL")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    db = Database()
+    db.pool = ConnectionPool(os.path.join(tempfile.mkdtemp(prefix="bench_leaderboard_"), "bench.db"))
+    await db.init_db()
+    started = time.perf_counter()
+    await seed(db, args.users)
+    print(f"Пользователей: {args.users}, заполнение: {time.perf_counter() - started:.1f} с")
+
+    async def legacy(user_id: int):
+        async with db.reader() as conn:
+            await conn.execute_fetchall(LEGACY_TOP, (10,))
+            await conn.execute_fetchall(LEGACY_RANK, (user_id,))
+
+    index = LeaderboardIndex()
+    users = UsersRepo(db, cache=RowCache(10_000), cooldown_service=cooldowns, rank_index=index)
+    started = time.perf_counter()
+    await users.load_leaderboard()
+    print(f"Построение индекса: {time.perf_counter() - started:.2f} с, {index.stats()}")
+
+    sample = [random.randint(1, args.users) for _ in range(args.queries)]
+    results = [
+        row("SQL: топ-10 + место", await measure(legacy, sample[:args.legacy_queries])),
+        row("индекс: /top целиком", await measure(lambda user_id: users.leaderboard(user_id, 10), sample)),
+        row("индекс: место", measure_sync(index.rank, sample)),
+        row("индекс: топ-10", measure_sync(lambda _: index.top(10), sample)),
+        row("индекс: изменение очков", measure_sync(
+            lambda user_id: index.observe(user_id, index.points(user_id) + random.randint(1, 500)), sample
+        )),
+    ]
+    await db.close_db()
+
+    columns = list(results[0].keys())
+    print(" | ".join(f"{c:>24}" for c in columns))
+    for result in results:
+        print(" | ".join(f"{result[c]:>24.1f}" if isinstance(result[c], float) else f"{result[c]:>24}" for c in columns))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
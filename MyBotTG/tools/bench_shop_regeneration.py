@@ -0,0 +1,74 @@
+"""
+Бенчмарк ежедневной перегенерации магазинов: прежний цикл generate_user_shop по каждому
+пользователю (своя транзакция на пользователя) против update_all_shops (выпадения
+вселенной одним проходом NumPy, executemany пачками по SHOP_BULK_CHUNK пользователей).
+
+Прежний цикл меряется на части пользователей (--legacy-users) и пересчитывается на всех.
+
+Запуск из каталога MyBotTG:
+    python -m tools.bench_shop_regeneration --users 100000 --legacy-users 5000
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import logging
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dabase.database import db_instance, ConnectionPool  # noqa: E402
+from repositories import cards_repo  # noqa: E402
+from cards.shop import generate_user_shop, update_all_shops, RARITIES  # noqa: E402
+
+UNIVERSES = ["marvel", "star_wars"]
+
+
+async def seed(users: int, cards: int) -> dict[int, str]:
+    selected = {i: random.choice(UNIVERSES) for i in range(1, users + 1)}
+    async with db_instance.writer() as conn:
+        await conn.executemany(
+            "INSERT INTO users (user_id, username, registration_date, selected_universe) VALUES (?, ?, datetime('now'), ?)",
+            [(user_id, f"user_{user_id}", universe) for user_id, universe in selected.items()]
+        )
+    for universe in UNIVERSES:
+        for i in range(cards):
+            await cards_repo.add(universe, f"{universe} {i}", f"images/{universe}/{i}.jpg", random.choice(RARITIES),
+                                 1, 1, random.randint(10, 500))
+    return selected
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--legacy-users", type=int, default=5000)
+    parser.add_argument("--cards", type=int, default=200, help="Карт в каждой вселенной")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    db_instance.pool = ConnectionPool(os.path.join(tempfile.mkdtemp(prefix="bench_shop_"), "bench.db"))
+    await db_instance.init_db()
+    selected = await seed(args.users, args.cards)
+
+    sample = random.sample(range(1, args.users + 1), min(args.legacy_users, args.users))
+    started = time.perf_counter()
+    for user_id in sample:
+        await generate_user_shop(user_id, selected[user_id])
+    legacy = time.perf_counter() - started
+    legacy_rate = len(sample) / legacy
+
+    stats = await update_all_shops()
+    async with db_instance.reader() as conn:
+        rows = (await conn.execute_fetchall("SELECT COUNT(*) FROM user_shop"))[0][0]
+    await db_instance.close_db()
+
+    print(f"Пользователей: {args.users}, строк user_shop после перегенерации: {rows}")
+    print(f"Прежний цикл:  {legacy_rate:>10.0f} польз./с, на всех ≈ {args.users / legacy_rate:.1f} с")
+    print(f"Пакетная:      {stats['users_per_second']:>10.0f} польз./с, на всех {stats['seconds']:.1f} с")
+    print(f"Ускорение:     {stats['users_per_second'] / legacy_rate:>10.1f}×")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""
+Бенчмарк профиля хранения SQLite: смешанная нагрузка чтения/записи.
+
+Сравнивает старый режим (rollback-журнал, synchronous=FULL) с профилем
+из dabase.database.SQLITE_PROFILE (WAL, synchronous=NORMAL, mmap, cache).
+
+Запуск из каталога MyBotTG:
+    python -m tools.bench_storage_profile --seconds 10 --writers 4 --readers 8
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import logging
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dabase.database import Database, ConnectionPool, SQLITE_PROFILE  # noqa: E402
+
+LEGACY_PROFILE = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "mmap_size": 0,
+    "cache_size": -2000,
+    "temp_store": "DEFAULT",
+    "auto_vacuum": None,
+}
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def seed(db: Database, users: int):
+    async with db.writer() as conn:
+        await conn.executemany(
+            "INSERT INTO users (user_id, username, registration_date, total_points) VALUES (?, ?, datetime('now'), ?)",
+            [(i, f"user_{i}", random.randint(0, 100_000)) for i in range(1, users + 1)]
+        )
+
+
+async def writer_task(db: Database, stop: float, latencies: list, users: int):
+    """Имитация track_all_messages: одна UPSERT-запись и commit на сообщение."""
+    while time.perf_counter() < stop:
+        user_id = random.randint(1, users)
+        started = time.perf_counter()
+        async with db.writer() as conn:
+            await conn.execute("""
+                INSERT INTO chat_users (user_id, chat_id, username, full_name, left)
+                VALUES (?, ?, ?, ?, 0)
+                ON CONFLICT(user_id, chat_id) DO UPDATE SET username = excluded.username
+            """, (user_id, -100, f"user_{user_id}", "Bench User"))
+        latencies.append(time.perf_counter() - started)
+
+
+async def reader_task(db: Database, stop: float, latencies: list, users: int):
+    """Имитация /top и /cards: топ-10 и позиция пользователя."""
+    while time.perf_counter() < stop:
+        user_id = random.randint(1, users)
+        started = time.perf_counter()
+        async with db.reader() as conn:
+            async with conn.execute(
+                "SELECT username, total_points FROM users WHERE total_points > 0 ORDER BY total_points DESC LIMIT 10"
+            ) as cursor:
+                await cursor.fetchall()
+            async with conn.execute(
+                "SELECT COUNT(*) + 1 FROM users WHERE total_points > (SELECT total_points FROM users WHERE user_id = ?)",
+                (user_id,)
+            ) as cursor:
+                await cursor.fetchone()
+        latencies.append(time.perf_counter() - started)
+
+
+async def run_profile(name: str, profile: dict, args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="bench_profile_")
+    db = Database()
+    db.pool = ConnectionPool(os.path.join(workdir, "bench.db"), readers=args.readers, profile=profile)
+    await db.init_db()
+    await seed(db, args.users)
+
+    write_lat, read_lat = [], []
+    stop = time.perf_counter() + args.seconds
+    await asyncio.gather(
+        *(writer_task(db, stop, write_lat, args.users) for _ in range(args.writers)),
+        *(reader_task(db, stop, read_lat, args.users) for _ in range(args.readers)),
+    )
+    await db.close_db()
+
+    return {
+        "profile": name,
+        "writes/s": len(write_lat) / args.seconds,
+        "reads/s": len(read_lat) / args.seconds,
+        "write p50 ms": percentile(write_lat, 0.50) * 1000,
+        "write p95 ms": percentile(write_lat, 0.95) * 1000,
+        "read p50 ms": percentile(read_lat, 0.50) * 1000,
+        "read p95 ms": percentile(read_lat, 0.95) * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--users", type=int, default=20_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = [
+        await run_profile("до (DELETE/FULL)", LEGACY_PROFILE, args),
+        await run_profile("после (SQLITE_PROFILE)", SQLITE_PROFILE, args),
+    ]
+
+    columns = list(results[0].keys())
+    print(" | ".join(f"{c:>22}" for c in columns))
+    for row in results:
+        print(" | ".join(f"{row[c]:>22.1f}" if isinstance(row[c], float) else f"{row[c]:>22}" for c in columns))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,368 @@
+"""
+Общий набор проверок слоя данных для обоих бэкендов (SQLite и PostgreSQL).
+
+Создаёт чистую БД (временный файл SQLite / временную схему PostgreSQL), прогоняет
+init_db со всеми миграциями и одинаковый сценарий через все репозитории.
+Код выхода 1, если хоть одна проверка не прошла.
+
+Запуск из каталога MyBotTG:
+    python -m tools.check_backends                       # только SQLite
+    python -m tools.check_backends --postgres postgresql://localhost/mybottg_test
+"""
+import os
+import sys
+import time
+import uuid
+import asyncio
+import argparse
+import logging
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dabase.database import Database, ConnectionPool  # noqa: E402
+from repositories import (  # noqa: E402
+    users_cache, card_catalog, cooldowns, leaderboard_index, top_snapshots, LeaderboardIndex, TopSnapshotCache,
+    UsersRepo, CardsRepo, UserCardsRepo, ShopRepo, ModerationRepo, PromoRepo,
+    PhotosRepo, ScoresRepo, SCOPE_UNIVERSE, SCOPE_CHAT,
+    PROMO_OK, PROMO_NOT_FOUND, PROMO_EXHAUSTED, PROMO_ALREADY_USED,
+    GRANT_NEW, GRANT_DUPLICATE, GRANT_NOT_ALLOWED,
+)
+from cards.shop import daily_offer  # noqa: E402
+from utils.collage import prune_collages, COLLAGE_MAX_AGE_DAYS  # noqa: E402
+
+USER, OTHER, CHAT = 7_000_000_001, 7_000_000_002, -1_000_000_000_123  # id больше int32, как в Telegram
+
+
+class Checker:
+    def __init__(self, backend: str):
+        self.backend = backend
+        self.failed = 0
+
+    def check(self, name: str, actual, expected):
+        ok = actual == expected
+        self.failed += not ok
+        print(f"  {'✅' if ok else '❌'} {name}" + ("" if ok else f": получили {actual!r}, ожидали {expected!r}"))
+
+
+# Прежний подсчёт коллекции GROUP BY — эталон для счётчиков user_collection_stats
+COLLECTION_TRUTH = """
+    SELECT c.rarity, COUNT(*)
+    FROM user_cards uc
+    JOIN cards c ON c.universe_id = uc.universe_id AND c.card_id = uc.card_id
+    WHERE uc.user_id = ? AND uc.universe_id = ?
+    GROUP BY c.rarity
+"""
+
+
+async def check_collection(db: Database, check: Checker, user_cards: UserCardsRepo, name: str, user_id: int):
+    async with db.reader() as conn:
+        truth = {rarity: count for rarity, count in await conn.execute_fetchall(COLLECTION_TRUTH, (user_id, "marvel"))}
+    check.check(f"счётчики коллекции: {name}", (await user_cards.overview(user_id, "marvel")).owned, truth)
+
+
+async def run_suite(db: Database, check: Checker):
+    users, cards, user_cards = UsersRepo(db), CardsRepo(db), UserCardsRepo(db)
+    shop, moderation, promo = ShopRepo(db), ModerationRepo(db), PromoRepo(db)
+
+    # 🔹 Пользователи
+    check.check("создание пользователя", await users.create(USER, "alice"), True)
+    check.check("повторное создание игнорируется", await users.create(USER, "alice"), False)
+    await users.create(OTHER, "bob")
+    await users.set_universe(USER, "marvel")
+    await users.add_spins(USER, 2)
+    check.check("списание прокрутки", await users.use_spin(USER), True)
+    check.check("прокрутки", (await users.get(USER)).spins, 1)
+    await users.use_spin(USER)
+    check.check("нет прокруток — не списываем", await users.use_spin(USER), False)
+    await users.add_card_reward(USER, 500, "2025-01-01 12:00:00")
+    await users.add_points(OTHER, 900)
+    user = await users.get(USER)
+    check.check("очки и время карты", (user.total_points, user.last_card_time), (500, "2025-01-01 12:00:00"))
+    await users.set_daily(USER, "2025-01-02 00:00:00", 3, 5)
+    check.check("ежедневная награда", ((await users.get(USER)).daily_streak, (await users.get(USER)).spins), (3, 5))
+    check.check("пользователи с вселенной", await users.with_universe(), [(USER, "marvel")])
+    check.check("лидерборд", await users.leaderboard(USER, limit=10),
+                ([("bob", 900), ("alice", 500)], 2, ("alice", 500)))
+
+    # 🔹 Писатель один: чтение-изменение-запись в параллельных транзакциях не теряет обновлений
+    async def increment_spins():
+        async with db.writer() as conn:
+            async with conn.execute("SELECT spins FROM users WHERE user_id = ?", (OTHER,)) as cursor:
+                spins = (await cursor.fetchone())[0]
+            await asyncio.sleep(0.01)
+            await conn.execute("UPDATE users SET spins = ? WHERE user_id = ?", (spins + 1, OTHER))
+
+    async with db.reader() as conn:
+        spins_before = (await conn.execute_fetchall("SELECT spins FROM users WHERE user_id = ?", (OTHER,)))[0][0]
+    await asyncio.gather(*(increment_spins() for _ in range(4)))
+    async with db.writer() as conn:
+        async with conn.execute("SELECT spins FROM users WHERE user_id = ?", (OTHER,)) as cursor:
+            check.check("транзакции записи идут по очереди", (await cursor.fetchone())[0], spins_before + 4)
+        await conn.execute("UPDATE users SET spins = ? WHERE user_id = ?", (spins_before, OTHER))
+    if db.pool.dialect == "postgres":
+        from dabase.pg_backend import PG_FOREIGN_KEYS
+        async with db.reader() as conn:
+            names = {row[0] for row in await conn.execute_fetchall(
+                "SELECT conname FROM pg_constraint WHERE contype = 'f' AND connamespace = current_schema()::regnamespace"
+            )}
+        check.check("внешние ключи PostgreSQL", names, {name for _, name, _ in PG_FOREIGN_KEYS})
+
+    # 🔹 Каталог карт
+    check.check("вселенные по умолчанию", sorted(u.universe_id for u in await cards.universes(enabled_only=True)),
+                ["marvel", "star_wars"])
+    check.check("новая вселенная", await cards.add_universe("dc", "DC"), True)
+    check.check("повторная вселенная", await cards.add_universe("dc", "DC"), False)
+    await cards.set_universe_enabled_by_name("DC", True)
+    check.check("включение по имени", (await cards.universe("dc")).enabled, 1)
+    first = await cards.add("marvel", "Iron Man", "images/marvel/1.jpg", "редкая", 10, 20, 100)
+    second = await cards.add("marvel", "Thor", "images/marvel/2.jpg", "эпическая", 15, 25, 200)
+    check.check("card_id по счётчику вселенной", second, first + 1)
+    check.check("дубликат имени", await cards.add("marvel", "Thor", "x.jpg", "редкая", 1, 1, 1), None)
+    check.check("проверка имени до загрузки изображения",
+                (await cards.name_exists("marvel", "Thor"), await cards.name_exists("marvel", "Hulk")), (True, False))
+    check.check("изображение отклонённой карты не используется",
+                (await cards.image_in_use("images/marvel/2.jpg"), await cards.image_in_use("x.jpg")), (True, False))
+    await cards.update_points("marvel", first, 150)
+    await cards.update_rarity("marvel", first, "эпическая", 11, 21)
+    card = await cards.get("marvel", first)
+    check.check("изменение карты", (card.rarity, card.attack, card.hp, card.points), ("эпическая", 11, 21, 150))
+    check.check("по редкости", len(await cards.by_rarity("marvel", "эпическая")), 2)
+    check.check("случайная по редкости", (await cards.random_by_rarity("marvel", "эпическая")).universe_id, "marvel")
+    check.check("счётчик по редкостям", await cards.count_by_rarity("marvel"), {"эпическая": 2})
+
+    # 🔹 Коллекции
+    await user_cards.add(USER, "marvel", first)
+    await user_cards.add(USER, "marvel", first)
+    check.check("повторная карта увеличивает quantity", await user_cards.quantity(USER, "marvel", first), 2)
+    overview = await user_cards.overview(USER, "marvel")
+    check.check("обзор коллекции", (overview.universe_name, overview.owned, overview.total),
+                ("Marvel", {"эпическая": 1}, {"эпическая": 2}))
+    check.check("обзор несуществующей вселенной", await user_cards.overview(USER, "nope"), None)
+    page = await user_cards.page(USER, "marvel", "эпическая", card_id=second, position=3)
+    check.check("страница своих карт: курсор за последней — по кругу",
+                (page.card.card_id, page.position, page.total, page.prev.card_id, page.next.card_id),
+                (first, 0, 1, first, first))
+    check.check("страница редкости без карт", await user_cards.page(USER, "marvel", "редкая"), None)
+    check.check("карты редкости для коллажа", [card.card_id for card in await user_cards.owned_of_rarity(USER, "marvel", "эпическая")],
+                [first])
+    page = await cards.page("marvel", "эпическая", second)
+    check.check("страница каталога по курсору",
+                (page.card.card_id, page.position, page.total, page.prev.card_id, page.next.card_id),
+                (second, 1, 2, first, first))
+
+    # 🔹 Выдача карты: одновременные нажатия не тратят одну прокрутку дважды (кулдаун ещё идёт)
+    card = await cards.get("marvel", first)
+    await users.add_spins(OTHER, 2)
+    grants = await asyncio.gather(*(user_cards.grant(OTHER, card, "2000-01-01 00:00:00") for _ in range(3)))
+    check.check("две прокрутки — две выдачи, третья — отказ", sorted(status for status, _ in grants),
+                sorted([GRANT_NEW, GRANT_DUPLICATE, GRANT_NOT_ALLOWED]))
+    other = await users.get(OTHER)
+    check.check("очки и прокрутки после выдачи", (other.spins, other.total_points), (0, 900 + 2 * card.points))
+    check.check("повтор не увеличивает quantity", await user_cards.quantity(OTHER, "marvel", first), 1)
+    await check_collection(db, check, user_cards, "после выдачи", OTHER)
+    status, other = await user_cards.grant(OTHER, card, "2999-01-01 00:00:00")
+    check.check("без прокруток — по истёкшему кулдауну", (status, other.spins), (GRANT_DUPLICATE, 0))
+
+    # 🔹 Магазин
+    await shop.replace_items(USER, "marvel", [("spins", 3, 2400), ("specific_card", second, 600)])
+    items = await shop.items(USER, "marvel")
+    check.check("ассортимент", [(i.item_type, i.item_value) for i in items], [("spins", "3"), ("specific_card", str(second))])
+    await shop.purchase_card(USER, "marvel", second, 100)
+    await shop.purchase_spins(USER, 3, 50)
+    user = await users.get(USER)
+    check.check("покупки", (user.total_points, user.spins, await user_cards.count_distinct(USER)), (350, 8, 2))
+    await check_collection(db, check, user_cards, "после покупки", USER)
+    other_points = (await users.get(OTHER)).total_points
+    check.check("рейтинг после покупок", await users.leaderboard(USER, limit=10),
+                ([("bob", other_points), ("alice", 350)], 2, ("alice", 350)))
+    reloaded = UsersRepo(db, rank_index=LeaderboardIndex())
+    check.check("рейтинг в памяти совпадает с users", await reloaded.leaderboard(OTHER, limit=1),
+                ([("bob", other_points)], 1, ("bob", other_points)))
+    snapshots = TopSnapshotCache(ttl=60)
+    cached = UsersRepo(db, snapshots=snapshots)
+    burst = await asyncio.gather(*(cached.top_snapshot(10) for _ in range(5)))
+    check.check("снимок топа: одно перестроение на одновременные запросы",
+                (len({id(snapshot) for snapshot in burst}), snapshots.stats()["rebuilds"], snapshots.stats()["joined"]),
+                (1, 1, 4))
+    check.check("снимок топа в пределах TTL", await cached.top_snapshot(10) is burst[0], True)
+    check.check("версия снимка зависит только от содержимого",
+                (await UsersRepo(db, snapshots=TopSnapshotCache()).top_snapshot(10)).version, burst[0].version)
+    await cards.update_rarity("marvel", second, "легендарная", 30, 40)
+    await check_collection(db, check, user_cards, "после смены редкости", USER)
+    check.check("удаление товара", await shop.delete_item(items[0].item_id, USER), True)
+    check.check("повторное удаление", await shop.delete_item(items[0].item_id, USER), False)
+    await shop.replace_many("marvel", [USER, OTHER], [(USER, "spins", 4, 3200), (OTHER, "specific_card", first, 450)])
+    check.check("пакетная замена ассортимента",
+                [[(i.item_type, i.item_value, i.price) for i in await shop.items(user_id, "marvel")] for user_id in (USER, OTHER)],
+                [[("spins", "4", 3200)], [("specific_card", str(first), 450)]])
+    check.check("покупка слота ежедневного магазина", await shop.claim_slot(USER, "marvel", 740000, 1), True)
+    check.check("повторная покупка слота", await shop.claim_slot(USER, "marvel", 740000, 1), False)
+    await shop.claim_slot(USER, "marvel", 739999, 0)
+    check.check("купленные слоты дня", await shop.purchased_slots(USER, "marvel", 740000), {1})
+    await shop.release_slot(USER, "marvel", 740000, 1)
+    check.check("слот возвращён в продажу", await shop.purchased_slots(USER, "marvel", 740000), set())
+    check.check("удаление покупок прошлых дней", await shop.prune_purchases(740000), 1)
+    catalog = await cards.snapshot("marvel")
+    check.check("ассортимент дня не меняется между открытиями",
+                daily_offer(USER, "marvel", 740000, catalog), daily_offer(USER, "marvel", 740000, catalog))
+    shared = await cards.add("marvel", "Loki", "images/marvel/2.jpg", "обычная", 1, 1, 10)  # То же изображение
+    check.check("изображение другой карты не освобождается", await cards.delete("marvel", second), None)
+    check.check("удаление последней карты возвращает путь", await cards.delete("marvel", shared), "images/marvel/2.jpg")
+    check.check("удаление несуществующей карты", await cards.delete("marvel", shared), None)
+    await check_collection(db, check, user_cards, "после удаления карты", USER)
+    await user_cards.clear(USER)
+    await check_collection(db, check, user_cards, "после очистки", USER)
+    check.check("очистка коллекции", await user_cards.count(USER), 0)
+
+    # 🔹 Модерация
+    await moderation.set_mute(CHAT, USER, 100, 10, "флуд", 1)
+    await moderation.set_mute(CHAT, USER, 200, 20)  # причина и модератор сохраняются
+    check.check("истёкшие муты", await moderation.expired_mutes(250), [(CHAT, USER)])
+    await moderation.clear_mute(CHAT, USER)
+    check.check("мут снят", await moderation.expired_mutes(250), [])
+    await moderation.set_ban(CHAT, OTHER, 300, "спам", 1, 30)
+    check.check("истёкшие баны", await moderation.expired_bans(400), [(CHAT, OTHER)])
+    await moderation.clear_ban(CHAT, OTHER)
+    check.check("первый варн", await moderation.add_warn(CHAT, OTHER, "a", 1, 1000, 5000), 1)
+    check.check("варн без строки moderation", await moderation.add_warn(CHAT - 1, USER, "a", 1, 1000, 5000), 1)
+    check.check("второй варн", await moderation.add_warn(CHAT, OTHER, "b", 1, 1001, 5001), 2)
+    await moderation.remove_oldest_warn(CHAT, OTHER)
+    check.check("снятие старого варна", await moderation.active_warns(CHAT, OTHER, 1002), 1)
+    await moderation.purge_expired_warns(6000)
+    check.check("очистка истёкших варнов", await moderation.active_warns(CHAT, OTHER, 1002), 0)
+    moderation.save_chat_user(CHAT, USER, "Alice", "Alice A", False)
+    moderation.save_chat_user(CHAT, OTHER, "bob", "Bob B", True)
+    await db.write_queue.flush()
+    check.check("поиск участника без учёта регистра", await moderation.find_chat_user(CHAT, "ALICE"), USER)
+    check.check("участники чата", [(m.user_id, m.username) for m in await moderation.chat_members(CHAT)],
+                [(USER, "Alice")])
+    check.check("чаты", await moderation.chat_ids(), [CHAT])
+
+    # 🔹 Рейтинги вселенной и чата
+    scores = ScoresRepo(db, snapshots=TopSnapshotCache(ttl=0))
+    check.check("рейтинг вселенной: очки за выданные карты", (await scores.top_snapshot(SCOPE_UNIVERSE, "marvel")).top,
+                [("bob", 3 * card.points)])
+    check.check("место вне рейтинга вселенной", await scores.rank(SCOPE_UNIVERSE, "marvel", USER), (1, None))
+    await users.add_points(USER, 25)
+    alice_points = (await users.get(USER)).total_points
+    check.check("рейтинг чата: ушедшие не участвуют, очки — как в users",
+                ((await scores.top_snapshot(SCOPE_CHAT, CHAT)).top, await scores.rank(SCOPE_CHAT, CHAT, USER)),
+                ([("alice", alice_points)], (1, ("alice", alice_points))))
+    await shop.purchase_spins(USER, 1, 5)
+    check.check("покупка меняет рейтинг чата", await scores.rank(SCOPE_CHAT, CHAT, USER), (1, ("alice", alice_points - 5)))
+    try:
+        async with db.writer():
+            await asyncio.wait_for(shop.purchase_spins(USER, 1, 5), 5)
+            raise RuntimeError("откат")
+    except RuntimeError:
+        pass
+    check.check("покупка внутри writer() — в его транзакции, без зависания",
+                (await users.get(USER)).total_points, alice_points - 5)
+    balance = alice_points - 5
+    check.check("покупка без очков не проходит", await shop.purchase_card(USER, "marvel", first, balance + 1), False)
+    bought = await asyncio.gather(shop.purchase_spins(USER, 1, balance), shop.purchase_card(USER, "marvel", first, balance))
+    check.check("одновременные покупки на весь баланс: проходит одна, баланс не уходит в минус",
+                (sorted(bought), (await users.get(USER)).total_points, await scores.rank(SCOPE_CHAT, CHAT, USER)),
+                ([False, True], 0, (1, ("alice", 0))))
+
+    # 🔹 Промокоды и рефералы
+    await promo.add("WELCOME", 3, 1)
+    status, _ = await promo.redeem(USER, "WELCOME")
+    check.check("активация промокода", status, PROMO_OK)
+    check.check("промокод исчерпан", (await promo.redeem(OTHER, "WELCOME"))[0], PROMO_EXHAUSTED)
+    await promo.add("TWICE", 1, 5)
+    await promo.redeem(USER, "TWICE")
+    check.check("повторная активация", (await promo.redeem(USER, "TWICE"))[0], PROMO_ALREADY_USED)
+    check.check("неизвестный промокод", (await promo.redeem(USER, "NOPE"))[0], PROMO_NOT_FOUND)
+    async with db.writer() as conn:
+        await conn.execute("INSERT INTO referrals (referral_id, referrer_id, is_valid) VALUES (?, ?, 0)", (OTHER, USER))
+    referral = await promo.referral(OTHER)
+    check.check("реферал засчитан", await promo.validate_referral(referral, 2, 1), True)
+    check.check("реферал только один раз", await promo.validate_referral(referral, 2, 1), False)
+    check.check("валидные рефералы", await promo.valid_referrals(USER), 1)
+
+    # 🔹 file_id изображений
+    photo_path = os.path.join(tempfile.mkdtemp(prefix="check_photos_"), "1.jpg")
+    with open(photo_path, "wb") as file:
+        file.write(b"jpeg")
+    photos = PhotosRepo(db)
+    check.check("нет file_id до первой отправки", await photos.file_id(photo_path), None)
+    await photos.remember(photo_path, "AgAD-1")
+    await db.write_queue.flush()
+    check.check("file_id после перезапуска", await PhotosRepo(db).file_id(photo_path), "AgAD-1")
+    with open(photo_path, "wb") as file:
+        file.write(b"new jpeg")
+    check.check("заменённый файл загружается заново", await photos.file_id(photo_path), None)
+    await photos.forget(photo_path)
+    await db.write_queue.flush()
+    check.check("забытый file_id", (await PhotosRepo(db).load()).get(photo_path), None)
+
+    # 🔹 Старые коллажи удаляются вместе с file_id
+    collages = tempfile.mkdtemp(prefix="check_collages_")
+    old_collage, fresh_collage = f"{collages}/ab/old.jpg", f"{collages}/cd/fresh.jpg"
+    for path in (old_collage, fresh_collage):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(b"collage")
+    old_time = time.time() - (COLLAGE_MAX_AGE_DAYS + 1) * 86400
+    os.utime(old_collage, (old_time, old_time))
+    await photos.remember(old_collage, "AgAD-old")
+    await photos.remember(fresh_collage, "AgAD-fresh")
+    check.check("удаление старых коллажей", await prune_collages(root=collages, photos=photos), 1)
+    await db.write_queue.flush()
+    check.check("старый коллаж удалён, свежий на месте",
+                (os.path.exists(old_collage), os.path.exists(fresh_collage)), (False, True))
+    reloaded = await PhotosRepo(db).load()
+    check.check("file_id удалённого коллажа забыт",
+                (old_collage in reloaded, reloaded.get(fresh_collage, (None, None))[1]), (False, "AgAD-fresh"))
+
+
+async def run_backend(name: str, pool) -> int:
+    print(f"\n🔸 Бэкенд: {name}")
+    # Кэши общие на процесс, а id пользователей и вселенных в прогонах одинаковые
+    users_cache.clear()
+    card_catalog.clear()
+    cooldowns.clear()
+    leaderboard_index.clear()
+    top_snapshots.clear()
+    db = Database()
+    db.pool = pool
+    await db.init_db()
+    checker = Checker(name)
+    try:
+        await run_suite(db, checker)
+    finally:
+        await db.close_db()
+    return checker.failed
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--postgres", metavar="DSN", help="DSN тестового PostgreSQL (по умолчанию — только SQLite)")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    failed = await run_backend("sqlite", ConnectionPool(os.path.join(tempfile.mkdtemp(prefix="backends_"), "check.db")))
+
+    if args.postgres:
+        import asyncpg
+        from dabase.pg_backend import PgConnectionPool
+
+        # Отдельная схема на прогон: таблицы не пересекаются с рабочими и удаляются в конце
+        schema = f"check_{uuid.uuid4().hex[:8]}"
+        admin = await asyncpg.connect(args.postgres)
+        await admin.execute(f"CREATE SCHEMA {schema}")
+        try:
+            pool = PgConnectionPool(args.postgres, min_size=1, max_size=4, server_settings={"search_path": schema})
+            failed += await run_backend("postgres", pool)
+        finally:
+            await admin.execute(f"DROP SCHEMA {schema} CASCADE")
+            await admin.close()
+
+    print(f"\n{'✅ Все проверки пройдены' if not failed else f'❌ Не пройдено проверок: {failed}'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,146 @@
+"""
+Линт-проверка: синхронный sqlite3.connect не должен быть достижим из обработчиков.
+
+Разбирает исходники бота через AST, строит граф импортов модулей проекта
+(включая импорты внутри функций) и ищет вызовы sqlite3.connect в модулях,
+достижимых из точки входа bot.py и из модулей с роутерами (Router()).
+Такой вызов блокирует event loop и останавливает все остальные чаты,
+пока держит блокировку БД, — работа с БД идёт только через dabase.database/repositories.
+
+Запуск из каталога MyBotTG:
+    python -m tools.check_blocking_db
+"""
+import os
+import ast
+import sys
+from collections import deque
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKIP_DIRS = {"tools", "__pycache__"}
+ENTRY_MODULES = ("bot",)
+
+# Модули, где прямой sqlite3.connect допустим → причина
+ALLOWED_MODULES: dict[str, str] = {}
+
+
+def iter_modules():
+    """{имя модуля: путь} для всех .py-файлов бота (кроме tools)."""
+    modules = {}
+    for dirpath, dirnames, filenames in os.walk(ROOT):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+        for filename in filenames:
+            if not filename.endswith(".py"):
+                continue
+            rel = os.path.relpath(os.path.join(dirpath, filename), ROOT)[:-3]
+            parts = rel.split(os.sep)
+            if parts[-1] == "__init__":
+                parts = parts[:-1]
+            if parts:
+                modules[".".join(parts)] = os.path.join(dirpath, filename)
+    return modules
+
+
+class ModuleScanner(ast.NodeVisitor):
+    """Собирает импорты, вызовы sqlite3.connect и признак наличия роутера."""
+
+    def __init__(self, module: str, known: dict):
+        self.module = module
+        self.known = known
+        self.imports: set[str] = set()
+        self.sqlite_names: set[str] = set()  # псевдонимы модуля sqlite3
+        self.connect_names: set[str] = set()  # from sqlite3 import connect [as ...]
+        self.blocking_calls: list[int] = []
+        self.has_router = False
+
+    def _add_import(self, name: str):
+        # from a.b import c → модуль a.b.c, если он есть, иначе a.b
+        while name and name not in self.known:
+            name = name.rpartition(".")[0]
+        if name:
+            self.imports.add(name)
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            if alias.name == "sqlite3":
+                self.sqlite_names.add(alias.asname or "sqlite3")
+            self._add_import(alias.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        base = node.module or ""
+        if node.level:
+            package = self.module.split(".")[:-node.level]
+            base = ".".join(package + ([base] if base else []))
+        for alias in node.names:
+            if base == "sqlite3" and alias.name == "connect":
+                self.connect_names.add(alias.asname or "connect")
+            self._add_import(f"{base}.{alias.name}" if base else alias.name)
+
+    def visit_Call(self, node: ast.Call):
+        func = node.func
+        if isinstance(func, ast.Attribute) and func.attr == "connect" \
+                and isinstance(func.value, ast.Name) and func.value.id in self.sqlite_names:
+            self.blocking_calls.append(node.lineno)
+        elif isinstance(func, ast.Name) and func.id in self.connect_names:
+            self.blocking_calls.append(node.lineno)
+        elif isinstance(func, ast.Name) and func.id == "Router":
+            self.has_router = True
+        self.generic_visit(node)
+
+
+def scan(modules: dict) -> dict[str, ModuleScanner]:
+    scanners = {}
+    for module, path in modules.items():
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        scanner = ModuleScanner(module, modules)
+        scanner.visit(tree)
+        scanners[module] = scanner
+    return scanners
+
+
+def reachable(scanners: dict, roots: list[str]) -> dict[str, str | None]:
+    """BFS по графу импортов. :return: {модуль: модуль, из которого он импортирован}."""
+    parents = {root: None for root in roots}
+    queue = deque(roots)
+    while queue:
+        module = queue.popleft()
+        for imported in sorted(scanners[module].imports):
+            if imported not in parents:
+                parents[imported] = module
+                queue.append(imported)
+    return parents
+
+
+def chain(parents: dict, module: str) -> str:
+    path = []
+    while module is not None:
+        path.append(module)
+        module = parents[module]
+    return " → ".join(reversed(path))
+
+
+def main() -> int:
+    modules = iter_modules()
+    scanners = scan(modules)
+    roots = [m for m in ENTRY_MODULES if m in scanners] + sorted(m for m, s in scanners.items() if s.has_router)
+    parents = reachable(scanners, roots)
+
+    violations = [
+        (module, scanners[module].blocking_calls)
+        for module in sorted(parents)
+        if scanners[module].blocking_calls and module not in ALLOWED_MODULES
+    ]
+
+    for module, lines in violations:
+        path = os.path.relpath(modules[module], ROOT)
+        for line in lines:
+            print(f"❌ {path}:{line}: sqlite3.connect в event loop")
+        print(f"      путь: {chain(parents, module)}")
+
+    print(f"\nПроверено модулей: {len(modules)}, достижимо из обработчиков: {len(parents)}, "
+          f"нарушений: {len(violations)}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Регрессионная проверка планов запросов (EXPLAIN QUERY PLAN).
+
+Собирает все SQL-константы из пакета repositories, строит большую тестовую БД
+(схема через Database.init_db со всеми миграциями + ANALYZE) и падает с кодом 1,
+если какой-то запрос читает таблицу полным сканированием (`SCAN <таблица>` без индекса).
+Осознанные полные сканы перечислены в ALLOWED_SCANS с причиной.
+
+Запуск из каталога MyBotTG:
+    python -m tools.check_query_plans --users 100000 --show
+"""
+import os
+import re
+import sys
+import random
+import asyncio
+import argparse
+import logging
+import pkgutil
+import tempfile
+import importlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import repositories  # noqa: E402
+from dabase.database import Database, ConnectionPool  # noqa: E402
+
+SQL_KEYWORDS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+# (модуль.КОНСТАНТА, таблица) → почему полный скан допустим
+ALLOWED_SCANS = {
+    ("repositories.cards.SELECT_UNIVERSES", "universes"): "справочник из нескольких строк",
+    ("repositories.cards.SET_UNIVERSE_ENABLED_BY_NAME", "universes"): "справочник из нескольких строк",
+    ("repositories.photos.SELECT_FILE_IDS", "photo_file_ids"): "загрузка всего кэша file_id в память один раз",
+}
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+RARITIES = ["обычная", "редкая", "эпическая", "легендарная", "мифическая"]
+UNIVERSES = ["marvel", "star_wars", "dc"]
+
+
+def collect_statements() -> dict[str, str]:
+    """Все SQL-константы модулей пакета repositories: {"модуль.ИМЯ": sql}."""
+    statements = {}
+    for module_info in pkgutil.iter_modules(repositories.__path__):
+        module = importlib.import_module(f"repositories.{module_info.name}")
+        for name, value in vars(module).items():
+            if name.isupper() and isinstance(value, str) and value.lstrip().upper().startswith(SQL_KEYWORDS):
+                statements[f"{module.__name__}.{name}"] = value
+    return statements
+
+
+async def build_fixture(db: Database, users: int, cards_per_universe: int):
+    """Заполняет БД объёмом, при котором полный скан заметно отличается от поиска по индексу."""
+    rnd = random.Random(42)
+    async with db.writer() as conn:
+        await conn.executemany(
+            "INSERT OR IGNORE INTO universes (universe_id, name, enabled) VALUES (?, ?, 1)",
+            [(u, u.title(), ) for u in UNIVERSES],
+        )
+        await conn.executemany(
+            "INSERT INTO cards (universe_id, card_id, name, photo_path, rarity, attack, hp, points) "
+            "VALUES (?, ?, ?, ?, ?, 10, 10, ?)",
+            [(u, i, f"{u}_{i}", f"images/{u}/{i}.jpg", rnd.choice(RARITIES), rnd.randint(1, 50) * 50)
+             for u in UNIVERSES for i in range(1, cards_per_universe + 1)],
+        )
+        await conn.executemany(
+            "INSERT INTO users (user_id, username, registration_date, selected_universe, total_points, spins) "
+            "VALUES (?, ?, '2025-01-01 00:00:00', ?, ?, 0)",
+            [(i, f"user_{i}", rnd.choice(UNIVERSES + [None]), rnd.randint(0, 100_000)) for i in range(1, users + 1)],
+        )
+        await conn.executemany(
+            "INSERT OR IGNORE INTO user_cards (user_id, card_id, universe_id, quantity) VALUES (?, ?, ?, 1)",
+            [(rnd.randint(1, users), rnd.randint(1, cards_per_universe), rnd.choice(UNIVERSES))
+             for _ in range(users * 5)],
+        )
+        await conn.executemany(
+            "INSERT INTO user_shop (user_id, universe_id, item_type, item_value, price) VALUES (?, ?, 'spins', 3, 2400)",
+            [(i, rnd.choice(UNIVERSES)) for i in range(1, users + 1)],
+        )
+        await conn.executemany(
+            "INSERT OR IGNORE INTO shop_purchases (day, user_id, universe_id, slot) VALUES (?, ?, ?, ?)",
+            [(739000 + rnd.randint(0, 6), rnd.randint(1, users), rnd.choice(UNIVERSES), rnd.randint(0, 2))
+             for _ in range(users)],
+        )
+        await conn.executemany(
+            "INSERT OR IGNORE INTO chat_users (user_id, chat_id, username, full_name, left) VALUES (?, ?, ?, '', 0)",
+            [(i, -rnd.randint(1, 50), f"user_{i}") for i in range(1, users + 1)],
+        )
+        await conn.executemany(
+            "INSERT OR IGNORE INTO moderation (chat_id, user_id, mute_until, ban_until) VALUES (?, ?, ?, ?)",
+            [(-rnd.randint(1, 50), i, rnd.choice([0, 0, 0, rnd.randint(1, 10**9)]), rnd.choice([0, 0, 0, 1]))
+             for i in range(1, users // 2)],
+        )
+        await conn.executemany(
+            "INSERT OR IGNORE INTO warns_log (chat_id, user_id, reason, moderator_id, timestamp, expire_at) "
+            "VALUES (?, ?, '', 1, ?, ?)",
+            [(-rnd.randint(1, 50), rnd.randint(1, users), t, t + 604800) for t in range(users // 2)],
+        )
+        await conn.executemany(
+            "INSERT OR IGNORE INTO referrals (referral_id, referrer_id, is_valid) VALUES (?, ?, ?)",
+            [(i, rnd.randint(1, users), rnd.randint(0, 1)) for i in range(1, users // 4)],
+        )
+        await conn.executemany(
+            "INSERT INTO promocodes (promocode, spins_bonus, usage_limit) VALUES (?, 1, 100)",
+            [(f"CODE{i}",) for i in range(1000)],
+        )
+        await conn.execute("ANALYZE")
+
+
+async def explain(conn, sql: str) -> list[str]:
+    params = (1,) * sql.count("?")
+    async with conn.execute(f"EXPLAIN QUERY PLAN {sql}", params) as cursor:
+        return [row[3] for row in await cursor.fetchall()]
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--cards", type=int, default=300, help="карт в каждой вселенной")
+    parser.add_argument("--show", action="store_true", help="печатать план каждого запроса")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    db = Database()
+    db.pool = ConnectionPool(os.path.join(tempfile.mkdtemp(prefix="query_plans_"), "fixture.db"))
+    await db.init_db()
+    await build_fixture(db, args.users, args.cards)
+
+    async with db.reader() as conn:
+        tables = {row[0] for row in await conn.execute_fetchall(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )}
+
+        failures = []
+        statements = collect_statements()
+        for name, sql in sorted(statements.items()):
+            plan = await explain(conn, sql)
+            scans = {m.group(1) for m in map(FULL_SCAN.match, plan) if m and m.group(1) in tables}
+            bad = [table for table in scans if (name, table) not in ALLOWED_SCANS]
+            if bad:
+                failures.append((name, bad, plan))
+            if args.show or bad:
+                print(f"{'❌' if bad else '✅'} {name}")
+                for line in plan:
+                    print(f"      {line}")
+
+    await db.close_db()
+
+    print(f"\nПроверено запросов: {len(statements)}, с полным сканированием: {len(failures)}")
+    for name, tables, _ in failures:
+        print(f"  ❌ {name}: SCAN {', '.join(sorted(tables))}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
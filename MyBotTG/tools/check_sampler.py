@@ -0,0 +1,143 @@
+"""
+Статистическая проверка выдачи карт через таблицы псевдонимов (utils/alias_sampler.py).
+
+Сравнивает распределение AliasSampler/UniverseCatalog с прежним поведением —
+`random.choices(cards, weights=[RARITY_WEIGHTS[card.rarity] ...])`:
+  • критерий согласия хи-квадрат с точными вероятностями (по картам и по редкостям);
+  • критерий однородности хи-квадрат против выборки самого random.choices;
+  • пакетная выдача (draw_into) и выбор редкости в магазине.
+Сиды фиксированы, поэтому результат воспроизводим. Код выхода 1, если p-value ниже порога.
+
+Запуск из каталога MyBotTG:
+    python -m tools.check_sampler --draws 500000
+"""
+import os
+import sys
+import math
+import random
+import argparse
+from array import array
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from repositories.catalog import UniverseCatalog  # noqa: E402
+from repositories.rows import CardRow  # noqa: E402
+from utils.alias_sampler import AliasSampler  # noqa: E402
+from handlers.cardshand.cardreceive import RARITY_WEIGHTS  # noqa: E402
+from cards.shop import RARITIES, RARITY_SAMPLER  # noqa: E402
+
+P_VALUE_THRESHOLD = 0.001
+# Состав вселенной как в жизни: много обычных, единицы мифических, плюс редкость без веса в RARITY_WEIGHTS
+CATALOG_LAYOUT = {"обычная": 40, "редкая": 25, "эпическая": 12, "легендарная": 5, "мифическая": 2, "особая": 1}
+
+
+def chi2_sf(statistic: float, dof: int) -> float:
+    """P(χ² ≥ statistic) — приближение Уилсона–Хилферти (точности хватает для порога 0.001)."""
+    if dof <= 0:
+        return 1.0
+    z = ((statistic / dof) ** (1 / 3) - (1 - 2 / (9 * dof))) / math.sqrt(2 / (9 * dof))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def goodness_of_fit(observed: Counter, expected_probs: dict) -> tuple[float, float]:
+    total = sum(observed.values())
+    statistic = sum((observed.get(key, 0) - total * p) ** 2 / (total * p) for key, p in expected_probs.items())
+    return statistic, chi2_sf(statistic, len(expected_probs) - 1)
+
+
+def homogeneity(first: Counter, second: Counter) -> tuple[float, float]:
+    """Хи-квадрат для двух выборок: одно ли у них распределение."""
+    keys = set(first) | set(second)
+    n1, n2 = sum(first.values()), sum(second.values())
+    statistic = 0.0
+    for key in keys:
+        a, b = first.get(key, 0), second.get(key, 0)
+        pooled = (a + b) / (n1 + n2)
+        statistic += (a - n1 * pooled) ** 2 / (n1 * pooled) + (b - n2 * pooled) ** 2 / (n2 * pooled)
+    return statistic, chi2_sf(statistic, len(keys) - 1)
+
+
+def build_catalog() -> UniverseCatalog:
+    cards, card_id = [], 0
+    for rarity, count in CATALOG_LAYOUT.items():
+        for _ in range(count):
+            card_id += 1
+            cards.append(CardRow("test", card_id, f"card {card_id}", "", rarity, 1, 1, 10))
+    random.Random(1).shuffle(cards)  # Порядок карт в каталоге не должен влиять на результат
+    return UniverseCatalog("test", cards)
+
+
+class Report:
+    def __init__(self):
+        self.failed = 0
+
+    def check(self, name: str, statistic: float, p_value: float):
+        ok = p_value >= P_VALUE_THRESHOLD
+        self.failed += not ok
+        print(f"  {'✅' if ok else '❌'} {name}: χ² = {statistic:.1f}, p = {p_value:.4f}")
+
+    def assert_true(self, name: str, condition: bool):
+        self.failed += not condition
+        print(f"  {'✅' if condition else '❌'} {name}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--draws", type=int, default=300_000, help="Число выпадений в каждой проверке")
+    args = parser.parse_args()
+    n = args.draws
+
+    report = Report()
+    catalog = build_catalog()
+    weights = [RARITY_WEIGHTS.get(card.rarity, 1) for card in catalog.cards]
+    total_weight = sum(weights)
+    card_probs = {card.card_id: w / total_weight for card, w in zip(catalog.cards, weights)}
+    rarity_probs = {
+        rarity: RARITY_WEIGHTS.get(rarity, 1) * count / total_weight for rarity, count in CATALOG_LAYOUT.items()
+    }
+
+    print(f"🔸 Каталог: {len(catalog.cards)} карт, {n} выпадений на проверку")
+
+    # 🔹 Одиночные выпадения против точных вероятностей
+    rng = random.Random(2024)
+    drawn = [catalog.random_card(RARITY_WEIGHTS, rng) for _ in range(n)]
+    report.check("по картам, random_card", *goodness_of_fit(Counter(c.card_id for c in drawn), card_probs))
+    report.check("по редкостям, random_card", *goodness_of_fit(Counter(c.rarity for c in drawn), rarity_probs))
+
+    # 🔹 Против прежней реализации: random.choices по списку весов
+    legacy_rng = random.Random(7)
+    legacy = Counter(legacy_rng.choices(catalog.cards, weights=weights, k=1)[0].card_id for _ in range(n))
+    report.check("однородность с random.choices", *homogeneity(Counter(c.card_id for c in drawn), legacy))
+
+    # 🔹 Пакетная выдача в заранее выделенный массив
+    out = array("l", [0]) * n
+    catalog.sampler(RARITY_WEIGHTS).draw_into(out, random.Random(99))
+    report.check("пакетная выдача draw_into",
+                 *goodness_of_fit(Counter(catalog.cards[i].card_id for i in out), card_probs))
+    batch = catalog.random_cards(RARITY_WEIGHTS, n, random.Random(5))
+    report.check("пакетная выдача random_cards", *goodness_of_fit(Counter(c.rarity for c in batch), rarity_probs))
+
+    # 🔹 Выбор редкости гарантии в магазине
+    shop_rng = random.Random(11)
+    shop_total = sum(RARITY_WEIGHTS.values())
+    report.check("редкость в магазине",
+                 *goodness_of_fit(Counter(RARITIES[RARITY_SAMPLER.draw(shop_rng)] for _ in range(n)),
+                                  {rarity: w / shop_total for rarity, w in RARITY_WEIGHTS.items()}))
+
+    # 🔹 Граничные случаи
+    report.assert_true("единственный исход", set(AliasSampler([5]).draw_many(1000)) == {0})
+    report.assert_true("нулевой вес не выпадает", 1 not in set(AliasSampler([1, 0, 1]).draw_many(20_000)))
+    report.assert_true("таблицы кэшируются на снимке", catalog.sampler(RARITY_WEIGHTS) is catalog.sampler(RARITY_WEIGHTS))
+    try:
+        AliasSampler([0, 0])
+        report.assert_true("все веса нулевые — ошибка", False)
+    except ValueError:
+        report.assert_true("все веса нулевые — ошибка", True)
+
+    print(f"\n{'✅ Распределение совпадает' if not report.failed else f'❌ Не пройдено проверок: {report.failed}'}")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
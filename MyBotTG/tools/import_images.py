@@ -0,0 +1,85 @@
+"""
+Перенос изображений карт из старых путей (images/<вселенная>/<file_unique_id>.jpg)
+в хранилище с адресацией по содержимому (utils/image_store.py).
+
+Для каждого старого пути: файл читается, при необходимости пережимается и сохраняется
+под именем своего хэша; cards.photo_path и счётчики image_refs переносятся на новый путь
+одной транзакцией, старый file_id забывается. Одинаковые изображения сливаются в один файл.
+Старые файлы удаляются только с флагом --delete. Запускать при остановленном боте.
+
+Запуск из каталога MyBotTG:
+    python -m tools.import_images --dry-run
+"""
+import os
+import sys
+import asyncio
+import argparse
+import logging
+import aiofiles
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dabase.database import db_instance  # noqa: E402
+from utils.image_store import image_store  # noqa: E402
+
+SELECT_LEGACY_PATHS = "SELECT photo_path, COUNT(*) FROM cards WHERE photo_path IS NOT NULL GROUP BY photo_path"
+MOVE_CARDS = "UPDATE cards SET photo_path = ? WHERE photo_path = ?"
+MOVE_REFS = """
+    INSERT INTO image_refs (photo_path, refs) VALUES (?, ?)
+    ON CONFLICT (photo_path) DO UPDATE SET refs = image_refs.refs + excluded.refs
+"""
+DROP_REFS = "DELETE FROM image_refs WHERE photo_path = ?"
+DROP_FILE_ID = "DELETE FROM photo_file_ids WHERE photo_path = ?"
+
+
+async def import_images(dry_run: bool, delete: bool) -> dict:
+    counters = {"moved": 0, "missing": 0, "cards": 0}
+    async with db_instance.reader() as db:
+        rows = list(await db.execute_fetchall(SELECT_LEGACY_PATHS))
+
+    for old_path, cards in rows:
+        if image_store.is_content_addressed(old_path):
+            continue
+        try:
+            async with aiofiles.open(old_path, "rb") as file:
+                data = await file.read()
+        except OSError:
+            counters["missing"] += 1
+            print(f"  ⚠️ нет файла: {old_path} (карт: {cards})")
+            continue
+
+        if dry_run:
+            print(f"  → {old_path} (карт: {cards})")
+        else:
+            new_path = await image_store.put(data)
+            async with db_instance.writer() as db:
+                await db.execute(MOVE_CARDS, (new_path, old_path))
+                await db.execute(DROP_REFS, (old_path,))
+                await db.execute(MOVE_REFS, (new_path, cards))
+                await db.execute(DROP_FILE_ID, (old_path,))
+            print(f"  ✅ {old_path} → {new_path} (карт: {cards})")
+            if delete:
+                await image_store.remove(old_path)
+        counters["moved"] += 1
+        counters["cards"] += cards
+    return counters
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Только показать, что будет перенесено")
+    parser.add_argument("--delete", action="store_true", help="Удалить старые файлы после переноса")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    await db_instance.init_db()
+    try:
+        counters = await import_images(args.dry_run, args.delete)
+    finally:
+        await db_instance.close_db()
+        image_store.close()
+    print(f"\nИзображений: {counters['moved']}, карт: {counters['cards']}, без файла: {counters['missing']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+import random
+from array import array
+
+
+class AliasSampler:
+    """
+    Взвешенный выбор индекса за O(1) — таблицы псевдонимов (метод Vose).
+
+    Построение O(n): каждая из n «ячеек» вероятности 1/n делится максимум между двумя
+    исходами — своим (`prob[i]`) и псевдонимом (`alias[i]`). Выборка — одно случайное
+    число: его целая часть выбирает ячейку, дробная — исход внутри неё.
+    Таблицы хранятся в компактных array, а не в списках объектов.
+    """
+    __slots__ = ("size", "prob", "alias")
+
+    def __init__(self, weights):
+        weights = [float(w) for w in weights]
+        total = sum(weights)
+        if not weights or total <= 0 or min(weights) < 0:
+            raise ValueError("Нужен хотя бы один положительный вес и ни одного отрицательного")
+
+        n = self.size = len(weights)
+        self.prob = array("d", [0.0]) * n
+        self.alias = array("l", [0]) * n
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+
+        # Остатки — из-за погрешности округления их вероятность ровно 1
+        for i in large + small:
+            self.prob[i] = 1.0
+            self.alias[i] = i
+
+    def draw(self, rng=random) -> int:
+        """Один индекс с вероятностью, пропорциональной его весу."""
+        u = rng.random() * self.size
+        i = int(u)
+        return i if u - i < self.prob[i] else self.alias[i]
+
+    def draw_into(self, out, rng=random):
+        """Заполняет заранее выделенный массив `out` (например, array("l")) индексами."""
+        size, prob, alias, rand = self.size, self.prob, self.alias, rng.random
+        for j in range(len(out)):
+            u = rand() * size
+            i = int(u)
+            out[j] = i if u - i < prob[i] else alias[i]
+        return out
+
+    def draw_many(self, count: int, rng=random) -> array:
+        return self.draw_into(array("l", [0]) * count, rng)
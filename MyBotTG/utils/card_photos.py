@@ -0,0 +1,124 @@
+import os
+import asyncio
+import logging
+from aiogram import Bot, types
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import BufferedInputFile, FSInputFile, InputMediaPhoto
+from repositories import photos_repo, cards_repo
+from utils.image_store import image_store
+
+# 🔹 Прогрев кэша file_id: служебный чат, куда заранее загружается весь каталог (0 — прогрев выключен)
+PHOTO_WARMUP_CHAT_ID = int(os.getenv("PHOTO_WARMUP_CHAT_ID", "0"))
+PHOTO_WARMUP_DELAY = float(os.getenv("PHOTO_WARMUP_DELAY", "3"))  # Пауза между загрузками (лимиты Telegram для групп)
+# Фрагменты текста ошибки Telegram, когда отклонён сам file_id (а не подпись, разметка и т. п.)
+FILE_ID_ERRORS = ("wrong file identifier", "file_id", "wrong remote file", "file reference")
+
+
+def file_id_rejected(error: TelegramBadRequest) -> bool:
+    """Ошибка означает, что Telegram не принимает file_id — только тогда его можно забыть."""
+    text = str(error).lower()
+    return any(fragment in text for fragment in FILE_ID_ERRORS)
+
+
+def sent_file_id(sent) -> str | None:
+    """file_id самого крупного размера фото из ответа Telegram (edit_media может вернуть True)."""
+    if isinstance(sent, types.Message) and sent.photo:
+        return sent.photo[-1].file_id
+    return None
+
+
+async def photo_upload(photo_path: str) -> BufferedInputFile | FSInputFile:
+    """Файл для загрузки: байты из хранилища изображений (LRU или aiofiles), без синхронного чтения."""
+    data = await image_store.read(photo_path)
+    if data is None:
+        return FSInputFile(photo_path)  # Файла нет — Telegram вернёт ошибку, как и раньше
+    return BufferedInputFile(data, filename=os.path.basename(photo_path))
+
+
+async def send_card_photo(photo_path: str, send):
+    """
+    Отправляет изображение карты по file_id, если оно уже загружено, иначе загружает файл
+    и запоминает file_id из ответа.
+    :param photo_path: Путь к изображению.
+    :param send: Функция (photo) → корутина отправки, например
+        `lambda photo: message.answer_photo(photo=photo, caption=...)`.
+    :return: Ответ Telegram.
+    """
+    file_id = await photos_repo.file_id(photo_path)
+    if file_id:
+        try:
+            return await send(file_id)
+        except TelegramBadRequest as e:
+            # Ошибки подписи или разметки повторятся и при загрузке файла — file_id не трогаем
+            if not file_id_rejected(e):
+                raise
+            # file_id больше не принимается (например, сменился токен бота) — загружаем файл заново
+            logging.warning(f"⚠️ file_id для {photo_path} отклонён: {e}")
+            await photos_repo.forget(photo_path)
+
+    sent = await send(await photo_upload(photo_path))
+    file_id = sent_file_id(sent)
+    if file_id:
+        await photos_repo.remember(photo_path, file_id)
+    return sent
+
+
+async def send_card_album(message: types.Message, photos: list[tuple[str, str]]) -> list[types.Message]:
+    """
+    Альбом изображений карт (до 10 фото) с тем же кэшем file_id, что и send_card_photo.
+    :param photos: [(путь к изображению, подпись), ...]
+    """
+    async def send(use_cache: bool) -> list[types.Message]:
+        media = []
+        for photo_path, caption in photos:
+            file_id = await photos_repo.file_id(photo_path) if use_cache else None
+            media.append(InputMediaPhoto(media=file_id or await photo_upload(photo_path), caption=caption))
+        return await message.answer_media_group(media=media)
+
+    try:
+        sent = await send(use_cache=True)
+    except TelegramBadRequest as e:
+        if not file_id_rejected(e):
+            raise
+        logging.warning(f"⚠️ Альбом с file_id отклонён, загружаем файлы заново: {e}")
+        for photo_path, _ in photos:
+            await photos_repo.forget(photo_path)
+        sent = await send(use_cache=False)
+
+    for (photo_path, _), message_sent in zip(photos, sent):
+        file_id = sent_file_id(message_sent)
+        if file_id:
+            await photos_repo.remember(photo_path, file_id)
+    return sent
+
+
+async def warm_up_card_photos(bot: Bot, chat_id: int = PHOTO_WARMUP_CHAT_ID) -> int:
+    """
+    Заранее загружает в служебный чат все изображения каталога, для которых ещё нет file_id,
+    чтобы первая же отправка пользователю шла без загрузки файла.
+    :return: Сколько изображений загружено.
+    """
+    if not chat_id:
+        return 0
+
+    uploaded = 0
+    for universe in await cards_repo.universes():
+        for card in (await cards_repo.snapshot(universe.universe_id)).cards:
+            if not await image_store.exists(card.photo_path) or await photos_repo.file_id(card.photo_path):
+                continue
+            while True:
+                try:
+                    await send_card_photo(card.photo_path, lambda photo: bot.send_photo(
+                        chat_id, photo=photo, caption=f"{universe.universe_id} #{card.card_id}", disable_notification=True
+                    ))
+                    uploaded += 1
+                    break
+                except TelegramRetryAfter as e:
+                    await asyncio.sleep(e.retry_after)
+                except Exception as e:
+                    logging.error(f"❌ Не удалось загрузить {card.photo_path}: {e}")
+                    break
+            await asyncio.sleep(PHOTO_WARMUP_DELAY)
+
+    logging.info(f"🖼 Прогрев file_id: загружено изображений — {uploaded}, в кэше — {photos_repo.stats()['cached']}.")
+    return uploaded
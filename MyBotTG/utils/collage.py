@@ -0,0 +1,102 @@
+import io
+import os
+import time
+import asyncio
+import hashlib
+import logging
+from repositories import photos_repo
+from utils.image_store import image_store, IMAGE_STORE_DIR, IMAGE_JPEG_QUALITY
+
+# 🔹 Коллаж «сеткой»: карты редкости одной картинкой вместо листания по одной
+COLLAGE_COLUMNS = int(os.getenv("COLLAGE_COLUMNS", "5"))
+COLLAGE_LIMIT = int(os.getenv("COLLAGE_LIMIT", "25"))  # Карт на одном коллаже
+COLLAGE_TILE = (200, 280)  # Ширина и высота клетки (пропорции карты)
+COLLAGE_GAP = 8
+COLLAGE_BACKGROUND = (24, 24, 28)
+# Коллаж неизменяем для своего набора карт, поэтому лежит в хранилище: file_id не перепроверяет файл
+COLLAGE_DIR = f"{IMAGE_STORE_DIR}/collages"
+# Коллаж, который не показывали столько дней, удаляется вместе с file_id (0 — не удалять)
+COLLAGE_MAX_AGE_DAYS = int(os.getenv("COLLAGE_MAX_AGE_DAYS", "30"))
+
+
+def collage_path(photo_paths: list[str]) -> str:
+    """Путь коллажа определяется набором изображений (а значит, и набором карт пользователя)."""
+    digest = hashlib.sha256("\n".join(photo_paths).encode()).hexdigest()
+    return f"{COLLAGE_DIR}/{digest[:2]}/{digest}.jpg"
+
+
+def render_collage(photo_paths: list[str], columns: int = COLLAGE_COLUMNS, tile: tuple[int, int] = COLLAGE_TILE,
+                   gap: int = COLLAGE_GAP, quality: int = IMAGE_JPEG_QUALITY) -> bytes:
+    """
+    Собирает коллаж: изображения обрезаются под клетку и нумеруются по порядку (номера — в подписи).
+    Выполняется в пуле процессов (ImageStore.run_in_worker): чтение и декодирование десятков JPEG — CPU.
+    """
+    from PIL import Image, ImageDraw, ImageOps
+
+    columns = max(1, min(columns, len(photo_paths)))
+    rows = (len(photo_paths) + columns - 1) // columns
+    width, height = tile
+    canvas = Image.new("RGB", (columns * (width + gap) + gap, rows * (height + gap) + gap), COLLAGE_BACKGROUND)
+    draw = ImageDraw.Draw(canvas)
+
+    for number, photo_path in enumerate(photo_paths):
+        x = gap + (number % columns) * (width + gap)
+        y = gap + (number // columns) * (height + gap)
+        try:
+            with Image.open(photo_path) as image:
+                image.draft("RGB", tile)  # JPEG декодируется сразу в уменьшенном размере
+                canvas.paste(ImageOps.fit(image.convert("RGB"), tile), (x, y))
+        except OSError:
+            draw.rectangle((x, y, x + width, y + height), outline=(90, 90, 90), width=2)
+        draw.rectangle((x, y, x + 34, y + 24), fill=(0, 0, 0))
+        draw.text((x + 6, y + 6), str(number + 1), fill=(255, 255, 255))
+
+    output = io.BytesIO()
+    canvas.save(output, "JPEG", quality=quality, optimize=True)
+    return output.getvalue()
+
+
+async def ensure_collage(photo_paths: list[str]) -> str:
+    """
+    Путь к коллажу набора изображений; рисует его в пуле процессов, если такого ещё нет.
+    Повторный показ того же набора не рисует заново, а с file_id (utils/card_photos.py) —
+    и не загружает файл в Telegram. mtime файла — время последнего показа (см. prune_collages).
+    """
+    path = collage_path(photo_paths)
+    try:
+        await asyncio.to_thread(os.utime, path)
+    except FileNotFoundError:
+        await image_store.write(path, await image_store.run_in_worker(render_collage, photo_paths))
+    return path
+
+
+def stale_collages(root: str, cutoff: float) -> list[str]:
+    """Файлы коллажей, которые не показывали с момента cutoff (обход каталога — в потоке)."""
+    stale = []
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = f"{directory}/{name}"
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    stale.append(path)
+            except FileNotFoundError:
+                pass
+    return stale
+
+
+async def prune_collages(max_age_days: int = COLLAGE_MAX_AGE_DAYS, root: str = COLLAGE_DIR, photos=photos_repo) -> int:
+    """
+    Удаляет коллажи, которые не показывали max_age_days дней, и их file_id (photo_file_ids).
+    Набор карт пользователя меняется, и без очистки старые коллажи копились бы вечно.
+    :return: Сколько коллажей удалено.
+    """
+    if max_age_days <= 0:
+        return 0
+    stale = await asyncio.to_thread(stale_collages, root, time.time() - max_age_days * 86400)
+    for path in stale:
+        await image_store.remove(path)
+    await photos.forget_many(stale)
+
+    if stale:
+        logging.info(f"🧹 Удалено старых коллажей: {len(stale)} (не показывались {max_age_days} дн.).")
+    return len(stale)
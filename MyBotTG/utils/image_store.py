@@ -0,0 +1,156 @@
+import io
+import os
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import aiofiles
+import aiofiles.os
+
+# 🔹 Хранилище изображений карт: имя файла — SHA-256 содержимого
+IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", "images/store")
+IMAGE_CACHE_BYTES = int(os.getenv("IMAGE_CACHE_BYTES", str(32 * 1024 * 1024)))  # LRU байтов горячих изображений
+IMAGE_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", "1280"))  # Больше Telegram всё равно не показывает
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(1024 * 1024)))
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "85"))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "1"))  # Процессов для пережатия загрузок и коллажей
+
+
+def normalize_image(data: bytes, max_side: int = IMAGE_MAX_SIDE, max_bytes: int = IMAGE_MAX_BYTES,
+                    quality: int = IMAGE_JPEG_QUALITY) -> bytes:
+    """
+    Уменьшает слишком большое изображение до max_side по большей стороне и пережимает в JPEG.
+    Выполняется в отдельном процессе (ImageStore.put): декодирование блокирует и занимает CPU.
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        if len(data) <= max_bytes and max(image.size) <= max_side and image.format == "JPEG":
+            return data
+        image = image.convert("RGB")
+        image.thumbnail((max_side, max_side))
+        output = io.BytesIO()
+        image.save(output, "JPEG", quality=quality, optimize=True)
+    return output.getvalue()
+
+
+def content_path(data: bytes, root: str = IMAGE_STORE_DIR) -> str:
+    """`<root>/ab/abcdef….jpg` — одинаковые изображения получают один путь."""
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{root}/{digest[:2]}/{digest}.jpg"
+
+
+class ImageStore:
+    """
+    Изображения карт на диске с адресацией по содержимому.
+
+    Загрузка сохраняется под именем SHA-256 своих байтов, поэтому одно изображение у нескольких
+    карт хранится один раз; сколько карт ссылается на файл, считает таблица image_refs
+    (CardsRepo), и файл удаляется только вместе с последней картой. Чтение и запись идут через
+    aiofiles, пережатие больших загрузок — в пуле процессов. Горячие изображения держатся
+    в LRU байтов размером до IMAGE_CACHE_BYTES.
+    """
+
+    def __init__(self, root: str = IMAGE_STORE_DIR, cache_bytes: int = IMAGE_CACHE_BYTES):
+        self.root = root
+        self.cache_bytes = cache_bytes
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._cached_bytes = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+        # Счётчики для мониторинга
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "stored": 0, "deduplicated": 0}
+
+    async def put(self, data: bytes) -> str:
+        """Сохраняет загрузку (при необходимости пережатую). :return: путь к файлу в хранилище."""
+        data = await self.run_in_worker(normalize_image, data)
+
+        path = content_path(data, self.root)
+        if await aiofiles.os.path.isfile(path):
+            self.counters["deduplicated"] += 1
+            return path
+
+        await self.write(path, data)
+        self.counters["stored"] += 1
+        return path
+
+    async def run_in_worker(self, func, *args):
+        """Выполняет func(*args) в пуле процессов изображений (декодирование и сборка картинок — CPU)."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def write(self, path: str, data: bytes):
+        """Атомарная запись файла хранилища: файл появляется под своим именем целиком."""
+        await aiofiles.os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        async with aiofiles.open(temp_path, "wb") as file:
+            await file.write(data)
+        await aiofiles.os.replace(temp_path, path)
+        self._remember(path, data)
+
+    async def read(self, path: str) -> bytes | None:
+        """Байты изображения (из LRU или с диска) или None, если файла нет."""
+        data = self._cache.get(path)
+        if data is not None:
+            self._cache.move_to_end(path)
+            self.counters["hits"] += 1
+            return data
+
+        self.counters["misses"] += 1
+        try:
+            async with aiofiles.open(path, "rb") as file:
+                data = await file.read()
+        except OSError:
+            return None
+        self._remember(path, data)
+        return data
+
+    async def exists(self, path: str | None) -> bool:
+        if not path:
+            return False
+        return path in self._cache or await aiofiles.os.path.isfile(path)
+
+    async def remove(self, path: str):
+        """Удаляет файл, на который больше не ссылается ни одна карта."""
+        self._forget(path)
+        try:
+            await aiofiles.os.remove(path)
+        except OSError as e:
+            logging.warning(f"⚠️ Не удалось удалить изображение {path}: {e}")
+
+    def is_content_addressed(self, path: str) -> bool:
+        """Файл хранилища никогда не меняется: его имя — хэш содержимого."""
+        return path.startswith(f"{self.root}/")
+
+    def _remember(self, path: str, data: bytes):
+        if len(data) > self.cache_bytes:
+            return
+        self._forget(path)
+        self._cache[path] = data
+        self._cached_bytes += len(data)
+        while self._cached_bytes > self.cache_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= len(evicted)
+            self.counters["evictions"] += 1
+
+    def _forget(self, path: str):
+        data = self._cache.pop(path, None)
+        if data is not None:
+            self._cached_bytes -= len(data)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        stats = dict(self.counters)
+        stats["cached"] = len(self._cache)
+        stats["cached_bytes"] = self._cached_bytes
+        return stats
+
+
+# Хранилище изображений процесса
+image_store = ImageStore()
@@ -0,0 +1,193 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import deque
+
+logging.basicConfig(level=logging.INFO)
+
+# 🔹 Монитор задержек event loop (включается через LOOP_MONITOR=1)
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR", "0") == "1"
+LOOP_MONITOR_INTERVAL = float(os.getenv("LOOP_MONITOR_INTERVAL", "0.1"))  # Период замера (сек)
+LOOP_LAG_THRESHOLD = float(os.getenv("LOOP_LAG_THRESHOLD", "0.25"))  # Блокировка дольше — снимаем стек (сек)
+LOOP_MONITOR_MAX_STALLS = int(os.getenv("LOOP_MONITOR_MAX_STALLS", "20"))  # Сколько последних блокировок хранить
+
+# Верхние границы корзин гистограммы задержки (мс); последняя корзина — всё, что больше
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+STACK_LIMIT = 15  # Кадров стека в отчёте о блокировке
+
+
+class LoopStall:
+    """Одна зафиксированная блокировка event loop."""
+    __slots__ = ("started_at", "duration", "handler", "stack")
+
+    def __init__(self, started_at: float, duration: float, handler: str | None, stack: str):
+        self.started_at = started_at
+        self.duration = duration
+        self.handler = handler
+        self.stack = stack
+
+
+class LoopLagMonitor:
+    """
+    Замеряет задержку event loop и находит, кто его блокирует.
+
+    Корутина-сэмплер спит LOOP_MONITOR_INTERVAL и пишет фактическое опоздание в гистограмму.
+    Поток-сторож следит за «сердцебиением» сэмплера: если loop не отвечает дольше
+    LOOP_LAG_THRESHOLD, он снимает стек потока loop и имя обработчика из current_handler.
+
+    current_handler пишет только поток loop (LoopMonitorMiddleware в начале и в конце
+    обработчика), сторож только читает — это одна атомарная замена ссылки на строку,
+    без обращения к внутренним структурам asyncio. Если обработчиков выполняется
+    несколько, там последний начатый из ещё работающих: точное место блокировки — в стеке.
+    """
+
+    def __init__(self, interval: float = LOOP_MONITOR_INTERVAL, threshold: float = LOOP_LAG_THRESHOLD,
+                 max_stalls: int = LOOP_MONITOR_MAX_STALLS):
+        self.interval = interval
+        self.threshold = threshold
+        self.histogram = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.samples = 0
+        self.max_lag = 0.0
+        self.stalls: deque[LoopStall] = deque(maxlen=max_stalls)
+        self.active_handlers: dict[object, str] = {}  # метка вызова → обработчик апдейта (поток loop)
+        self.current_handler: str | None = None  # Читает поток-сторож
+
+        self._loop_thread_id: int | None = None
+        self._sampler: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._heartbeat = 0.0
+        self._pending: LoopStall | None = None  # блокировка, которая ещё продолжается
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._sampler is not None
+
+    def start(self):
+        """Запускает сэмплер и поток-сторож (вызывать из работающего event loop)."""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._sampler = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+        logging.info(f"🩺 Монитор event loop запущен (период {self.interval}s, порог {self.threshold}s).")
+
+    async def stop(self):
+        if not self.running:
+            return
+        self._stop.set()
+        self._sampler.cancel()
+        try:
+            await self._sampler
+        except asyncio.CancelledError:
+            pass
+        self._sampler = None
+        await asyncio.to_thread(self._watchdog.join)
+        self._watchdog = None
+        logging.info(f"🩺 Монитор event loop остановлен: {self.summary()}")
+
+    # 🔹 Контекст обработчиков (заполняется middleware)
+
+    def handler_started(self, name: str) -> object:
+        """:return: Метка вызова для handler_finished."""
+        token = object()
+        self.active_handlers[token] = name
+        self.current_handler = name
+        return token
+
+    def handler_finished(self, token: object):
+        self.active_handlers.pop(token, None)
+        self.current_handler = next(reversed(self.active_handlers.values()), None)
+
+    # 🔹 Замеры
+
+    async def _sample(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            self._record(max(0.0, now - expected))
+
+    def _record(self, lag: float):
+        lag_ms = lag * 1000
+        for index, bound in enumerate(LAG_BUCKETS_MS):
+            if lag_ms <= bound:
+                break
+        else:
+            index = len(LAG_BUCKETS_MS)
+        self.histogram[index] += 1
+        self.samples += 1
+        self.max_lag = max(self.max_lag, lag)
+
+        with self._lock:
+            stall, self._pending = self._pending, None
+        if stall is not None:
+            # Блокировка закончилась: фиксируем её полную длительность
+            stall.duration = max(stall.duration, lag)
+            self.stalls.append(stall)
+            logging.warning(
+                f"🐢 Event loop был заблокирован {stall.duration * 1000:.0f} мс, "
+                f"обработчик: {stall.handler or 'неизвестен'}\n{stall.stack}"
+            )
+
+    def _watch(self):
+        """Поток-сторож: снимает стек, пока loop ещё заблокирован."""
+        period = min(self.interval, self.threshold) / 2
+        while not self._stop.wait(period):
+            blocked_for = time.monotonic() - self._heartbeat - self.interval
+            if blocked_for < self.threshold:
+                continue
+            with self._lock:
+                if self._pending is not None:
+                    self._pending.duration = blocked_for
+                    continue
+            stall = LoopStall(time.time() - blocked_for, blocked_for, self.current_handler, self._loop_stack())
+            with self._lock:
+                # Сэмплер обновляет heartbeat до того, как берёт блокировку: если loop уже ожил — стек не нужен
+                if time.monotonic() - self._heartbeat - self.interval >= self.threshold:
+                    self._pending = stall
+
+    def _loop_stack(self) -> str:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return ""
+        return "".join(traceback.format_stack(frame, limit=STACK_LIMIT))
+
+    # 🔹 Отчёты
+
+    def percentile(self, q: float) -> str:
+        """Верхняя граница корзины, в которую попадает q-квантиль задержки."""
+        if not self.samples:
+            return "—"
+        target = self.samples * q
+        seen = 0
+        for index, count in enumerate(self.histogram):
+            seen += count
+            if seen >= target:
+                return f"≤{LAG_BUCKETS_MS[index]} мс" if index < len(LAG_BUCKETS_MS) else f">{LAG_BUCKETS_MS[-1]} мс"
+        return "—"
+
+    def summary(self) -> dict:
+        return {
+            "samples": self.samples,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "stalls": len(self.stalls),
+        }
+
+    def histogram_rows(self) -> list[tuple[str, int]]:
+        labels = [f"≤{bound} мс" for bound in LAG_BUCKETS_MS] + [f">{LAG_BUCKETS_MS[-1]} мс"]
+        return list(zip(labels, self.histogram))
+
+
+loop_monitor = LoopLagMonitor()